@@ -0,0 +1,239 @@
+import csv
+from datetime import datetime, time, timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.orders.models import Order, OrderItem
+from apps.payments.models import Payment
+
+
+# ==============================
+# DATA EXPORTS (CSV / JSONL)
+# ==============================
+#
+# Each dataset is one values_list() query read through a server-side
+# cursor (.iterator(chunk_size=...)), so memory holds one chunk of rows
+# however large the export is. Rows are encoded into ~64 KB pieces for
+# StreamingHttpResponse, except the first one (CSV header / first JSONL
+# row), which is sent on its own to keep the time to first byte low.
+
+EXPORT_CHUNK_SIZE = getattr(settings, "ADMIN_EXPORT_CHUNK_SIZE", 2000)
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _date_range(params, field):
+    """
+    created_at range filters from ?date_from= / ?date_to= (inclusive days).
+    Ranges rather than __date lookups, so the column index can be used.
+    """
+    filters = {}
+
+    date_from = parse_date(params.get("date_from") or "")
+    date_to = parse_date(params.get("date_to") or "")
+
+    if date_from:
+        filters[f"{field}__gte"] = _day_start(date_from)
+
+    if date_to:
+        filters[f"{field}__lt"] = _day_start(date_to + timedelta(days=1))
+
+    return filters
+
+
+# ---------- DATASETS ----------
+
+def _orders(params):
+    qs = Order.objects.filter(**_date_range(params, "created_at"))
+
+    if params.get("status"):
+        qs = qs.filter(status=params["status"])
+
+    if params.get("payment"):
+        qs = qs.filter(payment_status=params["payment"])
+
+    return qs
+
+
+def _order_items(params):
+    qs = OrderItem.objects.filter(**_date_range(params, "order__created_at"))
+
+    if params.get("status"):
+        qs = qs.filter(order__status=params["status"])
+
+    if params.get("payment"):
+        qs = qs.filter(order__payment_status=params["payment"])
+
+    return qs
+
+
+def _payments(params):
+    qs = Payment.objects.filter(**_date_range(params, "created_at"))
+
+    if params.get("status"):
+        qs = qs.filter(order__status=params["status"])
+
+    # Payment rows have their own state (created / success / failed)
+    if params.get("payment"):
+        qs = qs.filter(status=params["payment"])
+
+    return qs
+
+
+def _customers(params):
+    return User.objects.filter(
+        is_superuser=False,
+        **_date_range(params, "date_joined"),
+    )
+
+
+# name → (queryset builder, [(header, field), ...])
+DATASETS = {
+    "orders": (_orders, [
+        ("id", "id"),
+        ("uuid", "uuid"),
+        ("created_at", "created_at"),
+        ("customer_email", "user__email"),
+        ("status", "status"),
+        ("payment_status", "payment_status"),
+        ("refund_status", "refund_status"),
+        ("subtotal", "subtotal"),
+        ("discount_amount", "discount_amount"),
+        ("tax_amount", "tax_amount"),
+        ("shipping_fee", "shipping_fee"),
+        ("total_amount", "total_amount"),
+        ("total_weight_kg", "total_weight_kg"),
+        ("promo_code", "promo_code"),
+        ("shipping_method", "shipping_method"),
+        ("razorpay_payment_id", "razorpay_payment_id"),
+        ("razorpay_refund_id", "razorpay_refund_id"),
+    ]),
+    "items": (_order_items, [
+        ("id", "id"),
+        ("order_id", "order_id"),
+        ("order_uuid", "order__uuid"),
+        ("order_created_at", "order__created_at"),
+        ("order_status", "order__status"),
+        ("product_name", "product_name"),
+        ("variant_id", "variant_id"),
+        ("color", "color"),
+        ("size", "size"),
+        ("quantity", "quantity"),
+        ("weight_kg", "weight_kg"),
+        ("unit_price", "unit_price"),
+        ("total_price", "total_price"),
+    ]),
+    "payments": (_payments, [
+        ("id", "id"),
+        ("order_id", "order_id"),
+        ("order_uuid", "order__uuid"),
+        ("created_at", "created_at"),
+        ("gateway", "gateway"),
+        ("status", "status"),
+        ("amount", "amount"),
+        ("razorpay_order_id", "razorpay_order_id"),
+        ("razorpay_payment_id", "razorpay_payment_id"),
+    ]),
+    "customers": (_customers, [
+        ("id", "id"),
+        ("username", "username"),
+        ("email", "email"),
+        ("first_name", "first_name"),
+        ("last_name", "last_name"),
+        ("phone", "profile__phone"),
+        ("is_active", "is_active"),
+        ("date_joined", "date_joined"),
+        ("last_login", "last_login"),
+    ]),
+}
+
+
+def export_rows(dataset, params):
+    """
+    (headers, row iterator) of a dataset, filtered by the request params.
+    Rows come in primary key order, so the pk index drives the cursor.
+    """
+    build, columns = DATASETS[dataset]
+
+    rows = (
+        build(params)
+        .order_by("id")
+        .values_list(*[field for _, field in columns])
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+    return [header for header, _ in columns], rows
+
+
+# ---------- ENCODERS ----------
+
+def _csv_stream(headers, rows):
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(headers)
+    yield buffer.getvalue()
+
+    buffer.seek(0)
+    buffer.truncate()
+
+    for row in rows:
+        writer.writerow(row)
+
+        if buffer.tell() >= EXPORT_BUFFER_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def _jsonl_stream(headers, rows):
+    encoder = DjangoJSONEncoder()
+    pending = []
+    size = 0
+    first = True
+
+    for row in rows:
+        line = encoder.encode(dict(zip(headers, row))) + "\n"
+        pending.append(line)
+        size += len(line)
+
+        # No header line here: send the first row on its own
+        if first or size >= EXPORT_BUFFER_SIZE:
+            first = False
+            yield "".join(pending)
+            pending = []
+            size = 0
+
+    yield "".join(pending)
+
+
+def stream_export(dataset, fmt, params):
+    """
+    Yields the encoded export (str chunks).
+    """
+    headers, rows = export_rows(dataset, params)
+
+    encode = _jsonl_stream if fmt == "jsonl" else _csv_stream
+
+    # Outside a transaction Django declares the cursor WITH HOLD, and
+    # Postgres materializes the whole result on the implicit commit
+    # before the first row comes back. Inside one, rows are fetched as
+    # the response is written.
+    with transaction.atomic():
+        yield from encode(headers, rows)
@@ -0,0 +1,169 @@
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from apps.orders.models import Order, OrderItem
+
+
+BENCH_USERNAME = "bench-export"
+
+STATUSES = [value for value, _ in Order.ORDER_STATUS_CHOICES]
+COLORS = ["Black", "White", "Navy", "Olive", "Grey"]
+SIZES = ["S", "M", "L", "XL"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream the admin item export over N synthetic order items and "
+        "report time to first byte / first row, throughput and peak "
+        "Python memory (separate tracemalloc pass, which is slower)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=1_000_000)
+        parser.add_argument("--items-per-order", type=int, default=10)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument(
+            "--keep", action="store_true",
+            help="Keep the seeded orders for another run.",
+        )
+
+    def handle(self, *args, **options):
+        user, _ = get_user_model().objects.get_or_create(
+            username=BENCH_USERNAME,
+            defaults={"is_superuser": True},
+        )
+
+        if not OrderItem.objects.filter(order__user=user).exists():
+            self.seed(user, options)
+
+        client = Client()
+        client.force_login(user)
+
+        session = client.session
+        session["is_admin"] = True
+        session.save()
+
+        url = reverse("adminpanel:data_export_download", args=["items"])
+
+        cases = [
+            ("items csv", {"fmt": "csv"}),
+            ("items jsonl", {"fmt": "jsonl"}),
+            ("items csv, delivered", {"fmt": "csv", "status": "delivered"}),
+        ]
+
+        results = []
+
+        try:
+            for label, params in cases:
+                timing = self.run_export(client, url, params)
+
+                tracemalloc.start()
+                self.run_export(client, url, params)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                results.append((label, *timing, peak / 2**20))
+        finally:
+            if not options["keep"]:
+                self.drop_seed(user)
+
+        self.stdout.write(
+            f"{'case':<26}{'rows':>10}{'MB':>8}{'ttfb ms':>10}{'row ms':>10}"
+            f"{'total s':>10}{'rows/s':>10}{'peak MB':>10}"
+        )
+        for label, rows, size, ttfb, first_row, total, peak in results:
+            self.stdout.write(
+                f"{label:<26}{rows:>10}{size / 2**20:>8.1f}{ttfb:>10.1f}"
+                f"{first_row:>10.1f}{total:>10.2f}{rows / total:>10.0f}{peak:>10.1f}"
+            )
+
+    def run_export(self, client, url, params):
+        """
+        (rows, bytes, ms to first byte, ms to first data row, seconds)
+        """
+        header_lines = 1 if params["fmt"] == "csv" else 0
+
+        started = time.perf_counter()
+        response = client.get(url, params)
+
+        size = lines = 0
+        ttfb = first_row = None
+
+        for chunk in response.streaming_content:
+            now = (time.perf_counter() - started) * 1000
+
+            if ttfb is None:
+                ttfb = now
+
+            size += len(chunk)
+            lines += chunk.count(b"\n")
+
+            if first_row is None and lines > header_lines:
+                first_row = now
+
+        total = time.perf_counter() - started
+
+        return lines - header_lines, size, ttfb, first_row or 0, total
+
+    def seed(self, user, options):
+        count = options["items"]
+        per_order = options["items_per_order"]
+        batch_size = options["batch_size"]
+
+        for start in range(0, count, batch_size):
+            stop = min(start + batch_size, count)
+            first_order = start // per_order
+
+            orders = Order.objects.bulk_create([
+                Order(
+                    user=user,
+                    address_text="Bench address",
+                    status=STATUSES[i % len(STATUSES)],
+                    payment_status="paid",
+                    subtotal=Decimal("100.00"),
+                    total_amount=Decimal("112.00"),
+                    total_weight_kg=Decimal("2.500"),
+                    tax_rate=Decimal("12.00"),
+                    tax_amount=Decimal("12.00"),
+                )
+                for i in range(first_order, (stop + per_order - 1) // per_order)
+            ])
+
+            OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=orders[i // per_order - first_order],
+                    product_name=f"Bench item {i:07d}",
+                    color=COLORS[i % len(COLORS)],
+                    size=SIZES[i % len(SIZES)],
+                    quantity=1 + i % 3,
+                    weight_kg=Decimal("0.250"),
+                    unit_price=Decimal("10.00"),
+                    total_price=Decimal("10.00") * (1 + i % 3),
+                    variant_id=i,
+                )
+                for i in range(start, stop)
+            ], batch_size=batch_size)
+
+            self.stdout.write(f"  seeded {stop}/{count} items")
+
+    def drop_seed(self, user):
+        # Raw deletes: the ORM cascade would load a million rows first
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {OrderItem._meta.db_table} WHERE order_id IN "
+                f"(SELECT id FROM {Order._meta.db_table} WHERE user_id = %s)",
+                [user.id],
+            )
+            cursor.execute(
+                f"DELETE FROM {Order._meta.db_table} WHERE user_id = %s",
+                [user.id],
+            )
+
+        user.delete()
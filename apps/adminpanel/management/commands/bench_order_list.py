@@ -0,0 +1,193 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from apps.catalog.management.commands._bench import measure, write_results
+from apps.adminpanel.views.orders import ORDER_LIST_ORDERING
+from apps.orders.models import Order
+from surplus_store_project.pagination import encode_cursor, estimated_count, keyset_paginate
+
+
+BENCH_PREFIX = "bench-order-list"
+
+STATUSES = [value for value, _ in Order.ORDER_STATUS_CHOICES]
+PAYMENT_STATUSES = [value for value, _ in Order.PAYMENT_STATUS_CHOICES]
+
+
+class Command(BaseCommand):
+    help = (
+        "Admin order list over N synthetic orders: offset pages + COUNT(*) "
+        "(old) vs keyset pages + estimated count, filters and search."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=1_000_000)
+        parser.add_argument("--customers", type=int, default=1000)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument(
+            "--keep", action="store_true",
+            help="Keep the seeded orders for another run.",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+
+        admin, _ = User.objects.get_or_create(
+            username=f"{BENCH_PREFIX}-admin",
+            defaults={"is_superuser": True},
+        )
+
+        if not User.objects.filter(username=f"{BENCH_PREFIX}-0").exists():
+            self.seed(options)
+
+        client = Client()
+        client.force_login(admin)
+
+        session = client.session
+        session["is_admin"] = True
+        session.save()
+
+        url = reverse("adminpanel:admin_orders")
+        total = Order.objects.count()
+        deep = total // 2
+
+        # Cursor of the row the old list reaches with ?page=deep/per_page
+        middle = Order.objects.order_by(*ORDER_LIST_ORDERING)[deep]
+        deep_cursor = encode_cursor([middle.created_at, middle.id])
+
+        sample = Order.objects.filter(
+            razorpay_payment_id__startswith="pay_bench",
+        ).order_by("-id").first()
+
+        results = []
+
+        def old_page(qs, number):
+            paginator = Paginator(qs.select_related("user").order_by("-created_at"), 10)
+            page = paginator.get_page(number)
+            list(page)
+            return paginator.count
+
+        def new_page(qs, after=None):
+            keyset_paginate(
+                qs.select_related("user"), ORDER_LIST_ORDERING,
+                cursor=after, page_size=25,
+            )
+            return estimated_count(qs)
+
+        try:
+            orders = Order.objects.all()
+            processing = Order.objects.filter(status="processing")
+            unpaid = Order.objects.filter(payment_status="pending")
+
+            with measure(results, "offset page 1 (old)"):
+                old_page(orders, 1)
+
+            with measure(results, f"offset page {deep // 10} (old)"):
+                old_page(orders, deep // 10)
+
+            with measure(results, "offset processing, page 1 (old)"):
+                old_page(processing, 1)
+
+            with measure(results, "keyset first page"):
+                new_page(orders)
+
+            with measure(results, f"keyset page at row {deep}"):
+                new_page(orders, after=deep_cursor)
+
+            with measure(results, "keyset processing"):
+                new_page(processing)
+
+            with measure(results, "keyset processing, deep"):
+                new_page(processing, after=deep_cursor)
+
+            with measure(results, "keyset payment pending"):
+                new_page(unpaid)
+
+            searches = [
+                ("view, first page", {}),
+                ("view, deep page", {"after": deep_cursor}),
+                ("view, status + payment", {"status": "shipped", "payment": "paid"}),
+                ("view, search #ORD- prefix", {"q": f"#ORD-{str(middle.uuid)[:8]}"}),
+                ("view, search email", {"q": f"{BENCH_PREFIX}-7@example.com"}),
+                ("view, search pay_ id", {"q": sample.razorpay_payment_id if sample else "pay_x"}),
+            ]
+
+            # Template compile, session, nav counts
+            client.get(url)
+
+            for label, params in searches:
+                with measure(results, label):
+                    response = client.get(url, params)
+
+                if response.status_code != 200:
+                    self.stderr.write(f"{label}: {response.status_code}")
+
+        finally:
+            if not options["keep"]:
+                self.drop_seed()
+            admin.delete()
+
+        write_results(self.stdout, results)
+
+    def seed(self, options):
+        User = get_user_model()
+
+        users = User.objects.bulk_create([
+            User(
+                username=f"{BENCH_PREFIX}-{n}",
+                email=f"{BENCH_PREFIX}-{n}@example.com",
+            )
+            for n in range(options["customers"])
+        ])
+
+        count = options["orders"]
+        batch_size = options["batch_size"]
+
+        for start in range(0, count, batch_size):
+            stop = min(start + batch_size, count)
+
+            Order.objects.bulk_create([
+                Order(
+                    user=users[i % len(users)],
+                    address_text="Bench address",
+                    status=STATUSES[i % len(STATUSES)],
+                    payment_status=PAYMENT_STATUSES[(i // 7) % len(PAYMENT_STATUSES)],
+                    razorpay_payment_id=(
+                        f"pay_bench{i:07d}"
+                        if PAYMENT_STATUSES[(i // 7) % len(PAYMENT_STATUSES)] == "paid"
+                        else None
+                    ),
+                    subtotal=Decimal("100.00"),
+                    total_amount=Decimal("112.00"),
+                    total_weight_kg=Decimal("2.500"),
+                    tax_rate=Decimal("12.00"),
+                    tax_amount=Decimal("12.00"),
+                )
+                for i in range(start, stop)
+            ])
+
+            self.stdout.write(f"  seeded {stop}/{count} orders")
+
+        # Fresh statistics, as autovacuum would have by now
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Order._meta.db_table}")
+
+    def drop_seed(self):
+        User = get_user_model()
+
+        # Raw delete: the ORM cascade would load a million rows first
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {Order._meta.db_table} WHERE user_id IN "
+                f"(SELECT id FROM {User._meta.db_table} WHERE username LIKE %s)",
+                [f"{BENCH_PREFIX}-%"],
+            )
+
+        User.objects.filter(username__startswith=f"{BENCH_PREFIX}-").exclude(
+            username=f"{BENCH_PREFIX}-admin",
+        ).delete()
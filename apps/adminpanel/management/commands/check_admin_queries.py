@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.cart.counters import invalidate_nav_counts
+from apps.orders.metrics import summary_cache_key
+from apps.orders.rollups import clamp_days, window
+
+
+BENCH_USERNAME = "bench-admin-queries"
+
+# Pinned query counts (cold caches / warm). They include the session,
+# user, profile and nav-count queries of every page and do not depend
+# on the number of orders.
+BUDGETS = {
+    "dashboard": (8, 5),
+    "analytics": (8, 5),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the admin dashboard and analytics pages and fail if they "
+        "run more queries than pinned in BUDGETS."
+    )
+
+    def handle(self, *args, **options):
+        user, _ = get_user_model().objects.get_or_create(
+            username=BENCH_USERNAME,
+            defaults={"is_superuser": True},
+        )
+
+        client = Client()
+        client.force_login(user)
+
+        session = client.session
+        session["is_admin"] = True
+        session.save()
+
+        start_date, end_date = window(clamp_days(None))
+
+        pages = {
+            "dashboard": (reverse("adminpanel:dashboard"), summary_cache_key()),
+            "analytics": (
+                reverse("adminpanel:admin_analytics"),
+                summary_cache_key(start_date, end_date),
+            ),
+        }
+
+        failures = []
+
+        try:
+            for name, (url, key) in pages.items():
+                cache.delete(key)
+                invalidate_nav_counts(user.id)
+
+                for label, budget in zip(("cold", "warm"), BUDGETS[name]):
+                    with CaptureQueriesContext(connection) as ctx:
+                        response = client.get(url)
+
+                    queries = len(ctx.captured_queries)
+
+                    self.stdout.write(
+                        f"{name:<12}{label:<8}{queries:>4} queries "
+                        f"(budget {budget})"
+                    )
+
+                    if response.status_code != 200:
+                        failures.append(f"{name} returned {response.status_code}")
+                    elif queries > budget:
+                        failures.append(
+                            f"{name} ({label}) ran {queries} queries, budget {budget}:\n"
+                            + "\n".join(q["sql"] for q in ctx.captured_queries)
+                        )
+        finally:
+            user.delete()
+
+        if failures:
+            raise CommandError("\n\n".join(failures))
+
+        self.stdout.write(self.style.SUCCESS("Query budgets respected"))
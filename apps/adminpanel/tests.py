@@ -1,3 +1,172 @@
-from django.test import TestCase
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.orders.metrics import order_summary
+from apps.orders.models import Order
+from apps.orders.rollups import refresh_dirty_days
+
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+def create_order(user, **fields):
+    fields = {
+        "address_text": "Test address",
+        "status": "pending",
+        "payment_status": "paid",
+        "subtotal": Decimal("100.00"),
+        "total_amount": Decimal("112.00"),
+        "total_weight_kg": Decimal("2.500"),
+        "tax_rate": Decimal("12.00"),
+        "tax_amount": Decimal("12.00"),
+        **fields,
+    }
+    return Order.objects.create(user=user, **fields)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SummaryQueryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "pass")
+        cls.customer = User.objects.create_user("shopper", "shopper@example.com", "pass")
+
+        for status in ("pending", "processing", "delivered", "cancelled"):
+            create_order(cls.customer, status=status)
+
+        refresh_dirty_days()
+
+    def setUp(self):
+        cache.clear()
+
+        self.client.force_login(self.admin)
+
+        session = self.client.session
+        session["is_admin"] = True
+        session.save()
+
+    def test_dashboard_query_count(self):
+        url = reverse("adminpanel:dashboard")
+
+        # session, user, profile, nav counts (2), active users, summary,
+        # recent orders
+        with self.assertNumQueries(8):
+            response = self.client.get(url)
+
+        self.assertEqual(response.context["total_orders"], 4)
+        self.assertEqual(response.context["pending_orders"], 1)
+
+        # Summary and nav counts cached
+        with self.assertNumQueries(5):
+            self.client.get(url)
+
+    def test_analytics_query_count(self):
+        url = reverse("adminpanel:admin_analytics")
+
+        # session, user, profile, nav counts (2), trend, summary,
+        # top customers
+        with self.assertNumQueries(8):
+            response = self.client.get(url)
+
+        self.assertEqual(response.context["total_orders"], 4)
+
+        with self.assertNumQueries(5):
+            self.client.get(url)
+
+    def test_summary_is_cached(self):
+        with self.assertNumQueries(1):
+            summary = order_summary()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(order_summary(), summary)
+
+        self.assertEqual(summary["total_orders"], 4)
+        self.assertEqual(summary["paid_orders"], 4)
+        self.assertEqual(summary["total_revenue"], Decimal("448.00"))
+        self.assertEqual(summary["by_status"]["delivered"], 1)
+
+    def test_summary_recomputed_after_order_change(self):
+        self.assertEqual(order_summary()["by_status"]["pending"], 1)
+
+        order = Order.objects.get(status="pending")
+        order.status = "processing"
+        order.save()
+
+        # Cached until the rollups catch up
+        self.assertEqual(order_summary()["by_status"]["pending"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            refresh_dirty_days()
+
+        with self.assertNumQueries(1):
+            summary = order_summary()
+
+        self.assertEqual(summary["by_status"]["pending"], 0)
+        self.assertEqual(summary["by_status"]["processing"], 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class OrderListTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "pass")
+        cls.customer = User.objects.create_user("shopper", "shopper@example.com", "pass")
+
+        cls.pending = create_order(cls.customer, status="pending")
+        cls.shipped = create_order(cls.customer, status="shipped")
+
+    def setUp(self):
+        cache.clear()
+
+        self.client.force_login(self.admin)
+
+        session = self.client.session
+        session["is_admin"] = True
+        session.save()
+
+    def get_orders(self, **params):
+        response = self.client.get(reverse("adminpanel:admin_orders"), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_filtered_list(self):
+        response = self.get_orders(status="pending", payment="paid", q="shopper")
+
+        self.assertEqual([order.id for order in response.context["orders"]], [self.pending.id])
+        self.assertEqual(response.context["total_count"], 1)
+        self.assertTrue(response.context["total_exact"])
+
+    def test_filtered_list_uses_planner_estimate(self):
+        # Every table counts as large: the EXPLAIN row estimate is shown
+        with mock.patch("surplus_store_project.pagination.EXACT_COUNT_LIMIT", 0):
+            response = self.get_orders(status="shipped")
+
+        self.assertEqual([order.id for order in response.context["orders"]], [self.shipped.id])
+        self.assertFalse(response.context["total_exact"])
+        self.assertGreaterEqual(response.context["total_count"], 1)
+
+    def test_search_hex_username(self):
+        baker = User.objects.create_user("cafe", "cafe@example.com", "pass")
+        order = create_order(baker)
+
+        response = self.get_orders(q="cafe")
+
+        self.assertEqual([row.id for row in response.context["orders"]], [order.id])
+
+    def test_search_order_id(self):
+        prefix = str(self.shipped.uuid)[:8]
+
+        for q in (f"#ORD-{prefix}", prefix, str(self.shipped.uuid)):
+            response = self.get_orders(q=q)
+            self.assertEqual(
+                [order.id for order in response.context["orders"]], [self.shipped.id], q,
+            )
@@ -15,7 +15,11 @@ from apps.adminpanel.views.products import product_list, product_create, product
 
 from apps.adminpanel.views.variants import variant_list, variant_create, variant_edit
 
-from apps.adminpanel.views.orders import orders, order_detail, update_order_status_ajax
+from apps.adminpanel.views.orders import orders, order_detail, update_order_status_ajax, bulk_order_status
+
+from apps.adminpanel.views.invoices import invoice_export, invoice_export_download, invoice_export_progress
+
+from apps.adminpanel.views.exports import data_export, data_export_download
 
 from apps.adminpanel.views.analytics import admin_analytics
 
@@ -23,6 +27,10 @@ from apps.adminpanel.views.faq import faq_list, faq_create
 
 from apps.adminpanel.views.promotions import promo_list, promo_create, promo_edit
 
+from apps.adminpanel.views.monitoring import cache_metrics, job_metrics, latency_metrics
+
+from apps.adminpanel.views.webhooks import webhook_events, replay_webhook_event
+
 
 app_name = "adminpanel"
 
@@ -64,6 +72,14 @@ urlpatterns = [
     path("orders/", orders, name="admin_orders"),
     path("orders/<int:order_id>/", order_detail, name="admin_order_detail"),
     path("orders/update-status/", update_order_status_ajax, name="update_order_status_ajax"),
+    path("orders/bulk-status/", bulk_order_status, name="bulk_order_status"),
+    path("orders/invoices/export/", invoice_export, name="invoice_export"),
+    path("orders/invoices/export/download/", invoice_export_download, name="invoice_export_download"),
+    path("orders/invoices/export/progress/<str:token>/", invoice_export_progress, name="invoice_export_progress"),
+
+
+    path("exports/", data_export, name="data_export"),
+    path("exports/<str:dataset>/", data_export_download, name="data_export_download"),
 
 
     path("analytics/", admin_analytics, name="admin_analytics"),
@@ -78,4 +94,13 @@ urlpatterns = [
     path("promos/<int:promo_id>/edit/", promo_edit, name="promo_edit"),
 
 
+    path("monitoring/cache/", cache_metrics, name="cache_metrics"),
+    path("monitoring/latency/", latency_metrics, name="latency_metrics"),
+    path("monitoring/jobs/", job_metrics, name="job_metrics"),
+
+
+    path("webhooks/", webhook_events, name="webhook_events"),
+    path("webhooks/<int:event_id>/replay/", replay_webhook_event, name="replay_webhook_event"),
+
+
 ]
@@ -1,47 +1,41 @@
 from django.shortcuts import render
-from django.utils import timezone
 from datetime import timedelta
-from django.db.models import Sum, Count
-from django.db.models.functions import TruncDate
+from django.db.models import Sum
 
-from apps.orders.models import Order
+from apps.orders.metrics import order_summary
+from apps.orders.models import OrderDailyStats, CustomerDailySpend
+from apps.orders.rollups import clamp_days, window
 
 
 def admin_analytics(request):
 
     # -------------------------
-    # 1. DATE FILTER
+    # 1. DATE FILTER (clamped)
     # -------------------------
-    days = int(request.GET.get("days", 30))
+    days = clamp_days(request.GET.get("days"))
 
-    end_date = timezone.now()
-    start_date = end_date - timedelta(days=days)
+    start_date, end_date = window(days)
 
-    orders = Order.objects.filter(created_at__gte=start_date)
+    # Daily rollups (orders.rollups): cost grows with days, not orders
+    stats = OrderDailyStats.objects.filter(date__range=(start_date, end_date))
 
     # -------------------------
-    # 2. PAID ORDERS
-    # -------------------------
-    paid_orders_qs = orders.filter(payment_status="paid")
-
-    # -------------------------
-    # 3. FULL DATE RANGE (IMPORTANT FIX)
+    # 2. FULL DATE RANGE
     # -------------------------
     date_range = [
-        (start_date + timedelta(days=i)).date()
+        start_date + timedelta(days=i)
         for i in range(days)
     ]
 
     # -------------------------
-    # 4. AGGREGATED DATA
+    # 3. AGGREGATED DATA
     # -------------------------
     trend_qs = (
-        paid_orders_qs
-        .annotate(date=TruncDate("created_at"))
+        stats
         .values("date")
         .annotate(
-            revenue=Sum("total_amount"),
-            count=Count("id")
+            revenue=Sum("revenue"),
+            count=Sum("paid_orders")
         )
     )
 
@@ -51,7 +45,7 @@ def admin_analytics(request):
     }
 
     # -------------------------
-    # 5. FINAL CHART DATA
+    # 4. FINAL CHART DATA
     # -------------------------
     dates = []
     revenue = []
@@ -70,41 +64,24 @@ def admin_analytics(request):
             order_counts.append(0)
 
     # -------------------------
-    # 6. STATUS DISTRIBUTION
+    # 5. SUMMARY + STATUS + REVENUE + REFUNDS (one query, cached)
     # -------------------------
-    status_qs = (
-        orders
-        .values("status")
-        .annotate(count=Count("id"))
-    )
+    summary = order_summary(start_date, end_date)
 
     status_data = {
-        item["status"]: item["count"]
-        for item in status_qs
+        status: count
+        for status, count in summary["by_status"].items()
+        if count
     }
 
-    # -------------------------
-    # 7. SUMMARY
-    # -------------------------
-    total_orders = orders.count()
-    paid_orders = orders.filter(payment_status="paid").count()
-    delivered_orders = orders.filter(status="delivered").count()
-    cancelled_orders = orders.filter(status="cancelled").count()
-
-    # -------------------------
-    # 8. REVENUE + REFUNDS
-    # -------------------------
-    total_revenue = paid_orders_qs.aggregate(
-        total=Sum("total_amount")
-    )["total"] or 0
-
-    refunded_qs = orders.filter(refund_status="processed")
-
-    total_refunded = refunded_qs.aggregate(
-        total=Sum("total_amount")
-    )["total"] or 0
+    total_orders = summary["total_orders"]
+    paid_orders = summary["paid_orders"]
+    delivered_orders = summary["by_status"]["delivered"]
+    cancelled_orders = summary["by_status"]["cancelled"]
 
-    refund_count = refunded_qs.count()
+    total_revenue = summary["total_revenue"]
+    total_refunded = summary["total_refunded"]
+    refund_count = summary["refund_count"]
 
     refund_rate = (
         (refund_count / total_orders) * 100
@@ -112,14 +89,15 @@ def admin_analytics(request):
     )
 
     # -------------------------
-    # 9. TOP CUSTOMERS
+    # 6. TOP CUSTOMERS
     # -------------------------
     top_customers_qs = (
-        paid_orders_qs
+        CustomerDailySpend.objects
+        .filter(date__range=(start_date, end_date))
         .values("user__username", "user__email")
         .annotate(
-            order_count=Count("id"),
-            total_spent=Sum("total_amount")
+            order_count=Sum("orders"),
+            total_spent=Sum("spent")
         )
         .order_by("-total_spent")[:5]
     )
@@ -135,7 +113,7 @@ def admin_analytics(request):
     ]
 
     # -------------------------
-    # 10. INSIGHTS
+    # 7. INSIGHTS
     # -------------------------
     insights = []
 
@@ -1,8 +1,8 @@
 from django.shortcuts import render
 from django.contrib.auth.models import User
 from apps.adminpanel.decorators import admin_required
+from apps.orders.metrics import order_summary
 from apps.orders.models import Order
-from django.db.models import Sum
 
 
 @admin_required
@@ -13,17 +13,12 @@ def dashboard(request):
         is_active=True, is_superuser=False
     ).count()
 
-    # Total orders
-    total_orders = Order.objects.count()
+    # Orders / revenue (ONLY PAID) / pending: one cached query
+    summary = order_summary()
 
-    # Total revenue (ONLY PAID)
-    total_revenue = (
-        Order.objects.filter(payment_status="paid")
-        .aggregate(total=Sum("total_amount"))["total"] or 0
-    )
-
-    # Replace "Returns Pending" → Pending Orders
-    pending_orders = Order.objects.filter(status="pending").count()
+    total_orders = summary["total_orders"]
+    total_revenue = summary["total_revenue"]
+    pending_orders = summary["by_status"]["pending"]
 
     # Latest 10 orders
     recent_orders = (
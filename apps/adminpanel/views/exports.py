@@ -0,0 +1,48 @@
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import render
+from django.utils import timezone
+
+from apps.adminpanel.decorators import admin_required
+from apps.adminpanel.exports import DATASETS, FORMATS, stream_export
+from apps.orders.models import Order
+from apps.payments.models import Payment
+
+
+# ================================
+# DATA EXPORT (form)
+# ================================
+@admin_required
+def data_export(request):
+
+    return render(request, "adminpanel/exports.html", {
+        "datasets": DATASETS.keys(),
+        "formats": FORMATS.keys(),
+        "statuses": Order.ORDER_STATUS_CHOICES,
+        "payment_statuses": Order.PAYMENT_STATUS_CHOICES,
+        "gateway_statuses": Payment.PAYMENT_STATUS,
+    })
+
+
+# ================================
+# DATA EXPORT (streamed CSV / JSONL)
+# ================================
+@admin_required
+def data_export_download(request, dataset):
+
+    fmt = request.GET.get("fmt", "csv")
+
+    if dataset not in DATASETS or fmt not in FORMATS:
+        raise Http404("Unknown export")
+
+    response = StreamingHttpResponse(
+        stream_export(dataset, fmt, request.GET),
+        content_type=FORMATS[fmt],
+    )
+
+    filename = f"{dataset}-{timezone.localdate():%Y%m%d}.{fmt}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    # Let proxies pass the chunks through as they come
+    response["X-Accel-Buffering"] = "no"
+
+    return response
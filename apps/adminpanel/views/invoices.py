@@ -0,0 +1,68 @@
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import render
+from django.utils import timezone
+
+from apps.adminpanel.decorators import admin_required
+from apps.adminpanel.exports import _date_range
+from apps.orders.invoices import get_export_progress, stream_invoice_zip
+from apps.orders.models import Order
+
+
+def _export_queryset(params):
+    qs = Order.objects.filter(
+        payment_status="paid",
+        **_date_range(params, "created_at"),
+    )
+
+    status = params.get("status")
+
+    if status:
+        qs = qs.filter(status=status)
+
+    return qs.order_by("id")
+
+
+# ================================
+# INVOICE EXPORT (form + progress)
+# ================================
+@admin_required
+def invoice_export(request):
+
+    qs = _export_queryset(request.GET)
+
+    return render(request, "adminpanel/orders/invoice_export.html", {
+        "statuses": Order.ORDER_STATUS_CHOICES,
+        "filters": request.GET,
+        "order_count": qs.count() if request.GET else None,
+    })
+
+
+# ================================
+# INVOICE EXPORT (streamed ZIP)
+# ================================
+@admin_required
+def invoice_export_download(request):
+
+    qs = _export_queryset(request.GET)
+
+    token = request.GET.get("token") or None
+
+    response = StreamingHttpResponse(
+        stream_invoice_zip(
+            qs.values_list("id", flat=True).iterator(chunk_size=2000),
+            total=qs.count(),
+            token=token,
+        ),
+        content_type="application/zip",
+    )
+
+    filename = f"invoices-{timezone.localdate():%Y%m%d}.zip"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    return response
+
+
+@admin_required
+def invoice_export_progress(request, token):
+
+    return JsonResponse(get_export_progress(token) or {"done": 0, "total": None})
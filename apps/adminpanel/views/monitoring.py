@@ -0,0 +1,29 @@
+from django.http import JsonResponse
+
+from apps.adminpanel.decorators import admin_required
+
+from surplus_store_project.metrics import cache_stats, job_stats, timing_stats
+
+
+@admin_required
+def cache_metrics(request):
+    """
+    Hit/miss counters of the page and catalog caches (for monitoring).
+    """
+    return JsonResponse({"caches": cache_stats()})
+
+
+@admin_required
+def latency_metrics(request):
+    """
+    Call counts, errors and latency of external calls (payment gateway).
+    """
+    return JsonResponse({"timings": timing_stats()})
+
+
+@admin_required
+def job_metrics(request):
+    """
+    Runs and work done by the periodic (beat) jobs.
+    """
+    return JsonResponse({"jobs": job_stats()})
@@ -1,12 +1,88 @@
+import re
+import uuid
+
 from django.http import JsonResponse
-from apps.catalog.models import ProductImage, ProductVariant
+from apps.catalog.models import ProductVariant
+from apps.catalog.services import resolve_display_images
 from django.contrib import messages
+from django.contrib.auth.models import User
 from django.shortcuts import render, get_object_or_404, redirect
-from django.core.paginator import Paginator
 from django.db.models import Q
 
 from apps.adminpanel.decorators import admin_required
-from apps.orders.models import Order
+from apps.orders.models import Order, OrderStatusBatch
+from apps.orders.state_machine import (
+    BULK_STATUS_LIMIT,
+    STATUS_LABELS,
+    allowed_targets,
+    bulk_transition,
+    transition,
+)
+from apps.payments.models import Payment
+from surplus_store_project.pagination import estimated_count, keyset_paginate
+
+
+ORDERS_PER_PAGE = 25
+
+# Newest first; id breaks created_at ties (keyset pagination)
+ORDER_LIST_ORDERING = ("-created_at", "-id")
+
+ORDER_ID_PREFIX = re.compile(r"^#?ORD-", re.IGNORECASE)
+UUID_PREFIX = re.compile(r"^[0-9a-f]{4,32}$")
+
+
+def _search_orders(qs, query):
+    """
+    Search terms by kind:
+
+        full uuid / "#ORD-1a2b3c4d" prefix   → uuid range (indexed)
+        email                                → customer email
+        order_… / pay_… / rfnd_…             → Razorpay ids (indexed)
+        bare hex ("1a2b3c4d", "cafe")        → uuid range or username
+        anything else                        → exact username (indexed)
+
+    The email match is case-insensitive (UPPER(email) = UPPER(%s)), which
+    auth_user has no index for: it scans the customers, not the orders.
+    """
+    term = ORDER_ID_PREFIX.sub("", query.strip())
+
+    if "@" in term:
+        return qs.filter(user__email__iexact=term)
+
+    if term.startswith("order_"):
+        return qs.filter(id__in=Payment.objects.filter(
+            razorpay_order_id=term).values("order_id"))
+
+    if term.startswith("pay_"):
+        # Ids first: OR-ing a subquery would rule out both indexes
+        order_ids = list(Payment.objects.filter(
+            razorpay_payment_id=term).values_list("order_id", flat=True))
+
+        return qs.filter(Q(razorpay_payment_id=term) | Q(id__in=order_ids))
+
+    if term.startswith("rfnd_"):
+        return qs.filter(razorpay_refund_id=term)
+
+    digits = term.replace("-", "").lower()
+
+    if UUID_PREFIX.match(digits):
+        # The list shows the first 8 characters of the uuid
+        uuid_range = Q(
+            uuid__gte=uuid.UUID(digits.ljust(32, "0")),
+            uuid__lte=uuid.UUID(digits.ljust(32, "f")),
+        )
+
+        if ORDER_ID_PREFIX.match(query.strip()) or len(digits) == 32:
+            return qs.filter(uuid_range)
+
+        # "cafe", "abcd1234" may just as well be usernames. Ids first:
+        # OR-ing the auth_user join would rule out the uuid index
+        user_ids = list(User.objects.filter(
+            username=term).values_list("id", flat=True))
+
+        return qs.filter(uuid_range | Q(user_id__in=user_ids))
+
+    return qs.filter(user__username=term)
 
 
 # ================================
@@ -15,25 +91,46 @@ from apps.orders.models import Order
 @admin_required
 def orders(request):
 
-    qs = Order.objects.select_related("user").order_by("-created_at")
+    qs = Order.objects.all()
 
     status = request.GET.get("status")
+    payment = request.GET.get("payment")
+    query = request.GET.get("q", "").strip()
+
+    # Old "unpaid" links
+    if status == "unpaid":
+        status, payment = None, "pending"
 
     if status:
         qs = qs.filter(status=status)
 
-    if status == "unpaid":
-        qs = qs.filter(payment_status="pending")
+    if payment:
+        qs = qs.filter(payment_status=payment)
+
+    if query:
+        qs = _search_orders(qs, query)
 
-    paginator = Paginator(qs, 10)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    # Cursor pages instead of OFFSET, estimated totals on large tables
+    page_obj = keyset_paginate(
+        qs.select_related("user"),
+        ORDER_LIST_ORDERING,
+        cursor=request.GET.get("after"),
+        page_size=ORDERS_PER_PAGE,
+        before=request.GET.get("before"),
+    )
+
+    total_count, total_exact = estimated_count(qs)
 
     return render(request, "adminpanel/orders/order_list.html", {
         "orders": page_obj,
         "page_obj": page_obj,
-        "paginator": paginator,
+        "total_count": total_count,
+        "total_exact": total_exact,
         "current_status": status,
+        "current_payment": payment,
+        "query": query,
+        "payment_statuses": Order.PAYMENT_STATUS_CHOICES,
+        "order_statuses": Order.ORDER_STATUS_CHOICES,
     })
 
 
@@ -48,35 +145,25 @@ def order_detail(request, order_id):
     order = get_object_or_404(Order, id=order_id)
 
     # 🔥 Attach product + image (cart-style)
-    items = order.items.all()
+    items = list(order.items.all())
+
+    # Variants may have been deleted since the order was placed
+    product_ids = dict(
+        ProductVariant.objects
+        .filter(id__in=[item.variant_id for item in items])
+        .values_list("id", "product_id")
+    )
+
+    display_images = resolve_display_images(
+        (product_ids.get(item.variant_id), item.color) for item in items
+    )
 
     for item in items:
-        variant = (
-            ProductVariant.objects
-            .select_related("product")
-            .filter(id=item.variant_id)
-            .first()
-        )
+        # ✅ Needed for URL
+        item.product_id = product_ids.get(item.variant_id)
 
-        if variant:
-            # ✅ Needed for URL
-            item.product_id = variant.product.id
-
-            # ✅ Image (cart style)
-            image = (
-                ProductImage.objects
-                .filter(
-                    variant__product=variant.product,
-                    variant__color=item.color
-                )
-                .order_by("-is_primary", "created_at")
-                .first()
-            )
-
-            item.display_image = image
-        else:
-            item.display_image = None
-            item.product_id = None
+        # ✅ Image (cart style)
+        item.display_image = display_images.get((item.product_id, item.color))
 
     # =========================
     # STATUS UPDATE LOGIC
@@ -84,40 +171,12 @@ def order_detail(request, order_id):
     if request.method == "POST":
         new_status = request.POST.get("status")
 
-        # ❌ Block cancelled
-        if order.status == "cancelled":
-            messages.error(request, "Cancelled orders cannot be modified")
-            return redirect("adminpanel:admin_order_detail", order_id=order.id)
+        error = transition(order, new_status)
 
-        VALID_TRANSITIONS = {
-            "pending": ["processing", "cancelled"],
-            "processing": ["shipped", "cancelled"],
-            "shipped": ["out_for_delivery"],
-            "out_for_delivery": ["delivered"],
-            "delivered": [],
-        }
-
-        current_status = order.status
-
-        if new_status not in VALID_TRANSITIONS.get(current_status, []):
-            messages.error(
-                request,
-                f"Invalid status change: {current_status} → {new_status}"
-            )
+        if error:
+            messages.error(request, error)
             return redirect("adminpanel:admin_order_detail", order_id=order.id)
 
-        # ❌ Prevent cancel without refund
-        if new_status == "cancelled" and order.payment_status == "paid":
-            if order.refund_status != "processed":
-                messages.error(
-                    request,
-                    "Cannot cancel a paid order without refund"
-                )
-                return redirect("adminpanel:admin_order_detail", order_id=order.id)
-
-        order.status = new_status
-        order.save(update_fields=["status"])
-
         messages.success(request, "Order status updated successfully")
 
         return redirect("adminpanel:admin_order_detail", order_id=order.id)
@@ -125,6 +184,9 @@ def order_detail(request, order_id):
     return render(request, "adminpanel/orders/order_detail.html", {
         "order": order,
         "items": items,   # 🔥 IMPORTANT
+        "next_statuses": [
+            (value, STATUS_LABELS[value]) for value in allowed_targets(order.status)
+        ],
     })
 
 
@@ -136,33 +198,93 @@ def update_order_status_ajax(request):
 
         order = get_object_or_404(Order, id=order_id)
 
-        # 🚫 BLOCK FINAL STATES
-        if order.status in ["cancelled", "delivered"]:
+        error = transition(order, new_status)
+
+        if error:
             return JsonResponse({
                 "success": False,
-                "message": "This order cannot be modified."
+                "message": error
             })
 
-        # ✅ VALID TRANSITIONS (basic safe version)
-        VALID_TRANSITIONS = {
-            "pending": ["processing", "cancelled"],
-            "processing": ["shipped", "cancelled"],
-            "shipped": ["out_for_delivery"],
-            "out_for_delivery": ["delivered"],
-        }
+        return JsonResponse({
+            "success": True,
+            "new_status": order.status
+        })
+
+    return JsonResponse({"success": False})
 
-        if new_status not in VALID_TRANSITIONS.get(order.status, []):
+
+# ================================
+# BULK STATUS UPDATE
+# ================================
+def _bulk_order_ids(data):
+    """
+    Order ids from the list checkboxes (order_ids) and / or pasted or
+    scanned order uuids (uuids, one per line). Returns (ids, unknown).
+    """
+    ids = []
+    unknown = []
+    uuids = []
+
+    for value in data.getlist("order_ids"):
+        try:
+            ids.append(int(value))
+        except ValueError:
+            unknown.append(value)
+
+    for line in re.split(r"[\s,]+", data.get("uuids", "")):
+        if not line:
+            continue
+
+        try:
+            uuids.append(uuid.UUID(ORDER_ID_PREFIX.sub("", line)))
+        except ValueError:
+            unknown.append(line)
+
+    if uuids:
+        found = dict(
+            Order.objects.filter(uuid__in=uuids).values_list("uuid", "id")
+        )
+
+        for value in uuids:
+            if value in found:
+                ids.append(found[value])
+            else:
+                unknown.append(str(value))
+
+    return ids, unknown
+
+
+@admin_required
+def bulk_order_status(request):
+
+    if request.method == "POST":
+        order_ids, unknown = _bulk_order_ids(request.POST)
+        new_status = request.POST.get("status")
+
+        if not order_ids:
             return JsonResponse({
                 "success": False,
-                "message": "Invalid status transition."
+                "message": "No orders selected",
+                "unknown": unknown,
             })
 
-        order.status = new_status
-        order.save()
+        try:
+            batch = bulk_transition(order_ids, new_status, user=request.user)
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)})
 
         return JsonResponse({
             "success": True,
-            "new_status": order.status
+            "batch_id": batch.id,
+            "requested": batch.requested,
+            "updated": batch.updated,
+            "results": batch.results,
+            "unknown": unknown,
         })
 
-    return JsonResponse({"success": False})
+    return render(request, "adminpanel/orders/bulk_status.html", {
+        "statuses": Order.ORDER_STATUS_CHOICES,
+        "limit": BULK_STATUS_LIMIT,
+        "batches": OrderStatusBatch.objects.select_related("user")[:20],
+    })
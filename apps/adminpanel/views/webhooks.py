@@ -0,0 +1,74 @@
+from django.contrib import messages
+from django.core.paginator import Paginator
+from django.db.models import Count
+from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.views.decorators.http import require_POST
+
+from apps.adminpanel.decorators import admin_required
+from apps.payments.models import WebhookEvent
+from apps.payments.tasks import enqueue_webhook_events
+
+
+# ================================
+# WEBHOOK INBOX
+# ================================
+@admin_required
+def webhook_events(request):
+
+    qs = WebhookEvent.objects.order_by("-id")
+
+    status = request.GET.get("status")
+
+    if status:
+        qs = qs.filter(status=status)
+
+    status_counts = dict(
+        WebhookEvent.objects
+        .order_by()
+        .values_list("status")
+        .annotate(count=Count("id"))
+    )
+
+    paginator = Paginator(qs, 20)
+    page_obj = paginator.get_page(request.GET.get("page"))
+
+    return render(request, "adminpanel/webhooks/event_list.html", {
+        "events": page_obj,
+        "page_obj": page_obj,
+        "paginator": paginator,
+        "current_status": status,
+        "statuses": WebhookEvent.STATUS,
+        "status_counts": status_counts,
+    })
+
+
+# ================================
+# REPLAY (dead / failed / processed)
+# ================================
+@admin_required
+@require_POST
+def replay_webhook_event(request, event_id):
+
+    event = get_object_or_404(WebhookEvent, id=event_id)
+
+    event.status = "received"
+    event.attempts = 0
+    event.next_attempt_at = None
+    event.last_error = ""
+    event.save(update_fields=[
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "last_error",
+    ])
+
+    enqueue_webhook_events(event.ordering_key)
+
+    messages.success(request, f"Event {event.event_id} queued for replay")
+
+    url = reverse("adminpanel:webhook_events")
+    status = request.POST.get("status")
+
+    return redirect(f"{url}?{urlencode({'status': status})}" if status else url)
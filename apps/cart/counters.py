@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from surplus_store_project import metrics
+
+from .models import WishlistItem, CartItem
+
+
+# ==============================
+# NAVBAR COUNTS (cached)
+# ==============================
+#
+# The navbar shows cart / wishlist badges on every page. The counts are
+# cached per user and dropped by every view that adds or removes cart or
+# wishlist items (and by the payment paths that clear the cart), so a
+# normal page render doesn't query them at all.
+
+NAV_COUNTS_CACHE_TTL = getattr(settings, "NAV_COUNTS_CACHE_TTL", 3600)
+
+# Badges show "10" at most
+NAV_COUNT_LIMIT = 10
+
+metrics.register_cache("cart.nav_counts")
+
+
+def _cache_key(user_id):
+    return f"cart:nav-counts:{user_id}"
+
+
+def get_nav_counts(user):
+    if not user.is_authenticated:
+        return {
+            "wishlist_count": 0,
+            "cart_count": 0,
+        }
+
+    key = _cache_key(user.id)
+
+    counts = cache.get(key)
+    metrics.record_cache_access("cart.nav_counts", hit=counts is not None)
+
+    if counts is None:
+        wishlist_count = WishlistItem.objects.filter(
+            wishlist__user=user
+        ).count()
+
+        cart_count = CartItem.objects.filter(
+            cart__user=user
+        ).count()
+
+        counts = {
+            "wishlist_count": min(wishlist_count, NAV_COUNT_LIMIT),
+            "cart_count": min(cart_count, NAV_COUNT_LIMIT),
+        }
+        cache.set(key, counts, NAV_COUNTS_CACHE_TTL)
+
+    return counts
+
+
+def invalidate_nav_counts(user_id):
+    """
+    Drop the cached counts once the current transaction commits (so a
+    concurrent render can't cache the pre-commit numbers again).
+    """
+    key = _cache_key(user_id)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -1,13 +1,9 @@
 from django.db import models
 from apps.catalog.models import ProductVariant , Product
 
-from decimal import Decimal
-
 from django.conf import settings
 
-from decimal import Decimal
-
-from .services import round_money
+from .services import round_money, items_subtotal
 
 User = settings.AUTH_USER_MODEL
 
@@ -28,10 +24,7 @@ class Cart(models.Model):
 
     @property
     def subtotal(self):
-        total = Decimal("0.00")
-        for item in self.items.all():
-            total += item.unit_price * item.quantity
-        return round_money(total)
+        return items_subtotal(self.items.all())
 
     @property
     def total(self):
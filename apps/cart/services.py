@@ -1,5 +1,7 @@
 from decimal import Decimal, ROUND_HALF_UP
 
+from django.db.models import Case, CharField, Count, F, Q, Value, When
+
 
 
 
@@ -30,23 +32,93 @@ def get_cart_item_status(cart_item):
     return CartItemStatus.VALID
 
 
+# ---------- SET-BASED (SQL) VARIANT OF get_cart_item_status ----------
+
+INVALID_STATUS_CONDITIONS = {
+    CartItemStatus.DISABLED: Q(variant__is_active=False),
+    CartItemStatus.OUT_OF_STOCK: Q(variant__is_active=True, variant__stock=0),
+    CartItemStatus.INSUFFICIENT_STOCK: Q(
+        variant__is_active=True,
+        variant__stock__gt=0,
+        quantity__gt=F("variant__stock"),
+    ),
+}
+
+INVALID_ITEM_CONDITION = (
+    INVALID_STATUS_CONDITIONS[CartItemStatus.DISABLED]
+    | INVALID_STATUS_CONDITIONS[CartItemStatus.OUT_OF_STOCK]
+    | INVALID_STATUS_CONDITIONS[CartItemStatus.INSUFFICIENT_STOCK]
+)
+
+ITEM_STATUS = Case(
+    *[
+        When(condition, then=Value(status))
+        for status, condition in INVALID_STATUS_CONDITIONS.items()
+    ],
+    default=Value(CartItemStatus.VALID),
+    output_field=CharField(),
+)
+
+
+def annotate_item_status(items):
+    """
+    Adds `line_status` (same values as get_cart_item_status) so callers
+    that load the lines anyway get the status without another query.
+    """
+    return items.annotate(line_status=ITEM_STATUS)
+
+
+def get_invalid_line_counts(cart):
+    """
+    {"disabled": n, "out_of_stock": n, "insufficient_stock": n} in ONE
+    aggregate query.
+    """
+    return cart.items.aggregate(**{
+        status: Count("id", filter=condition)
+        for status, condition in INVALID_STATUS_CONDITIONS.items()
+    })
+
+
 def is_cart_valid(cart):
-   
-    for item in cart.items.select_related("variant"):
-        if get_cart_item_status(item) != CartItemStatus.VALID:
-            return False
-    return True
+    return not any(get_invalid_line_counts(cart).values())
+
+
+def delete_invalid_items(cart):
+    """
+    Delete every invalid line in a single DELETE. Returns the count.
+    """
+    deleted, _ = cart.items.filter(INVALID_ITEM_CONDITION).delete()
+    return deleted
 
 
 def round_money(value: Decimal) -> Decimal:
     return value.quantize(Decimal("1"), rounding=ROUND_HALF_UP)
 
 
+def items_subtotal(items):
+    """
+    Snapshot subtotal of already loaded cart items (see Cart.subtotal).
+    """
+    total = Decimal("0.00")
+    for item in items:
+        total += item.unit_price * item.quantity
+    return round_money(total)
+
+
+def summarize_lines(lines):
+    """
+    (subtotal, checkout_allowed) of cart lines loaded through
+    annotate_item_status(), without another query.
+    """
+    lines = list(lines)
+
+    return items_subtotal(lines), all(
+        line.line_status == CartItemStatus.VALID for line in lines
+    )
+
+
 def can_proceed_to_checkout(cart):
     """
     Returns True only if ALL cart items are valid
     """
-    for item in cart.items.select_related("variant"):
-        if get_cart_item_status(item) != CartItemStatus.VALID:
-            return False
-    return True
+    return is_cart_valid(cart)
@@ -1,3 +1,219 @@
-from django.test import TestCase
+import threading
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.client import encode_multipart
+from django.urls import reverse
+
+from surplus_store_project.idempotency import idempotent
+
+from apps.catalog.models import ProductCategory, SubCategory, Product, ProductVariant
+
+from .counters import get_nav_counts
+from .models import Cart, CartItem
+
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class NavCountsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("shopper", "shopper@example.com", "pass")
+
+        category = ProductCategory.objects.create(
+            name="Tops", slug="tops", image="categories/tops.jpg",
+        )
+        subcategory = SubCategory.objects.create(
+            category=category,
+            name="Tees",
+            slug="tees",
+            image="categories/tees.jpg",
+            price_per_kg=Decimal("800.00"),
+        )
+        cls.product = Product.objects.create(
+            subcategory=subcategory,
+            name="Washed Tee",
+            slug="washed-tee",
+            description="Surplus lot",
+            size_type="TOP",
+        )
+        cls.variant = ProductVariant.objects.create(
+            product=cls.product,
+            color="Black",
+            size="M",
+            size_order=ProductVariant.SIZE_ORDER_MAP["M"],
+            weight_kg=Decimal("0.250"),
+            stock=5,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def add_cart_item(self):
+        cart, _ = Cart.objects.get_or_create(user=self.user)
+        return CartItem.objects.create(
+            cart=cart,
+            variant=self.variant,
+            quantity=1,
+            product_name=self.product.name,
+            color=self.variant.color,
+            size=self.variant.size,
+            weight_kg=self.variant.weight_kg,
+            price_per_kg=Decimal("800.00"),
+            unit_price=Decimal("200.00"),
+        )
+
+    def test_counts_are_cached_after_first_lookup(self):
+        self.add_cart_item()
+
+        with self.assertNumQueries(2):
+            counts = get_nav_counts(self.user)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_nav_counts(self.user), counts)
+
+        self.assertEqual(counts, {"wishlist_count": 0, "cart_count": 1})
+
+    def test_second_page_render_skips_count_queries(self):
+        url = reverse("cart:wishlist")
+
+        self.client.get(url)  # session, templates, counts cached
+
+        with self.assertNumQueries(3):  # session, user, wishlist
+            response = self.client.get(url)
+
+        self.assertEqual(response.context["cart_count"], 0)
+
+    def test_add_to_cart_invalidates_after_commit(self):
+        self.assertEqual(get_nav_counts(self.user)["cart_count"], 0)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                reverse("cart:add_to_cart"), {"variant_id": self.variant.id},
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+        # Still the cached number until the transaction commits
+        self.assertEqual(get_nav_counts(self.user)["cart_count"], 0)
+
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(get_nav_counts(self.user)["cart_count"], 1)
+
+    def test_remove_from_cart_invalidates_after_commit(self):
+        item = self.add_cart_item()
+        self.assertEqual(get_nav_counts(self.user)["cart_count"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("cart:cart_remove"), {"item_id": item.id},
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_nav_counts(self.user)["cart_count"], 0)
+
+    def test_wishlist_toggle_invalidates_after_commit(self):
+        self.assertEqual(get_nav_counts(self.user)["wishlist_count"], 0)
+
+        url = reverse("cart:toggle_wishlist")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {"product_id": self.product.id})
+
+        self.assertEqual(get_nav_counts(self.user)["wishlist_count"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {"product_id": self.product.id})
+
+        self.assertEqual(get_nav_counts(self.user)["wishlist_count"], 0)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class IdempotencyTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+        @idempotent
+        def view(request):
+            self.calls.append(dict(request.POST.items()))
+            self.started.set()
+            self.release.wait(timeout=10)
+            return JsonResponse({"call": len(self.calls)})
+
+        self.view = view
+
+    def post(self, data, key="key-1", boundary="BoundaryA"):
+        """
+        A FormData post: every browser retry picks a new boundary.
+        """
+        request = RequestFactory().post(
+            "/cart/add/",
+            data=encode_multipart(boundary, data),
+            content_type=f"multipart/form-data; boundary={boundary}",
+            headers={"Idempotency-Key": key},
+        )
+        request.user = User(pk=1, username="shopper")
+        return self.view(request)
+
+    def test_retry_replays_stored_response(self):
+        first = self.post({"variant_id": "7", "csrfmiddlewaretoken": "a"})
+        retry = self.post(
+            {"variant_id": "7", "csrfmiddlewaretoken": "b"}, boundary="BoundaryB",
+        )
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry.content, first.content)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+
+    def test_key_reused_for_other_fields(self):
+        self.post({"variant_id": "7"})
+
+        response = self.post({"variant_id": "8"}, boundary="BoundaryB")
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_concurrent_duplicate_waits_for_first(self):
+        self.release.clear()
+        responses = {}
+
+        first = threading.Thread(target=lambda: responses.update(
+            first=self.post({"variant_id": "7"})
+        ))
+        first.start()
+        self.assertTrue(self.started.wait(timeout=10))
+
+        second = threading.Thread(target=lambda: responses.update(
+            second=self.post({"variant_id": "7"}, boundary="BoundaryB")
+        ))
+        second.start()
+
+        # Waiting on the key's lock, not running the view
+        second.join(timeout=0.3)
+        self.assertTrue(second.is_alive())
+
+        self.release.set()
+        first.join(timeout=10)
+        second.join(timeout=10)
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(responses["second"].content, responses["first"].content)
+        self.assertEqual(responses["second"]["Idempotent-Replayed"], "true")
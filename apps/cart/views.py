@@ -6,33 +6,22 @@ from django.http import JsonResponse
 
 from .models import Cart, CartItem, Wishlist, WishlistItem
 
-from apps.catalog.models import Product, ProductVariant, ProductImage
+from apps.catalog.models import Product, ProductVariant
+from apps.catalog.services import resolve_display_images
+from apps.catalog.inventory import get_available_stock
 
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 
-from .services import get_cart_item_status, CartItemStatus
+from .services import CartItemStatus, annotate_item_status, items_subtotal, summarize_lines
 
 from django.db.models import Prefetch
 
-from .services import can_proceed_to_checkout
+from .services import delete_invalid_items
 
-from .services import is_cart_valid
+from .counters import invalidate_nav_counts
 
-
-def get_nav_counts(user):
-    wishlist_count = WishlistItem.objects.filter(
-        wishlist__user=user
-    ).count()
-
-    cart_count = CartItem.objects.filter(
-        cart__user=user
-    ).count()
-
-    return {
-        "wishlist_count": min(wishlist_count, 10),
-        "cart_count": min(cart_count, 10),
-    }
+from surplus_store_project.idempotency import idempotent
 
 
 @login_required(login_url="accounts:login")
@@ -41,14 +30,20 @@ def cart_view(request):
     items = []
 
     if cart:
-        for item in cart.items.select_related(
+        items = list(annotate_item_status(cart.items.select_related(
             "variant",
             "variant__product",
             "variant__product__subcategory",
             "variant__product__subcategory__category",
-        ):
+        )))
 
-            status = get_cart_item_status(item)
+        # Image resolution (one query for the whole cart)
+        display_images = resolve_display_images(
+            (item.variant.product_id, item.color) for item in items
+        )
+
+        for item in items:
+            status = item.line_status
             item.status = status
             item.is_out_of_stock = (status == CartItemStatus.OUT_OF_STOCK)
 
@@ -65,25 +60,22 @@ def cart_view(request):
             # 🔥 Attach variant query param
             item.product_url = f"{base_url}?variant={item.variant.id}"
 
-            # Image resolution
-            item.display_image = (
-                ProductImage.objects
-                .filter(
-                    variant__product=item.variant.product,
-                    variant__color=item.color,
-                )
-                .order_by("-is_primary", "created_at")
-                .first()
+            item.display_image = display_images.get(
+                (item.variant.product_id, item.color)
             )
 
-            items.append(item)
+    # Status + subtotal from the lines already loaded (no extra queries)
+    subtotal = items_subtotal(items)
 
     context = {
         "cart": cart,
         "cart_items": items,
-        "checkout_allowed": can_proceed_to_checkout(cart),
-        "cart_subtotal": cart.subtotal if cart else Decimal("0.00"),
-        "cart_total": cart.total if cart else Decimal("0.00"),
+        "checkout_allowed": all(
+            item.status == CartItemStatus.VALID for item in items
+        ),
+        "cart_subtotal": subtotal,
+        # shipping is FREE for now (see Cart.total)
+        "cart_total": subtotal,
         "shipping_cost": "FREE",
     }
 
@@ -93,6 +85,7 @@ def cart_view(request):
 
 
 @login_required(login_url='accounts:login')
+@idempotent
 def add_to_cart(request):
     if request.method != "POST":
         return JsonResponse({"error": "Invalid method"}, status=405)
@@ -108,7 +101,10 @@ def add_to_cart(request):
         is_active=True
     )
 
-    if variant.stock < 1:
+    # Stock held by other customers' pending orders is not available
+    available = get_available_stock([variant])[variant.id]
+
+    if available < 1:
         return JsonResponse(
             {"error": "This item is out of stock"},
             status=409
@@ -122,9 +118,9 @@ def add_to_cart(request):
     ).first()
 
     if cart_item:
-        if cart_item.quantity + 1 > variant.stock:
+        if cart_item.quantity + 1 > available:
             return JsonResponse(
-                {"error": f"Only {variant.stock} pieces available"},
+                {"error": f"Only {available} pieces available"},
                 status=409
             )
 
@@ -148,6 +144,7 @@ def add_to_cart(request):
             price_per_kg=price_per_kg,
             unit_price=unit_price,
         )
+        invalidate_nav_counts(request.user.id)
 
     # -------------------------------------------------
     # ✅ WISHLIST → CART (SESSION-BASED, PRODUCT-LEVEL)
@@ -159,6 +156,7 @@ def add_to_cart(request):
             wishlist__user=request.user,
             product_id=move_product_id
         ).delete()
+        invalidate_nav_counts(request.user.id)
 
         # 🔒 Clear intent after successful move
         del request.session["move_to_cart_product_id"]
@@ -167,6 +165,7 @@ def add_to_cart(request):
 
 
 @login_required(login_url='accounts:login')
+@idempotent
 def update_cart_item(request):
     if request.method != "POST":
         return JsonResponse({"error": "Invalid method"}, status=405)
@@ -178,7 +177,9 @@ def update_cart_item(request):
         return JsonResponse({"error": "Invalid input"}, status=400)
 
     cart = get_object_or_404(Cart, user=request.user)
-    item = get_object_or_404(CartItem, id=item_id, cart=cart)
+    item = get_object_or_404(
+        CartItem.objects.select_related("variant"), id=item_id, cart=cart
+    )
 
     if action == "decrease":
         if item.quantity <= 1:
@@ -186,26 +187,37 @@ def update_cart_item(request):
         item.quantity -= 1
 
     elif action == "increase":
-        if item.quantity + 1 > item.variant.stock:
+        available = get_available_stock([item.variant])[item.variant_id]
+
+        if item.quantity + 1 > available:
             return JsonResponse(
-                {"error": f"Only {item.variant.stock} pieces available"},
+                {"error": f"Only {available} pieces available"},
                 status=409
             )
         item.quantity += 1
 
     item.save(update_fields=["quantity"])
 
+    # Every line once, with its status; totals and validity come from it
+    lines = list(annotate_item_status(cart.items.all()))
+    subtotal, checkout_allowed = summarize_lines(lines)
+
+    status = next(
+        line.line_status for line in lines if line.id == item.id
+    )
+
     return JsonResponse({
         "success": True,
         "quantity": item.quantity,
-        "status": get_cart_item_status(item),
+        "status": status,
 
         # ✅ CORRECT
         "item_line_total": str(item.display_line_total),
 
-        "cart_subtotal": str(cart.subtotal),
-        "cart_total": str(cart.total),
-        "checkout_allowed": is_cart_valid(cart),
+        "cart_subtotal": str(subtotal),
+        # shipping is FREE for now (see Cart.total)
+        "cart_total": str(subtotal),
+        "checkout_allowed": checkout_allowed,
     })
 
 
@@ -227,6 +239,7 @@ def remove_cart_item(request):
     item = get_object_or_404(CartItem, id=item_id, cart=cart)
 
     item.delete()
+    invalidate_nav_counts(request.user.id)
 
     return JsonResponse({"success": True})
 
@@ -235,19 +248,23 @@ def remove_cart_item(request):
 def remove_invalid_items(request):
     cart = get_object_or_404(Cart, user=request.user)
 
-    removed = False
+    # One DELETE for every invalid line
+    removed = delete_invalid_items(cart) > 0
+
+    if removed:
+        invalidate_nav_counts(request.user.id)
 
-    for item in cart.items.select_related("variant"):
-        if get_cart_item_status(item) != CartItemStatus.VALID:
-            item.delete()
-            removed = True
+    subtotal, checkout_allowed = summarize_lines(
+        annotate_item_status(cart.items.all())
+    )
 
     return JsonResponse({
         "success": True,
         "removed": removed,
-        "cart_subtotal": str(cart.subtotal),
-        "cart_total": str(cart.total),
-        "checkout_allowed": is_cart_valid(cart),
+        "cart_subtotal": str(subtotal),
+        # shipping is FREE for now (see Cart.total)
+        "cart_total": str(subtotal),
+        "checkout_allowed": checkout_allowed,
     })
 
 
@@ -298,6 +315,7 @@ def toggle_wishlist(request):
 
     if wishlist_item:
         wishlist_item.delete()
+        invalidate_nav_counts(request.user.id)
         return JsonResponse({
             "success": True,
             "action": "removed"
@@ -307,6 +325,7 @@ def toggle_wishlist(request):
         wishlist=wishlist,
         product=product
     )
+    invalidate_nav_counts(request.user.id)
 
     return JsonResponse({
         "success": True,
@@ -327,5 +346,6 @@ def remove_from_wishlist(request):
         id=item_id,
         wishlist__user=request.user
     ).delete()
+    invalidate_nav_counts(request.user.id)
 
     return JsonResponse({"success": True})
@@ -8,6 +8,8 @@ from .models import (
     Product,
     ProductVariant,
     ProductImage,
+    InventoryMovement,
+    StockReservation,
 )
 
 
@@ -185,3 +187,50 @@ class ProductImageAdmin(admin.ModelAdmin):
         return "—"
 
     image_preview.short_description = "Image"
+
+
+
+@admin.register(InventoryMovement)
+class InventoryMovementAdmin(admin.ModelAdmin):
+    list_display = (
+        "variant",
+        "reason",
+        "requested",
+        "change",
+        "stock_after",
+        "reference",
+        "created_at",
+    )
+
+    list_filter = (
+        "reason",
+        "created_at",
+    )
+
+    search_fields = (
+        "reference",
+    )
+
+    raw_id_fields = (
+        "variant",
+    )
+
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = (
+        "variant",
+        "quantity",
+        "reference",
+        "expires_at",
+        "created_at",
+    )
+
+    search_fields = (
+        "reference",
+    )
+
+    raw_id_fields = (
+        "variant",
+    )
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+
+from surplus_store_project.cache import get_tag_version, get_tag_versions, invalidate_tags
+
+
+# Cache backend used for catalog data (settings.CACHES alias)
+CATALOG_CACHE_ALIAS = getattr(settings, "CATALOG_CACHE_ALIAS", "default")
+
+cache = ConnectionProxy(caches, CATALOG_CACHE_ALIAS)
+
+
+# ==============================
+# SUBCATEGORY CACHE VERSIONS
+# ==============================
+#
+# Cached catalog data (facet counts, product pages, …) embeds the version
+# of its subcategory in the cache key. Bumping the version invalidates
+# every entry of that subcategory at once without having to find the keys.
+#
+# "all" is the storewide listing; it is bumped with every subcategory.
+
+STOREWIDE = "all"
+
+
+def _subcategory_tag(subcategory_id):
+    return f"catalog:subcategory:{subcategory_id}"
+
+
+def get_subcategory_version(subcategory_id):
+    return get_tag_version(_subcategory_tag(subcategory_id or STOREWIDE))
+
+
+def bump_subcategory_versions(subcategory_ids):
+    invalidate_tags(*[
+        _subcategory_tag(subcategory_id)
+        for subcategory_id in set(subcategory_ids) | {STOREWIDE}
+    ])
+
+
+# ==============================
+# PRODUCT CACHE VERSIONS
+# ==============================
+#
+# A product page also embeds the version of the product itself, so a
+# change that only that page shows (e.g. a variant's stock after a sale)
+# invalidates one product instead of the whole subcategory.
+
+def _product_tag(product_id):
+    return f"catalog:product:{product_id}"
+
+
+def get_product_versions(subcategory_id, product_id):
+    """
+    (subcategory version, product version) in one cache round trip.
+    """
+    return tuple(get_tag_versions([
+        _subcategory_tag(subcategory_id or STOREWIDE),
+        _product_tag(product_id),
+    ]))
+
+
+def bump_product_versions(product_ids):
+    invalidate_tags(*[_product_tag(product_id) for product_id in product_ids])
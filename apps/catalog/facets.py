@@ -0,0 +1,268 @@
+import hashlib
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import (
+    Case,
+    CharField,
+    Count,
+    DecimalField,
+    Exists,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Q,
+    Value,
+    When,
+)
+
+from surplus_store_project import metrics
+
+from .cache import cache, get_subcategory_version
+from .models import Product, ProductVariant, TOP_SIZES, WAIST_SIZES
+from .search import normalize_query, search_condition
+
+
+# ==============================
+# FACETED FILTERING
+# ==============================
+#
+# Filters apply to a single variant: "size M in Black under ₹500" means
+# one variant that is all three. Counts are "number of products" and are
+# disjunctive: each facet is counted with every OTHER selected filter
+# applied, so picking a size still shows the other sizes' counts.
+#
+# All four facets are counted in ONE query (UNION ALL of four grouped
+# aggregates) and cached per subcategory + filter combination + search.
+# On a search results page only the products matching the search are
+# counted, so the numbers agree with the listed results.
+
+FACETS_CACHE_TTL = getattr(settings, "CATALOG_FACETS_CACHE_TTL", 600)
+
+FACET_PARAMS = ("size", "color", "price", "weight")
+
+metrics.register_cache("catalog.facets")
+
+# key, label, lower bound (inclusive), upper bound (exclusive)
+PRICE_RANGES = [
+    ("0-500", "Under ₹500", Decimal("0"), Decimal("500")),
+    ("500-1000", "₹500 - ₹1000", Decimal("500"), Decimal("1000")),
+    ("1000-", "Over ₹1000", Decimal("1000"), None),
+]
+
+WEIGHT_RANGES = [
+    ("0-0.5", "Under 0.5 KG", Decimal("0"), Decimal("0.5")),
+    ("0.5-1", "0.5 - 1 KG", Decimal("0.5"), Decimal("1")),
+    ("1-", "Over 1 KG", Decimal("1"), None),
+]
+
+SIZE_ORDER = {size: index for index, size in enumerate(TOP_SIZES + WAIST_SIZES)}
+
+UNIT_PRICE = ExpressionWrapper(
+    F("weight_kg") * F("product__subcategory__price_per_kg"),
+    output_field=DecimalField(max_digits=12, decimal_places=4),
+)
+
+
+def parse_filters(params):
+    """
+    Keep only recognised, well-formed facet values from request.GET.
+    """
+    filters = {}
+
+    size = params.get("size", "").strip().upper()
+    if size in SIZE_ORDER:
+        filters["size"] = size
+
+    color = params.get("color", "").strip()
+    if color:
+        filters["color"] = color[:50]
+
+    if params.get("price") in {key for key, *_ in PRICE_RANGES}:
+        filters["price"] = params["price"]
+
+    if params.get("weight") in {key for key, *_ in WEIGHT_RANGES}:
+        filters["weight"] = params["weight"]
+
+    return filters
+
+
+def _range_q(field, ranges, key):
+    for range_key, _, low, high in ranges:
+        if range_key == key:
+            q = Q(**{f"{field}__gte": low})
+            if high is not None:
+                q &= Q(**{f"{field}__lt": high})
+            return q
+    return Q()
+
+
+def _variant_q(filters, exclude=None):
+    q = Q()
+
+    if "size" in filters and exclude != "size":
+        q &= Q(size=filters["size"])
+
+    if "color" in filters and exclude != "color":
+        q &= Q(color__iexact=filters["color"])
+
+    if "price" in filters and exclude != "price":
+        q &= _range_q("unit_price", PRICE_RANGES, filters["price"])
+
+    if "weight" in filters and exclude != "weight":
+        q &= _range_q("weight_kg", WEIGHT_RANGES, filters["weight"])
+
+    return q
+
+
+def _available_variants(subcategory=None):
+    variants = ProductVariant.objects.filter(
+        is_active=True,
+        stock__gt=0,
+        product__listing__is_sellable=True,
+        product__subcategory__is_active=True,
+        product__subcategory__category__is_active=True,
+    ).annotate(unit_price=UNIT_PRICE)
+
+    if subcategory is not None:
+        variants = variants.filter(product__subcategory=subcategory)
+
+    return variants
+
+
+def filter_products(products, filters):
+    """
+    Narrow a product queryset to products with an available variant
+    matching every selected filter (EXISTS, no join fan-out).
+    """
+    if not filters:
+        return products
+
+    matching = _available_variants().filter(
+        _variant_q(filters),
+        product=OuterRef("pk"),
+    )
+
+    return products.filter(Exists(matching))
+
+
+def _bucket(field, ranges):
+    whens = []
+    for key, _, low, high in ranges:
+        condition = Q(**{f"{field}__gte": low})
+        if high is not None:
+            condition &= Q(**{f"{field}__lt": high})
+        whens.append(When(condition, then=Value(key)))
+    return Case(*whens, default=Value(""), output_field=CharField())
+
+
+def _count_facets(subcategory, filters, q=""):
+    base = _available_variants(subcategory)
+
+    if q:
+        products = Product.objects.filter(
+            listing__is_sellable=True,
+            subcategory__is_active=True,
+            subcategory__category__is_active=True,
+        )
+        if subcategory is not None:
+            products = products.filter(subcategory=subcategory)
+
+        condition = search_condition(products, q)
+        base = base.filter(product__in=products.filter(condition).values("id"))
+
+    values = {
+        "size": F("size"),
+        "color": F("color"),
+        "price": _bucket("unit_price", PRICE_RANGES),
+        "weight": _bucket("weight_kg", WEIGHT_RANGES),
+    }
+
+    branches = [
+        base
+        .filter(_variant_q(filters, exclude=facet))
+        .annotate(
+            facet=Value(facet, output_field=CharField()),
+            value=values[facet],
+        )
+        .order_by()
+        .values("facet", "value")
+        .annotate(count=Count("product_id", distinct=True))
+        for facet in FACET_PARAMS
+    ]
+
+    counts = {facet: {} for facet in FACET_PARAMS}
+    for row in branches[0].union(*branches[1:], all=True):
+        if row["value"]:
+            counts[row["facet"]][row["value"]] = row["count"]
+
+    return counts
+
+
+def get_facet_counts(subcategory, filters, q=""):
+    """
+    {"size": {"M": 12, ...}, "color": {...}, "price": {...}, "weight": {...}}
+    """
+    subcategory_id = subcategory.id if subcategory else None
+    version = get_subcategory_version(subcategory_id)
+
+    q = normalize_query(q)
+
+    signature = "&".join(f"{k}={filters[k]}" for k in sorted(filters))
+    signature += f"&q={q.lower()}"
+    cache_key = "catalog:facets:{}:{}:{}".format(
+        subcategory_id or "all",
+        version,
+        hashlib.md5(signature.encode()).hexdigest(),
+    )
+
+    counts = cache.get(cache_key)
+    metrics.record_cache_access("catalog.facets", hit=counts is not None)
+
+    if counts is None:
+        counts = _count_facets(subcategory, filters, q)
+        cache.set(cache_key, counts, FACETS_CACHE_TTL)
+
+    return counts
+
+
+def build_facets(subcategory, filters, params, q=""):
+    """
+    Template-ready facets: for every facet, its options with count,
+    selected flag and a URL that toggles the option (other params kept).
+    """
+    counts = get_facet_counts(subcategory, filters, q)
+
+    def option(facet, value, label):
+        query = params.copy()
+        query.pop("cursor", None)
+
+        selected = filters.get(facet) == value
+        if selected:
+            query.pop(facet, None)
+        else:
+            query[facet] = value
+
+        return {
+            "value": value,
+            "label": label,
+            "count": counts[facet].get(value, 0),
+            "selected": selected,
+            "query": query.urlencode(),
+        }
+
+    colors = sorted(counts["color"], key=str.lower)
+    sizes = sorted(counts["size"], key=lambda size: SIZE_ORDER.get(size, 999))
+
+    return {
+        "size": [option("size", size, size) for size in sizes],
+        "color": [option("color", color, color) for color in colors],
+        "price": [
+            option("price", key, label)
+            for key, label, *_ in PRICE_RANGES
+        ],
+        "weight": [
+            option("weight", key, label)
+            for key, label, *_ in WEIGHT_RANGES
+        ],
+    }
@@ -0,0 +1,371 @@
+from collections import Counter
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Min, PositiveIntegerField, Q, Sum, When
+from django.utils import timezone
+
+from surplus_store_project.metrics import record_cache_access, register_cache
+
+from .cache import cache
+from .models import ProductVariant, InventoryMovement, StockReservation
+from .services import schedule_listing_refresh
+
+
+# ==============================
+# INVENTORY (bulk stock changes)
+# ==============================
+#
+# decrement_stock() takes every line of an order at once:
+#
+#   1. one SELECT ... FOR UPDATE of all its variants, ORDER BY id — every
+#      caller locks in the same order, so overlapping orders queue up
+#      instead of deadlocking
+#   2. one conditional UPDATE (stock = stock - qty WHERE stock >= qty)
+#   3. one INSERT of the ledger rows (InventoryMovement)
+#
+# A line is applied completely or not at all; lines that cannot be
+# served are returned (and recorded) as shortfalls instead of being
+# skipped silently.
+#
+# ---------- RESERVATIONS ----------
+#
+# Placing an order holds its quantities (StockReservation) for the
+# pending-order window, so two customers can't both pay for the last
+# piece. Available stock = stock - live holds of OTHER orders. Holds are
+# taken under the same variant locks as the decrement, consumed when the
+# order is paid, and deleted on cancellation or by the beat job once
+# expired.
+
+PENDING_ORDER_MINUTES = getattr(settings, "PENDING_ORDER_MINUTES", 30)
+
+# Upper bound for the cached reserved quantity of a variant
+RESERVED_CACHE_TTL = getattr(settings, "INVENTORY_RESERVED_CACHE_TTL", 60)
+
+register_cache("inventory.reserved")
+
+
+@dataclass(frozen=True)
+class Shortfall:
+    variant_id: int
+    requested: int
+    available: int   # 0 when the variant no longer exists
+
+
+@dataclass(frozen=True)
+class StockResult:
+    applied: dict      # {variant_id: quantity}
+    shortfalls: tuple  # (Shortfall, ...)
+
+
+def _requested(lines):
+    requested = Counter()
+    for variant_id, quantity in lines:
+        requested[variant_id] += quantity
+    return requested
+
+
+def _lock_variants(variant_ids):
+    """
+    {variant_id: (stock, product_id)}, rows locked in id order.
+    """
+    return {
+        variant_id: (stock, product_id)
+        for variant_id, stock, product_id in (
+            ProductVariant.objects
+            .select_for_update()
+            .filter(id__in=variant_ids)
+            .order_by("id")
+            .values_list("id", "stock", "product_id")
+        )
+    }
+
+
+def _held_by_others(variant_ids, reference):
+    return dict(
+        StockReservation.objects
+        .filter(variant_id__in=variant_ids, expires_at__gt=timezone.now())
+        .exclude(reference=reference)
+        .order_by()
+        .values_list("variant_id")
+        .annotate(total=Sum("quantity"))
+    )
+
+
+def _split(requested, locked, held):
+    applied = {}
+    shortfalls = []
+
+    for variant_id in sorted(requested):
+        quantity = requested[variant_id]
+        stock = locked.get(variant_id, (0, None))[0]
+        available = max(stock - held.get(variant_id, 0), 0)
+
+        if variant_id in locked and available >= quantity:
+            applied[variant_id] = quantity
+        else:
+            shortfalls.append(Shortfall(variant_id, quantity, available))
+
+    return applied, shortfalls
+
+
+def _invalidate_reserved(variant_ids):
+    keys = [f"inventory:reserved:{variant_id}" for variant_id in variant_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+@transaction.atomic
+def decrement_stock(lines, reason="sale", reference=""):
+    """
+    `lines`: iterable of (variant_id, quantity); repeated variants are
+    summed. Consumes the holds of `reference`; holds of other orders are
+    not available. Returns a StockResult.
+    """
+    requested = _requested(lines)
+
+    if not requested:
+        return StockResult(applied={}, shortfalls=())
+
+    # -------------------------------------------------
+    # 1️⃣ LOCK (stable order)
+    # -------------------------------------------------
+    locked = _lock_variants(requested)
+
+    applied, shortfalls = _split(
+        requested, locked, _held_by_others(requested, reference),
+    )
+
+    # -------------------------------------------------
+    # 2️⃣ ONE CONDITIONAL UPDATE
+    # -------------------------------------------------
+    if applied:
+        updated = (
+            ProductVariant.objects
+            .filter(reduce(or_, [
+                Q(id=variant_id, stock__gte=quantity)
+                for variant_id, quantity in applied.items()
+            ]))
+            .update(
+                stock=Case(
+                    *[
+                        When(id=variant_id, then=F("stock") - quantity)
+                        for variant_id, quantity in applied.items()
+                    ],
+                    default=F("stock"),
+                    output_field=PositiveIntegerField(),
+                ),
+                updated_at=timezone.now(),
+            )
+        )
+
+        # Rows are locked above, so the guard can only fail on a bug
+        if updated != len(applied):
+            raise RuntimeError("Inventory changed under lock")
+
+    # -------------------------------------------------
+    # 3️⃣ LEDGER
+    # -------------------------------------------------
+    movements = [
+        InventoryMovement(
+            variant_id=variant_id,
+            reason=reason,
+            requested=quantity,
+            change=-quantity,
+            stock_after=locked[variant_id][0] - quantity,
+            reference=reference,
+        )
+        for variant_id, quantity in applied.items()
+    ] + [
+        InventoryMovement(
+            variant_id=shortfall.variant_id,
+            reason="shortfall",
+            requested=shortfall.requested,
+            change=0,
+            stock_after=locked[shortfall.variant_id][0],
+            reference=reference,
+        )
+        for shortfall in shortfalls
+        if shortfall.variant_id in locked
+    ]
+
+    InventoryMovement.objects.bulk_create(movements)
+
+    for shortfall in shortfalls:
+        print(
+            f"[INVENTORY] SHORTFALL {reference}: variant {shortfall.variant_id} "
+            f"requested {shortfall.requested}, available {shortfall.available}"
+        )
+
+    # -------------------------------------------------
+    # 4️⃣ CONSUME THE ORDER'S HOLDS
+    # -------------------------------------------------
+    if reference:
+        release_reservations(reference)
+
+    # .update() skips the signals that keep listing summaries in sync.
+    # Only a variant running out changes what listings and facets show.
+    schedule_listing_refresh(
+        (locked[variant_id][1] for variant_id in applied),
+        sold_out={
+            locked[variant_id][1]
+            for variant_id, quantity in applied.items()
+            if locked[variant_id][0] == quantity
+        },
+    )
+
+    return StockResult(applied=applied, shortfalls=tuple(shortfalls))
+
+
+# ==============================
+# RESERVATIONS
+# ==============================
+
+def reservation_expiry(created_at=None):
+    return (created_at or timezone.now()) + timedelta(minutes=PENDING_ORDER_MINUTES)
+
+
+@transaction.atomic
+def reserve_stock(lines, reference, expires_at=None):
+    """
+    Hold every line for `reference` (all or nothing) until `expires_at`.
+    Existing holds of the reference are replaced. Returns a StockResult;
+    nothing is held when it has shortfalls.
+    """
+    requested = _requested(lines)
+
+    locked = _lock_variants(requested)
+
+    applied, shortfalls = _split(
+        requested, locked, _held_by_others(requested, reference),
+    )
+
+    if shortfalls:
+        return StockResult(applied={}, shortfalls=tuple(shortfalls))
+
+    release_reservations(reference)
+
+    StockReservation.objects.bulk_create([
+        StockReservation(
+            variant_id=variant_id,
+            quantity=quantity,
+            reference=reference,
+            expires_at=expires_at or reservation_expiry(),
+        )
+        for variant_id, quantity in applied.items()
+    ])
+
+    _invalidate_reserved(applied)
+
+    return StockResult(applied=applied, shortfalls=())
+
+
+def release_reservations(*references):
+    """
+    Drop the holds of one or more references (order paid, cancelled or
+    replaced). Returns the number of holds deleted.
+    """
+    holds = StockReservation.objects.filter(reference__in=references)
+
+    variant_ids = list(holds.values_list("variant_id", flat=True))
+
+    if not variant_ids:
+        return 0
+
+    deleted, _ = holds.delete()
+
+    _invalidate_reserved(variant_ids)
+
+    return deleted
+
+
+def release_expired_reservations(batch_size=5000):
+    """
+    Bulk-delete expired holds (beat). Returns the number released.
+    """
+    now = timezone.now()
+    released = 0
+
+    while True:
+        expired = list(
+            StockReservation.objects
+            .filter(expires_at__lte=now)
+            .order_by("id")
+            .values_list("id", "variant_id")[:batch_size]
+        )
+
+        if not expired:
+            return released
+
+        with transaction.atomic():
+            deleted, _ = StockReservation.objects.filter(
+                id__in=[reservation_id for reservation_id, _ in expired]
+            ).delete()
+
+            _invalidate_reserved({variant_id for _, variant_id in expired})
+
+        released += deleted
+
+
+# ---------- AVAILABLE STOCK (fast path) ----------
+
+def get_reserved_quantities(variant_ids):
+    """
+    {variant_id: quantity held by live reservations}, from the cache.
+    Misses are computed in one query and cached until the earliest of
+    their holds expires (at most RESERVED_CACHE_TTL).
+    """
+    keys = {
+        f"inventory:reserved:{variant_id}": variant_id
+        for variant_id in set(variant_ids)
+    }
+
+    reserved = {
+        keys[key]: value
+        for key, value in cache.get_many(list(keys)).items()
+    }
+
+    missing = set(keys.values()) - reserved.keys()
+    record_cache_access("inventory.reserved", hit=not missing)
+
+    if missing:
+        now = timezone.now()
+
+        rows = {
+            variant_id: (total, earliest)
+            for variant_id, total, earliest in (
+                StockReservation.objects
+                .filter(variant_id__in=missing, expires_at__gt=now)
+                .order_by()
+                .values_list("variant_id")
+                .annotate(total=Sum("quantity"), earliest=Min("expires_at"))
+            )
+        }
+
+        for variant_id in missing:
+            total, earliest = rows.get(variant_id, (0, None))
+
+            timeout = RESERVED_CACHE_TTL
+            if earliest:
+                timeout = max(1, min(timeout, int((earliest - now).total_seconds())))
+
+            cache.set(f"inventory:reserved:{variant_id}", total, timeout)
+            reserved[variant_id] = total
+
+    return reserved
+
+
+def get_available_stock(variants):
+    """
+    {variant_id: stock - live holds} for loaded ProductVariant objects.
+    """
+    reserved = get_reserved_quantities(variant.id for variant in variants)
+
+    return {
+        variant.id: max(variant.stock - reserved.get(variant.id, 0), 0)
+        for variant in variants
+    }
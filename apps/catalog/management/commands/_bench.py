@@ -0,0 +1,120 @@
+"""
+Helpers shared by the catalog benchmark commands.
+
+Seeded rows live under a dedicated "bench-*" category so they can be
+removed in one cascade delete afterwards.
+"""
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.catalog.models import (
+    ProductCategory,
+    SubCategory,
+    Product,
+    ProductVariant,
+    TOP_SIZES,
+)
+from apps.catalog.services import refresh_listing_summaries
+
+
+BENCH_CATEGORY_SLUG = "bench-catalog"
+
+COLORS = ["Black", "White", "Navy", "Olive", "Grey", "Maroon", "Beige"]
+
+WORDS = [
+    "Vintage", "Denim", "Cotton", "Linen", "Oversized", "Slim", "Cargo",
+    "Hooded", "Graphic", "Striped", "Checked", "Washed", "Export", "Utility",
+]
+
+ITEMS = ["Tee", "Shirt", "Jacket", "Hoodie", "Sweatshirt", "Polo", "Overshirt"]
+
+
+def product_name(i):
+    return (
+        f"{WORDS[i % len(WORDS)]} {WORDS[(i // 7) % len(WORDS)]} "
+        f"{ITEMS[i % len(ITEMS)]} {i:06d}"
+    )
+
+
+def seed_products(count, batch_size=2000, stdout=None):
+    """
+    Bulk-insert `count` sellable products (one active variant each).
+    Returns the bench SubCategory.
+    """
+    category, _ = ProductCategory.objects.get_or_create(
+        slug=BENCH_CATEGORY_SLUG,
+        defaults={"name": "Bench Catalog", "image": "categories/bench.jpg"},
+    )
+
+    subcategory, _ = SubCategory.objects.get_or_create(
+        category=category,
+        slug="bench-items",
+        defaults={
+            "name": "Bench Items",
+            "image": "categories/bench.jpg",
+            "price_per_kg": Decimal("899.00"),
+        },
+    )
+
+    existing = subcategory.products.count()
+
+    for start in range(existing, count, batch_size):
+        stop = min(start + batch_size, count)
+
+        products = Product.objects.bulk_create([
+            Product(
+                subcategory=subcategory,
+                name=product_name(i),
+                slug=f"bench-{i:06d}",
+                description=f"Surplus lot {i}",
+                size_type="TOP",
+            )
+            for i in range(start, stop)
+        ])
+
+        ProductVariant.objects.bulk_create([
+            ProductVariant(
+                product=product,
+                color=COLORS[i % len(COLORS)],
+                size=TOP_SIZES[i % len(TOP_SIZES)],
+                size_order=ProductVariant.SIZE_ORDER_MAP[TOP_SIZES[i % len(TOP_SIZES)]],
+                weight_kg=Decimal("0.250") + Decimal(i % 9) / 10,
+                stock=1 + i % 3,
+            )
+            for i, product in zip(range(start, stop), products)
+        ])
+
+        # bulk_create skips the signals that maintain the summaries
+        refresh_listing_summaries([product.id for product in products])
+
+        if stdout:
+            stdout.write(f"  seeded {stop}/{count}")
+
+    return subcategory
+
+
+def drop_seed():
+    ProductCategory.objects.filter(slug=BENCH_CATEGORY_SLUG).delete()
+
+
+@contextmanager
+def measure(results, label):
+    """
+    Records (label, queries, milliseconds) into `results`.
+    """
+    with CaptureQueriesContext(connection) as ctx:
+        started = time.perf_counter()
+        yield
+        elapsed = (time.perf_counter() - started) * 1000
+
+    results.append((label, len(ctx.captured_queries), elapsed))
+
+
+def write_results(stdout, results):
+    stdout.write(f"{'case':<40}{'queries':>10}{'ms':>12}")
+    for label, queries, elapsed in results:
+        stdout.write(f"{label:<40}{queries:>10}{elapsed:>12.1f}")
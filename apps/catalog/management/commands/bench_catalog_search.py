@@ -0,0 +1,112 @@
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from apps.catalog.models import Product
+from apps.catalog.search import search_products, suggest_products
+
+from ._bench import seed_products, drop_seed
+
+
+QUERIES = [
+    "denim jacket",
+    "hooded",
+    "oversized tee",
+    "navy",
+    "linen shirt",
+    "cargo",
+    "jakcet",        # typo → trigram fallback
+    "sweatshrit",    # typo → trigram fallback
+]
+
+PREFIXES = ["de", "den", "deni", "hoo", "hood", "ov", "ove", "over"]
+
+
+def percentiles(samples):
+    cuts = statistics.quantiles(samples, n=100)
+    return cuts[49], cuts[94]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed N products and compare p50/p95 latency of the old icontains "
+        "search against ranked full-text search and autocomplete."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=100000)
+        parser.add_argument("--rounds", type=int, default=20)
+        parser.add_argument("--keep", action="store_true")
+
+    def timed(self, func, rounds):
+        samples = []
+        for _ in range(rounds):
+            for q in QUERIES:
+                started = time.perf_counter()
+                func(q)
+                samples.append((time.perf_counter() - started) * 1000)
+        return samples
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Seeding {options['products']} products…")
+        seed_products(options["products"], stdout=self.stdout)
+
+        rounds = options["rounds"]
+
+        # The query product_list used before full-text search
+        def icontains(q):
+            list(
+                Product.objects.filter(
+                    is_active=True,
+                    subcategory__is_active=True,
+                    subcategory__category__is_active=True,
+                    variants__is_active=True,
+                )
+                .filter(Q(name__icontains=q) | Q(subcategory__name__icontains=q))
+                .select_related("subcategory", "subcategory__category")
+                .distinct()
+                .order_by("name")
+            )
+
+        products = Product.objects.filter(
+            listing__is_sellable=True,
+            subcategory__is_active=True,
+            subcategory__category__is_active=True,
+        ).select_related("subcategory", "subcategory__category", "listing")
+
+        def fulltext(q):
+            search_products(products, q)
+
+        def suggest_cold(prefix):
+            cache.clear()
+            suggest_products(prefix)
+
+        def suggest_warm(prefix):
+            suggest_products(prefix)
+
+        rows = [
+            ("icontains (old)", self.timed(icontains, rounds)),
+            ("full-text ranked", self.timed(fulltext, rounds)),
+        ]
+
+        for label, func in (("suggest (cold cache)", suggest_cold),
+                            ("suggest (warm cache)", suggest_warm)):
+            samples = []
+            for _ in range(rounds):
+                for prefix in PREFIXES:
+                    started = time.perf_counter()
+                    func(prefix)
+                    samples.append((time.perf_counter() - started) * 1000)
+            rows.append((label, samples))
+
+        self.stdout.write(f"{'path':<28}{'p50 ms':>10}{'p95 ms':>10}")
+        for label, samples in rows:
+            p50, p95 = percentiles(samples)
+            self.stdout.write(f"{label:<28}{p50:>10.2f}{p95:>10.2f}")
+
+        if not options["keep"]:
+            drop_seed()
+            self.stdout.write("Seed data removed.")
@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from apps.catalog.views import (
+    _listing_queryset,
+    PRODUCTS_PER_PAGE,
+    PRODUCT_LIST_ORDERING,
+)
+from surplus_store_project.pagination import keyset_paginate, encode_cursor
+
+from ._bench import seed_products, drop_seed, measure, write_results
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed N products and compare the old full product_list render "
+        "with keyset page 1 / page 500 (queries + wall time)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=50000)
+        parser.add_argument("--page", type=int, default=500)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument(
+            "--keep", action="store_true",
+            help="Keep the seeded rows for further runs",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Seeding {options['products']} products…")
+        subcategory = seed_products(options["products"], stdout=self.stdout)
+
+        request = RequestFactory().get("/catalog/products/")
+        _, products, _, _ = _listing_queryset(request, subcategory.slug)
+
+        # Cursor for the requested page: the key of the last row before it
+        offset = (options["page"] - 1) * PRODUCTS_PER_PAGE
+        last = (
+            products.order_by(*PRODUCT_LIST_ORDERING)
+            .values_list(*PRODUCT_LIST_ORDERING)[offset - 1]
+        )
+        deep_cursor = encode_cursor(list(last))
+
+        def render(rows):
+            return render_to_string(
+                "catalog/includes/product_cards.html",
+                {"products": rows, "wishlist_product_ids": set()},
+            )
+
+        results = []
+
+        for run in range(options["repeat"]):
+            with measure(results, f"full render (old) #{run + 1}"):
+                render(list(products.order_by("name")))
+
+            with measure(results, f"offset page {options['page']} #{run + 1}"):
+                render(list(
+                    products.order_by(*PRODUCT_LIST_ORDERING)
+                    [offset:offset + PRODUCTS_PER_PAGE]
+                ))
+
+            with measure(results, f"keyset page 1 #{run + 1}"):
+                render(keyset_paginate(
+                    products, PRODUCT_LIST_ORDERING,
+                    page_size=PRODUCTS_PER_PAGE,
+                ).object_list)
+
+            with measure(results, f"keyset page {options['page']} #{run + 1}"):
+                render(keyset_paginate(
+                    products, PRODUCT_LIST_ORDERING,
+                    cursor=deep_cursor, page_size=PRODUCTS_PER_PAGE,
+                ).object_list)
+
+        write_results(self.stdout, results)
+
+        if not options["keep"]:
+            drop_seed()
+            self.stdout.write("Seed data removed.")
@@ -0,0 +1,122 @@
+import random
+import threading
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.catalog.inventory import decrement_stock
+from apps.catalog.management.commands._bench import seed_products, drop_seed
+from apps.catalog.models import InventoryMovement, ProductVariant
+
+
+REFERENCE_PREFIX = "stress-"
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrency check for catalog.inventory: many threads decrement "
+        "overlapping variants (lines in random order, like concurrent "
+        "payment.captured webhooks) and the final stock is checked "
+        "against the ledger. Needs PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--variants", type=int, default=20)
+        parser.add_argument("--stock", type=int, default=50)
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--orders", type=int, default=25,
+                            help="Orders per thread.")
+        parser.add_argument("--lines", type=int, default=5,
+                            help="Max lines per order.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Row locking needs PostgreSQL.")
+
+        subcategory = seed_products(options["variants"])
+
+        variants = ProductVariant.objects.filter(
+            product__subcategory=subcategory,
+        )
+        variants.update(stock=options["stock"])
+        variant_ids = list(variants.values_list("id", flat=True))
+
+        errors = []
+        shortfalls = Counter()
+        lock = threading.Lock()
+
+        def worker(number):
+            rng = random.Random(number)
+            try:
+                for order in range(options["orders"]):
+                    lines = [
+                        (variant_id, rng.randint(1, 3))
+                        for variant_id in rng.sample(
+                            variant_ids,
+                            rng.randint(1, min(options["lines"], len(variant_ids))),
+                        )
+                    ]
+
+                    result = decrement_stock(
+                        lines,
+                        reference=f"{REFERENCE_PREFIX}{number}-{order}",
+                    )
+
+                    with lock:
+                        shortfalls.update(s.variant_id for s in result.shortfalls)
+
+            except Exception as e:
+                with lock:
+                    errors.append(repr(e))
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=worker, args=(number,))
+            for number in range(options["threads"])
+        ]
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        try:
+            self._check(variant_ids, options["stock"], errors)
+
+            total = options["threads"] * options["orders"]
+            self.stdout.write(
+                f"{total} orders in {elapsed:.2f}s "
+                f"({total / elapsed:.0f}/s), "
+                f"{sum(shortfalls.values())} shortfall line(s)"
+            )
+        finally:
+            InventoryMovement.objects.filter(
+                reference__startswith=REFERENCE_PREFIX,
+            ).delete()
+            drop_seed()
+
+        if errors:
+            raise CommandError(f"{len(errors)} worker(s) failed: {errors[:3]}")
+
+        self.stdout.write(self.style.SUCCESS("Inventory consistent"))
+
+    def _check(self, variant_ids, initial_stock, errors):
+        sold = Counter()
+        for variant_id, change in InventoryMovement.objects.filter(
+            reference__startswith=REFERENCE_PREFIX,
+        ).values_list("variant_id", "change"):
+            sold[variant_id] -= change
+
+        for variant_id, stock in ProductVariant.objects.filter(
+            id__in=variant_ids,
+        ).values_list("id", "stock"):
+            if stock < 0 or stock != initial_stock - sold[variant_id]:
+                errors.append(
+                    f"variant {variant_id}: stock {stock}, "
+                    f"ledger says {initial_stock - sold[variant_id]}"
+                )
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0019_product_name_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductListingSummary',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='listing', serialize=False, to='catalog.product')),
+                ('is_sellable', models.BooleanField(default=False)),
+                ('active_variant_count', models.PositiveIntegerField(default=0)),
+                ('total_stock', models.PositiveIntegerField(default=0)),
+                ('min_weight_kg', models.DecimalField(blank=True, decimal_places=3, max_digits=6, null=True)),
+                ('max_weight_kg', models.DecimalField(blank=True, decimal_places=3, max_digits=6, null=True)),
+                ('min_price', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('max_price', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('colors', models.JSONField(blank=True, default=list)),
+                ('sizes', models.JSONField(blank=True, default=list)),
+                ('primary_image', models.CharField(blank=True, max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('subcategory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.subcategory')),
+            ],
+            options={
+                'verbose_name': 'Product Listing Summary',
+                'verbose_name_plural': 'Product Listing Summaries',
+                'indexes': [models.Index(fields=['subcategory', 'is_sellable'], name='catalog_listing_subcat_idx'), models.Index(fields=['is_sellable'], name='catalog_listing_sellable_idx')],
+            },
+        ),
+    ]
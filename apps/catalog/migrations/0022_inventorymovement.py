@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0021_catalog_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.CharField(choices=[('sale', 'Sale'), ('shortfall', 'Shortfall')], max_length=20)),
+                ('requested', models.PositiveIntegerField()),
+                ('change', models.IntegerField()),
+                ('stock_after', models.IntegerField(null=True)),
+                ('reference', models.CharField(blank=True, db_index=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('variant', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movements', to='catalog.productvariant')),
+            ],
+            options={
+                'verbose_name': 'Inventory Movement',
+                'verbose_name_plural': 'Inventory Movements',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
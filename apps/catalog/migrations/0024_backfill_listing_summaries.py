@@ -0,0 +1,171 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, transaction
+from django.db.models import OuterRef, Subquery, TextField
+from django.db.models.functions import Cast
+
+
+# The catalog pages only list products with a sellable summary row, so
+# the summaries (and their search vectors) are filled in here rather than
+# left to a manual `rebuild_listing_summaries`. Same rules as
+# catalog/services.py refresh_listing_summaries / catalog/search.py
+# update_search_vectors, on the historical models.
+
+BATCH_SIZE = 500
+
+SEARCH_CONFIG = "english"
+
+
+def _price(weight_kg, price_per_kg):
+    if weight_kg is None:
+        return None
+    return (weight_kg * price_per_kg).quantize(
+        Decimal("0.01"), rounding=ROUND_HALF_UP
+    )
+
+
+def _backfill_batch(apps, product_ids):
+    Product = apps.get_model("catalog", "Product")
+    ProductVariant = apps.get_model("catalog", "ProductVariant")
+    ProductImage = apps.get_model("catalog", "ProductImage")
+    ProductListingSummary = apps.get_model("catalog", "ProductListingSummary")
+
+    variants = (
+        ProductVariant.objects
+        .filter(product_id__in=product_ids, is_active=True)
+        .order_by("product_id", "size_order", "color")
+        .values_list("product_id", "color", "size", "weight_kg", "stock")
+    )
+
+    stats = {}
+    for product_id, color, size, weight_kg, stock in variants:
+        data = stats.setdefault(product_id, {
+            "count": 0,
+            "stock": 0,
+            "weights": [],
+            "colors": [],
+            "sizes": [],
+        })
+
+        data["count"] += 1
+        data["stock"] += stock
+        data["weights"].append(weight_kg)
+
+        if color not in data["colors"]:
+            data["colors"].append(color)
+        if size not in data["sizes"]:
+            data["sizes"].append(size)
+
+    images = (
+        ProductImage.objects
+        .filter(variant__product_id__in=product_ids, variant__is_active=True)
+        .order_by("variant__product_id", "-is_primary", "created_at")
+        .values_list("variant__product_id", "image")
+    )
+
+    primary_images = {}
+    for product_id, image in images:
+        primary_images.setdefault(product_id, image)
+
+    rows = []
+    for product in Product.objects.filter(id__in=product_ids).select_related("subcategory"):
+        data = stats.get(product.id)
+        price_per_kg = product.subcategory.price_per_kg
+
+        min_weight = min(data["weights"]) if data else None
+        max_weight = max(data["weights"]) if data else None
+
+        rows.append(ProductListingSummary(
+            product_id=product.id,
+            subcategory_id=product.subcategory_id,
+            is_sellable=product.is_active and bool(data),
+            active_variant_count=data["count"] if data else 0,
+            total_stock=data["stock"] if data else 0,
+            min_weight_kg=min_weight,
+            max_weight_kg=max_weight,
+            min_price=_price(min_weight, price_per_kg),
+            max_price=_price(max_weight, price_per_kg),
+            colors=sorted(data["colors"], key=str.lower) if data else [],
+            sizes=data["sizes"] if data else [],
+            primary_image=primary_images.get(product.id, ""),
+        ))
+
+    ProductListingSummary.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["product"],
+        update_fields=[
+            "subcategory",
+            "is_sellable",
+            "active_variant_count",
+            "total_stock",
+            "min_weight_kg",
+            "max_weight_kg",
+            "min_price",
+            "max_price",
+            "colors",
+            "sizes",
+            "primary_image",
+            "updated_at",
+        ],
+    )
+
+    document = (
+        Product.objects
+        .filter(id=OuterRef("product_id"))
+        .annotate(
+            document=(
+                SearchVector("name", weight="A", config=SEARCH_CONFIG)
+                + SearchVector(
+                    "subcategory__name",
+                    "subcategory__category__name",
+                    weight="B",
+                    config=SEARCH_CONFIG,
+                )
+                + SearchVector(
+                    Cast(OuterRef("colors"), TextField()),
+                    weight="C",
+                    config=SEARCH_CONFIG,
+                )
+                + SearchVector("description", weight="D", config=SEARCH_CONFIG)
+            )
+        )
+        .values("document")[:1]
+    )
+
+    ProductListingSummary.objects.filter(
+        product_id__in=product_ids
+    ).update(search_vector=Subquery(document))
+
+
+def backfill_listing_summaries(apps, schema_editor):
+    Product = apps.get_model("catalog", "Product")
+
+    product_ids = Product.objects.order_by("id").values_list("id", flat=True)
+
+    batch = []
+    for product_id in product_ids.iterator(chunk_size=BATCH_SIZE):
+        batch.append(product_id)
+        if len(batch) == BATCH_SIZE:
+            with transaction.atomic():
+                _backfill_batch(apps, batch)
+            batch = []
+
+    if batch:
+        with transaction.atomic():
+            _backfill_batch(apps, batch)
+
+
+class Migration(migrations.Migration):
+
+    # One transaction per batch instead of one for the whole catalog
+    atomic = False
+
+    dependencies = [
+        ('catalog', '0023_stockreservation'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_listing_summaries, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
 import uuid
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db.models import UniqueConstraint
 from django.core.exceptions import ValidationError
 from django.db import models
@@ -130,6 +132,17 @@ class Product(TimeStampedModel):
             ("subcategory", "name"),
             ("subcategory", "slug"),
         )
+        indexes = [
+            # Keyset pagination of the storewide listing
+            models.Index(fields=["name", "id"], name="catalog_product_name_id_idx"),
+
+            # Typo-tolerant search fallback (pg_trgm)
+            GinIndex(
+                fields=["name"],
+                name="catalog_product_name_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -298,3 +311,158 @@ class ProductImage(TimeStampedModel):
 
     def __str__(self):
         return f"Variant Image | Variant ID: {self.variant.id}"
+
+
+
+class ProductListingSummary(models.Model):
+    """
+    Denormalized listing data (one row per Product).
+
+    Kept up to date by apps/catalog/signals.py whenever variants, images,
+    the subcategory price or the product itself change. Rebuild everything
+    with `python manage.py rebuild_listing_summaries`.
+    """
+
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="listing"
+    )
+
+    subcategory = models.ForeignKey(
+        SubCategory,
+        on_delete=models.CASCADE,
+        related_name="+"
+    )
+
+    # Product is active AND has at least one active variant
+    is_sellable = models.BooleanField(default=False)
+
+    active_variant_count = models.PositiveIntegerField(default=0)
+    total_stock = models.PositiveIntegerField(default=0)
+
+    min_weight_kg = models.DecimalField(
+        max_digits=6, decimal_places=3, null=True, blank=True)
+    max_weight_kg = models.DecimalField(
+        max_digits=6, decimal_places=3, null=True, blank=True)
+
+    # weight_kg * SubCategory.price_per_kg
+    min_price = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True)
+    max_price = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True)
+
+    colors = models.JSONField(default=list, blank=True)
+    sizes = models.JSONField(default=list, blank=True)
+
+    # Storage name of the primary ProductImage ("" when there is none)
+    primary_image = models.CharField(max_length=255, blank=True)
+
+    # Weighted document: name (A), subcategory + category (B),
+    # colors (C), description (D). See catalog/search.py
+    search_vector = SearchVectorField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Product Listing Summary"
+        verbose_name_plural = "Product Listing Summaries"
+        indexes = [
+            models.Index(
+                fields=["subcategory", "is_sellable"],
+                name="catalog_listing_subcat_idx"
+            ),
+            models.Index(
+                fields=["is_sellable"],
+                name="catalog_listing_sellable_idx"
+            ),
+            GinIndex(
+                fields=["search_vector"],
+                name="catalog_listing_search_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Listing | {self.product_id}"
+
+
+
+class InventoryMovement(models.Model):
+    """
+    Stock ledger: one row per attempted stock change (catalog/inventory.py).
+
+    `change` is what was applied (negative for a sale); a shortfall row
+    has change 0 and records what was requested and what was available.
+    """
+
+    REASON_CHOICES = (
+        ("sale", "Sale"),
+        ("shortfall", "Shortfall"),
+    )
+
+    # Kept when the variant is deleted later on
+    variant = models.ForeignKey(
+        ProductVariant,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="movements"
+    )
+
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+
+    requested = models.PositiveIntegerField()
+    change = models.IntegerField()
+
+    # Stock after the movement (before it, for a shortfall)
+    stock_after = models.IntegerField(null=True)
+
+    # What caused it, e.g. the order uuid
+    reference = models.CharField(max_length=100, blank=True, db_index=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Inventory Movement"
+        verbose_name_plural = "Inventory Movements"
+
+    def __str__(self):
+        return f"{self.reason} {self.change} | Variant ID: {self.variant_id}"
+
+
+
+class StockReservation(models.Model):
+    """
+    Stock held for a pending order until it is paid or `expires_at`
+    (catalog/inventory.py). Rows only exist while the hold is live:
+    payment consumes them, cancellation / expiry deletes them.
+    """
+
+    variant = models.ForeignKey(
+        ProductVariant,
+        on_delete=models.CASCADE,
+        related_name="reservations"
+    )
+
+    quantity = models.PositiveIntegerField()
+
+    # The order holding the stock (order uuid)
+    reference = models.CharField(max_length=100, db_index=True)
+
+    expires_at = models.DateTimeField(db_index=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Stock Reservation"
+        verbose_name_plural = "Stock Reservations"
+        indexes = [
+            models.Index(
+                fields=["variant", "expires_at"],
+                name="catalog_reservation_live_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} held by {self.reference} | Variant ID: {self.variant_id}"
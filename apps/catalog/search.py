@@ -0,0 +1,210 @@
+import hashlib
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db.models import F, OuterRef, Q, Subquery, TextField
+from django.db.models.functions import Cast
+from django.urls import reverse
+
+from surplus_store_project import metrics
+
+from .cache import cache
+from .models import Product, ProductListingSummary
+
+
+# ==============================
+# CATALOG SEARCH (PostgreSQL FTS)
+# ==============================
+#
+# Ranked full-text search over ProductListingSummary.search_vector
+# (GIN indexed), with a pg_trgm fallback on Product.name for typos.
+
+SEARCH_CONFIG = "english"
+
+SEARCH_RESULT_LIMIT = 96
+SUGGEST_LIMIT = 8
+SUGGEST_MIN_LENGTH = 2
+MAX_QUERY_LENGTH = 100
+
+# Suggestions are requested on every keystroke; popular prefixes are
+# served from cache.
+SUGGEST_CACHE_TTL = getattr(settings, "CATALOG_SUGGEST_CACHE_TTL", 60)
+
+metrics.register_cache("catalog.suggest")
+
+
+def update_search_vectors(product_ids):
+    """
+    Rebuild the weighted search document for the given summaries in one
+    UPDATE. Called by refresh_listing_summaries().
+    """
+    document = (
+        Product.objects
+        .filter(id=OuterRef("product_id"))
+        .annotate(
+            document=(
+                SearchVector("name", weight="A", config=SEARCH_CONFIG)
+                + SearchVector(
+                    "subcategory__name",
+                    "subcategory__category__name",
+                    weight="B",
+                    config=SEARCH_CONFIG,
+                )
+                + SearchVector(
+                    Cast(OuterRef("colors"), TextField()),
+                    weight="C",
+                    config=SEARCH_CONFIG,
+                )
+                + SearchVector("description", weight="D", config=SEARCH_CONFIG)
+            )
+        )
+        .values("document")[:1]
+    )
+
+    ProductListingSummary.objects.filter(
+        product_id__in=product_ids
+    ).update(search_vector=Subquery(document))
+
+
+def normalize_query(q):
+    return " ".join(q.split())[:MAX_QUERY_LENGTH]
+
+
+def _prefix_query(q):
+    """
+    "blk hood" -> blk:* & hood:*  (every word as a prefix)
+    """
+    tokens = re.findall(r"\w+", q.lower())
+    if not tokens:
+        return None
+
+    return SearchQuery(
+        " & ".join(f"{token}:*" for token in tokens),
+        search_type="raw",
+        config=SEARCH_CONFIG,
+    )
+
+
+def search_condition(products, q):
+    """
+    Q on Product for what search_products(products, q) matches: the
+    full-text match, or the trigram fallback when that matches nothing.
+    None for an empty query.
+    """
+    q = normalize_query(q)
+    if not q:
+        return None
+
+    fulltext = Q(
+        listing__search_vector=SearchQuery(q, search_type="websearch", config=SEARCH_CONFIG)
+    )
+
+    if products.filter(fulltext).exists():
+        return fulltext
+
+    return Q(name__trigram_similar=q)
+
+
+def search_products(products, q, limit=SEARCH_RESULT_LIMIT):
+    """
+    Rank `products` (a queryset joined to `listing`) against `q`.
+
+    Falls back to trigram similarity on the product name when full-text
+    search finds nothing (typos such as "jakcet").
+    """
+    q = normalize_query(q)
+    if not q:
+        return []
+
+    query = SearchQuery(q, search_type="websearch", config=SEARCH_CONFIG)
+
+    results = list(
+        products
+        .filter(listing__search_vector=query)
+        .annotate(rank=SearchRank(F("listing__search_vector"), query))
+        .order_by("-rank", "id")[:limit]
+    )
+
+    if results:
+        return results
+
+    return list(
+        products
+        .filter(name__trigram_similar=q)
+        .annotate(similarity=TrigramSimilarity("name", q))
+        .order_by("-similarity", "id")[:limit]
+    )
+
+
+def _suggestion_rows(products, q):
+    fields = (
+        "name",
+        "slug",
+        "subcategory__slug",
+        "subcategory__category__slug",
+    )
+
+    query = _prefix_query(q)
+
+    if query is not None:
+        rows = list(
+            products
+            .filter(listing__search_vector=query)
+            .annotate(rank=SearchRank(F("listing__search_vector"), query))
+            .order_by("-rank", "name")
+            .values_list(*fields)[:SUGGEST_LIMIT]
+        )
+        if rows:
+            return rows
+
+    return list(
+        products
+        .filter(name__trigram_similar=q)
+        .annotate(similarity=TrigramSimilarity("name", q))
+        .order_by("-similarity", "name")
+        .values_list(*fields)[:SUGGEST_LIMIT]
+    )
+
+
+def suggest_products(q):
+    """
+    Prefix autocomplete for the search box: [{"name", "url"}, ...]
+    """
+    q = normalize_query(q).lower()
+    if len(q) < SUGGEST_MIN_LENGTH:
+        return []
+
+    cache_key = "catalog:suggest:" + hashlib.md5(q.encode()).hexdigest()
+
+    suggestions = cache.get(cache_key)
+    metrics.record_cache_access("catalog.suggest", hit=suggestions is not None)
+
+    if suggestions is not None:
+        return suggestions
+
+    products = Product.objects.filter(
+        listing__is_sellable=True,
+        subcategory__is_active=True,
+        subcategory__category__is_active=True,
+    )
+
+    suggestions = [
+        {
+            "name": name,
+            "url": reverse(
+                "catalog:product_detail",
+                args=[category_slug, subcategory_slug, slug],
+            ),
+        }
+        for name, slug, subcategory_slug, category_slug
+        in _suggestion_rows(products, q)
+    ]
+
+    cache.set(cache_key, suggestions, SUGGEST_CACHE_TTL)
+    return suggestions
@@ -0,0 +1,376 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch, Q
+
+from surplus_store_project import metrics
+
+from .cache import (
+    cache,
+    bump_product_versions,
+    bump_subcategory_versions,
+    get_product_versions,
+)
+from .models import Product, ProductVariant, ProductImage, ProductListingSummary
+from .search import update_search_vectors
+
+
+PRODUCT_DETAIL_CACHE_TTL = getattr(settings, "CATALOG_PRODUCT_DETAIL_CACHE_TTL", 900)
+
+RECOMMENDED_PRODUCTS_LIMIT = 4
+
+metrics.register_cache("catalog.product_detail")
+
+SUMMARY_UPDATE_FIELDS = [
+    "subcategory",
+    "is_sellable",
+    "active_variant_count",
+    "total_stock",
+    "min_weight_kg",
+    "max_weight_kg",
+    "min_price",
+    "max_price",
+    "colors",
+    "sizes",
+    "primary_image",
+    "updated_at",
+]
+
+# What listings, facets and recommendations show of a product. A stock
+# change that leaves these alone only invalidates the product's own page.
+LISTING_VISIBLE_FIELDS = (
+    "subcategory_id",
+    "is_sellable",
+    "min_weight_kg",
+    "max_weight_kg",
+    "min_price",
+    "max_price",
+    "colors",
+    "sizes",
+    "primary_image",
+)
+
+
+def _price(weight_kg, price_per_kg):
+    if weight_kg is None:
+        return None
+    return (weight_kg * price_per_kg).quantize(
+        Decimal("0.01"), rounding=ROUND_HALF_UP
+    )
+
+
+# ==============================
+# LISTING SUMMARY
+# ==============================
+
+def refresh_listing_summaries(product_ids, sold_out=None):
+    """
+    Recompute ProductListingSummary rows for the given products.
+
+    Three reads (products, active variants, images), one upsert and one
+    search-vector UPDATE, regardless of how many products are refreshed.
+    Also invalidates the cached data of the affected products and
+    subcategories.
+
+    `sold_out` marks a stock-only refresh (after a sale): the products
+    whose variant just ran out. Subcategory caches are then only
+    invalidated for those and for products whose listing-visible fields
+    changed, instead of for every product.
+    """
+    product_ids = set(product_ids)
+    if not product_ids:
+        return 0
+
+    previous = {}
+    if sold_out is not None:
+        previous = {
+            row[0]: row[1:]
+            for row in ProductListingSummary.objects
+            .filter(product_id__in=product_ids)
+            .values_list("product_id", *LISTING_VISIBLE_FIELDS)
+        }
+
+    products = (
+        Product.objects
+        .filter(id__in=product_ids)
+        .select_related("subcategory")
+    )
+
+    variants = (
+        ProductVariant.objects
+        .filter(product_id__in=product_ids, is_active=True)
+        .order_by("product_id", "size_order", "color")
+        .values_list("product_id", "color", "size", "weight_kg", "stock")
+    )
+
+    stats = {}
+    for product_id, color, size, weight_kg, stock in variants:
+        data = stats.setdefault(product_id, {
+            "count": 0,
+            "stock": 0,
+            "weights": [],
+            "colors": [],
+            "sizes": [],
+        })
+
+        data["count"] += 1
+        data["stock"] += stock
+        data["weights"].append(weight_kg)
+
+        if color not in data["colors"]:
+            data["colors"].append(color)
+        if size not in data["sizes"]:
+            data["sizes"].append(size)
+
+    images = (
+        ProductImage.objects
+        .filter(variant__product_id__in=product_ids, variant__is_active=True)
+        .order_by("variant__product_id", "-is_primary", "created_at")
+        .values_list("variant__product_id", "image")
+    )
+
+    primary_images = {}
+    for product_id, image in images:
+        primary_images.setdefault(product_id, image)
+
+    rows = []
+    for product in products:
+        data = stats.get(product.id)
+        price_per_kg = product.subcategory.price_per_kg
+
+        min_weight = min(data["weights"]) if data else None
+        max_weight = max(data["weights"]) if data else None
+
+        rows.append(ProductListingSummary(
+            product=product,
+            subcategory_id=product.subcategory_id,
+            is_sellable=product.is_active and bool(data),
+            active_variant_count=data["count"] if data else 0,
+            total_stock=data["stock"] if data else 0,
+            min_weight_kg=min_weight,
+            max_weight_kg=max_weight,
+            min_price=_price(min_weight, price_per_kg),
+            max_price=_price(max_weight, price_per_kg),
+            colors=sorted(data["colors"], key=str.lower) if data else [],
+            sizes=data["sizes"] if data else [],
+            primary_image=primary_images.get(product.id, ""),
+        ))
+
+    ProductListingSummary.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["product"],
+        update_fields=SUMMARY_UPDATE_FIELDS,
+    )
+
+    update_search_vectors(product_ids)
+
+    bump_product_versions(product_ids)
+
+    if sold_out is None:
+        changed = rows
+    else:
+        sold_out = set(sold_out)
+        changed = [
+            row for row in rows
+            if row.product_id in sold_out
+            or previous.get(row.product_id) != tuple(
+                getattr(row, field) for field in LISTING_VISIBLE_FIELDS
+            )
+        ]
+
+    # Facet counts and other per-subcategory caches are now stale
+    if changed:
+        bump_subcategory_versions({row.subcategory_id for row in changed})
+
+    return len(rows)
+
+
+def schedule_listing_refresh(product_ids, sold_out=None):
+    """
+    Refresh once the surrounding transaction commits, so a rolled back
+    admin edit never leaves a summary describing data that doesn't exist.
+    """
+    product_ids = set(product_ids)
+    if product_ids:
+        transaction.on_commit(
+            lambda: refresh_listing_summaries(product_ids, sold_out)
+        )
+
+
+def rebuild_all_listing_summaries(batch_size=500):
+    total = 0
+    product_ids = Product.objects.order_by("id").values_list("id", flat=True)
+
+    batch = []
+    for product_id in product_ids.iterator(chunk_size=batch_size):
+        batch.append(product_id)
+        if len(batch) == batch_size:
+            total += refresh_listing_summaries(batch)
+            batch = []
+
+    total += refresh_listing_summaries(batch)
+    return total
+
+
+# ==============================
+# PRODUCT DETAIL (cached)
+# ==============================
+#
+# The color -> sizes -> images map and the recommendations only change
+# when a variant, image, price or active flag changes in the product's
+# subcategory, and every one of those goes through
+# refresh_listing_summaries, which bumps the product version (and the
+# subcategory version when the listing changes) that are part of the
+# cache key. A hot product page is therefore served from the cache
+# without touching variants, images or recommendations.
+
+def _image_url(path):
+    if not path:
+        return ""
+    return ProductImage._meta.get_field("image").storage.url(path)
+
+
+def _build_variant_map(product):
+    variants = (
+        ProductVariant.objects
+        .filter(product=product, is_active=True)
+        .order_by("created_at", "size_order")
+        .prefetch_related(
+            Prefetch(
+                "images",
+                queryset=ProductImage.objects.order_by(
+                    "-is_primary", "created_at")
+            )
+        )
+    )
+
+    variant_map = {}
+    variant_index = {}
+    seen_images = {}
+
+    for variant in variants:
+        color = variant.color
+
+        if color not in variant_map:
+            variant_map[color] = {
+                "color": color,
+                "sizes": [],
+                "images": []
+            }
+            seen_images[color] = set()
+
+        variant_map[color]["sizes"].append({
+            "size": variant.size,
+            "weight_kg": variant.weight_kg,
+            "stock": variant.stock,
+            "variant_id": variant.id,
+        })
+        variant_index[str(variant.id)] = (color, variant.size)
+
+        for img in variant.images.all():
+            url = img.image.url
+            if url not in seen_images[color]:
+                seen_images[color].add(url)
+                variant_map[color]["images"].append(url)
+
+    return variant_map, variant_index
+
+
+def _build_recommendations(product):
+    products = (
+        Product.objects
+        .filter(
+            subcategory_id=product.subcategory_id,
+            listing__is_sellable=True,
+        )
+        .exclude(id=product.id)
+        .select_related("subcategory", "subcategory__category", "listing")
+        .order_by("-created_at")[:RECOMMENDED_PRODUCTS_LIMIT]
+    )
+
+    return [
+        {
+            "name": p.name,
+            "url": p.get_absolute_url(),
+            "image": _image_url(p.listing.primary_image),
+            "price_per_kg": p.subcategory.price_per_kg,
+        }
+        for p in products
+    ]
+
+
+def get_product_detail_data(product):
+    """
+    {"variants": {color: {...}}, "variant_index": {"<id>": (color, size)},
+     "recommended_products": [{name, url, image, price_per_kg}, ...]}
+
+    `product` must come with its subcategory (and category) loaded.
+    """
+    subcategory_version, product_version = get_product_versions(
+        product.subcategory_id, product.id
+    )
+    cache_key = (
+        f"catalog:product-detail:{product.id}:"
+        f"{subcategory_version}:{product_version}"
+    )
+
+    data = cache.get(cache_key)
+    metrics.record_cache_access("catalog.product_detail", hit=data is not None)
+
+    if data is None:
+        variant_map, variant_index = _build_variant_map(product)
+        data = {
+            "variants": variant_map,
+            "variant_index": variant_index,
+            "recommended_products": _build_recommendations(product),
+        }
+        cache.set(cache_key, data, PRODUCT_DETAIL_CACHE_TTL)
+
+    return data
+
+
+# ==============================
+# DISPLAY IMAGES (cart / checkout / order lines)
+# ==============================
+
+def resolve_display_images(pairs):
+    """
+    Primary image for each (product_id, color) pair, in ONE query.
+
+    Returns {(product_id, color): ProductImage or None}. The image is the
+    one the product page would show first for that color (primary first,
+    then oldest).
+    """
+    pairs = {(product_id, color) for product_id, color in pairs if product_id}
+    images = dict.fromkeys(pairs)
+    if not pairs:
+        return images
+
+    colors_by_product = {}
+    for product_id, color in pairs:
+        colors_by_product.setdefault(product_id, set()).add(color)
+
+    condition = Q()
+    for product_id, colors in colors_by_product.items():
+        condition |= Q(variant__product_id=product_id, variant__color__in=colors)
+
+    # DISTINCT ON keeps the first image per (product, color)
+    rows = (
+        ProductImage.objects
+        .filter(condition)
+        .select_related("variant")
+        .order_by(
+            "variant__product_id",
+            "variant__color",
+            "-is_primary",
+            "created_at",
+        )
+        .distinct("variant__product_id", "variant__color")
+    )
+
+    for image in rows:
+        images[(image.variant.product_id, image.variant.color)] = image
+
+    return images
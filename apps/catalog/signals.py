@@ -0,0 +1,58 @@
+from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete
+
+from surplus_store_project.cache import invalidate_tags
+
+from .models import ProductCategory, SubCategory, Product, ProductVariant, ProductImage
+from .services import schedule_listing_refresh
+
+
+# ---------- PRODUCT (is_active, name, subcategory) ----------
+
+@receiver(post_save, sender=Product)
+def refresh_listing_on_product_save(sender, instance, **kwargs):
+    schedule_listing_refresh([instance.id])
+
+
+# ---------- VARIANTS (stock, weight, activity) ----------
+
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+def refresh_listing_on_variant_change(sender, instance, **kwargs):
+    schedule_listing_refresh([instance.product_id])
+
+
+# ---------- IMAGES (primary image) ----------
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def refresh_listing_on_image_change(sender, instance, **kwargs):
+    # Variant may already be gone in a cascade delete; its own
+    # post_delete refreshes the product in that case.
+    product_ids = ProductVariant.objects.filter(
+        id=instance.variant_id
+    ).values_list("product_id", flat=True)
+
+    schedule_listing_refresh(product_ids)
+
+
+# ---------- SUBCATEGORY (price_per_kg) ----------
+
+@receiver(post_save, sender=SubCategory)
+def refresh_listing_on_subcategory_save(sender, instance, created, **kwargs):
+    if created:
+        return
+
+    schedule_listing_refresh(
+        instance.products.values_list("id", flat=True)
+    )
+
+
+# ---------- SITEMAP PAGE CACHE (categories, active products) ----------
+
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_sitemap(sender, instance, **kwargs):
+    invalidate_tags("sitemap")
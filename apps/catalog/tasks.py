@@ -0,0 +1,16 @@
+from celery import shared_task
+
+from .inventory import release_expired_reservations
+
+
+# -------------------------------------------------
+# 🔹 EXPIRED STOCK RESERVATIONS (beat)
+# -------------------------------------------------
+@shared_task
+def release_expired_stock_reservations():
+    released = release_expired_reservations()
+
+    if released:
+        print(f"[INVENTORY] Released {released} expired reservation(s)")
+
+    return released
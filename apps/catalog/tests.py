@@ -1,3 +1,280 @@
-from django.test import TestCase
+import random
+import threading
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .inventory import (
+    decrement_stock,
+    get_available_stock,
+    release_expired_reservations,
+    reserve_stock,
+)
+from .models import (
+    ProductCategory,
+    SubCategory,
+    Product,
+    ProductVariant,
+    InventoryMovement,
+    StockReservation,
+)
+
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+def create_product():
+    category = ProductCategory.objects.create(
+        name="Tops", slug="tops", image="categories/tops.jpg",
+    )
+    subcategory = SubCategory.objects.create(
+        category=category,
+        name="Tees",
+        slug="tees",
+        image="categories/tees.jpg",
+        price_per_kg=Decimal("800.00"),
+    )
+    return Product.objects.create(
+        subcategory=subcategory,
+        name="Washed Tee",
+        slug="washed-tee",
+        description="Surplus lot",
+        size_type="TOP",
+    )
+
+
+def create_variant(stock, product=None, color="Black"):
+    return ProductVariant.objects.create(
+        product=product or create_product(),
+        color=color,
+        size="M",
+        size_order=ProductVariant.SIZE_ORDER_MAP["M"],
+        weight_kg=Decimal("0.250"),
+        stock=stock,
+    )
+
+
+def run_concurrently(*functions):
+    """
+    Start every function at the same moment, each in its own thread (and
+    database connection). Returns their results in order.
+    """
+    barrier = threading.Barrier(len(functions))
+    results = [None] * len(functions)
+
+    def run(index, function):
+        try:
+            barrier.wait()
+            results[index] = function()
+        finally:
+            connection.close()
+
+    threads = [
+        threading.Thread(target=run, args=(index, function))
+        for index, function in enumerate(functions)
+    ]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    return results
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class StockLockingTests(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.variant = create_variant(stock=1)
+
+    def checkout(self, reference):
+        """
+        Place the order (hold the stock), then pay for it.
+        """
+        held = reserve_stock([(self.variant.id, 1)], reference)
+        if held.shortfalls:
+            return False
+
+        paid = decrement_stock([(self.variant.id, 1)], reference=reference)
+        return not paid.shortfalls
+
+    def test_two_checkouts_for_the_last_unit(self):
+        results = run_concurrently(
+            lambda: self.checkout("order-a"),
+            lambda: self.checkout("order-b"),
+        )
+
+        self.assertEqual(sorted(results), [False, True])
+
+        self.variant.refresh_from_db()
+        self.assertEqual(self.variant.stock, 0)
+
+        winner = "order-a" if results[0] else "order-b"
+
+        sale = InventoryMovement.objects.get()
+        self.assertEqual(
+            (sale.reason, sale.change, sale.stock_after, sale.reference),
+            ("sale", -1, 0, winner),
+        )
+
+        # The winner's hold was consumed, the loser never got one
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_second_decrement_waits_for_the_lock(self):
+        locked = threading.Event()
+        release = threading.Event()
+
+        def first():
+            with transaction.atomic():
+                result = decrement_stock([(self.variant.id, 1)], reference="order-a")
+                locked.set()
+                release.wait(timeout=10)
+            return result
+
+        results = {}
+
+        def run(name, function):
+            try:
+                results[name] = function()
+            finally:
+                connection.close()
+
+        first_thread = threading.Thread(target=run, args=("a", first))
+        first_thread.start()
+        self.assertTrue(locked.wait(timeout=10))
+
+        second_thread = threading.Thread(target=run, args=("b", lambda: decrement_stock(
+            [(self.variant.id, 1)], reference="order-b",
+        )))
+        second_thread.start()
+
+        # Blocked on the variant row lock until the first one commits
+        second_thread.join(timeout=0.5)
+        self.assertTrue(second_thread.is_alive())
+
+        release.set()
+        first_thread.join(timeout=10)
+        second_thread.join(timeout=10)
+
+        self.assertEqual(results["a"].applied, {self.variant.id: 1})
+        self.assertEqual(results["b"].applied, {})
+        self.assertEqual(results["b"].shortfalls[0].available, 0)
+
+        self.variant.refresh_from_db()
+        self.assertEqual(self.variant.stock, 0)
+
+        self.assertEqual(
+            sorted(InventoryMovement.objects.values_list("reason", "change", "stock_after")),
+            [("sale", -1, 0), ("shortfall", 0, 0)],
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class OverlappingOrdersTests(TransactionTestCase):
+    """
+    Many payment webhooks selling overlapping sets of variants at once,
+    each listing its lines in its own order.
+    """
+
+    THREADS = 8
+    ORDERS_PER_THREAD = 10
+    STOCK = 30
+
+    def setUp(self):
+        cache.clear()
+
+        product = create_product()
+        self.variant_ids = [
+            create_variant(self.STOCK, product=product, color=f"Color {n}").id
+            for n in range(6)
+        ]
+
+    def sell(self, number):
+        rng = random.Random(number)
+        errors = []
+
+        for order in range(self.ORDERS_PER_THREAD):
+            lines = [
+                (variant_id, rng.randint(1, 3))
+                for variant_id in rng.sample(self.variant_ids, rng.randint(2, 5))
+            ]
+
+            # Odd threads list the lines backwards
+            if number % 2:
+                lines.sort(reverse=True)
+            else:
+                lines.sort()
+
+            try:
+                decrement_stock(lines, reference=f"order-{number}-{order}")
+            except Exception as e:  # a deadlock surfaces here
+                errors.append(repr(e))
+
+        return errors
+
+    def test_no_deadlock_and_stock_matches_ledger(self):
+        results = run_concurrently(*[
+            lambda number=number: self.sell(number)
+            for number in range(self.THREADS)
+        ])
+
+        self.assertEqual([error for errors in results for error in errors], [])
+
+        for variant in ProductVariant.objects.filter(id__in=self.variant_ids):
+            movements = InventoryMovement.objects.filter(variant=variant)
+
+            sold = -sum(movements.values_list("change", flat=True))
+
+            self.assertEqual(variant.stock, self.STOCK - sold)
+            self.assertGreaterEqual(variant.stock, 0)
+
+            # The last movement saw the final stock
+            last = movements.order_by("-id").first()
+            if last is not None:
+                self.assertEqual(last.stock_after, variant.stock)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ReservationExpiryTests(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.variant = create_variant(stock=5)
+
+    def test_release_expired_reservations(self):
+        now = timezone.now()
+
+        reserve_stock([(self.variant.id, 2)], "order-expired", expires_at=now - timedelta(minutes=1))
+        reserve_stock([(self.variant.id, 1)], "order-live", expires_at=now + timedelta(minutes=30))
+
+        # Expired holds no longer count, even before the sweep
+        self.assertEqual(get_available_stock([self.variant])[self.variant.id], 4)
+
+        self.assertEqual(release_expired_reservations(), 1)
+
+        self.assertEqual(
+            list(StockReservation.objects.values_list("reference", flat=True)),
+            ["order-live"],
+        )
+        self.assertEqual(get_available_stock([self.variant])[self.variant.id], 4)
+
+        self.assertEqual(release_expired_reservations(), 0)
+
+    def test_live_hold_blocks_other_orders(self):
+        reserve_stock([(self.variant.id, 5)], "order-a")
+
+        self.assertTrue(reserve_stock([(self.variant.id, 1)], "order-b").shortfalls)
+
+        result = decrement_stock([(self.variant.id, 1)], reference="order-b")
+        self.assertEqual(result.applied, {})
+
+        self.variant.refresh_from_db()
+        self.assertEqual(self.variant.stock, 5)
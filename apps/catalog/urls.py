@@ -1,6 +1,6 @@
 from django.urls import path
 from .views import home_view
-from .views import category_list, subcategory_list, product_list, product_detail
+from .views import category_list, subcategory_list, product_list, product_list_more, search_suggest, product_detail
 
 
 app_name = 'catalog'
@@ -19,6 +19,12 @@ urlpatterns = [
 
     path("products/", product_list, name="product_list"),
 
+    # "Load more" (keyset page as JSON)
+    path("products/more/", product_list_more, name="product_list_more"),
+
+    # Search box autocomplete
+    path("search/suggest/", search_suggest, name="search_suggest"),
+
     # Product listing (from subcategory)
     path("subcategories/<slug:subcategory_slug>/products/", product_list, name="subcategory_product_list"),
 
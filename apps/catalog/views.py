@@ -1,15 +1,24 @@
 from django.shortcuts import render, get_object_or_404
+from django.http import JsonResponse
+from django.template.loader import render_to_string
 
-from .models import ProductCategory, SubCategory, Product, ProductVariant, ProductImage
-
-from django.db.models import Q
-
-from django.db.models import Prefetch
+from .models import ProductCategory, SubCategory, Product
 
 from django.contrib.auth.decorators import login_required
 
 from apps.cart.models import WishlistItem
 
+from surplus_store_project.pagination import keyset_paginate
+
+from .facets import parse_filters, filter_products, build_facets
+from .search import search_products, suggest_products
+from .services import get_product_detail_data
+
+
+PRODUCTS_PER_PAGE = 24
+
+# Must end with a unique column for keyset pagination
+PRODUCT_LIST_ORDERING = ("name", "id")
 
 
 # Create your views here.
@@ -89,19 +98,22 @@ def subcategory_list(request, category_slug=None):
     )
 
 
-@login_required(login_url='accounts:login')
-def product_list(request, subcategory_slug=None):
+def _listing_queryset(request, subcategory_slug=None):
+    """
+    Shared by the listing page and the "load more" endpoint so both
+    paginate exactly the same result set.
+    """
     subcategory = None
 
     products = Product.objects.filter(
-        is_active=True,
+        listing__is_sellable=True,   # ✅ ONLY SELLABLE PRODUCTS (precomputed)
         subcategory__is_active=True,
         subcategory__category__is_active=True,
-        variants__is_active=True,   # ✅ ONLY SELLABLE PRODUCTS
     ).select_related(
         "subcategory",
-        "subcategory__category"
-    ).distinct()
+        "subcategory__category",
+        "listing",
+    )
 
     # 1️⃣ Filter by subcategory
     if subcategory_slug:
@@ -113,49 +125,140 @@ def product_list(request, subcategory_slug=None):
         )
         products = products.filter(subcategory=subcategory)
 
-    # 2️⃣ Search
+    # 2️⃣ Facets (size / color / price / weight)
+    filters = parse_filters(request.GET)
+    products = filter_products(products, filters)
+
     q = request.GET.get("q", "").strip()
+
+    return subcategory, products, q, filters
+
+
+def _listing_page(request, products, q):
+    """
+    Returns (products, next_cursor).
+
+    Search results are ranked by relevance and capped, so they come back
+    as a single page; plain browsing is keyset-paginated on (name, id).
+    """
+    # 3️⃣ Search (ranked full-text, trigram fallback)
     if q:
-        products = products.filter(
-            Q(name__icontains=q) |
-            Q(subcategory__name__icontains=q)
-        )
+        if request.GET.get("cursor"):
+            return [], None
+        return search_products(products, q), None
+
+    # 4️⃣ KEYSET PAGE (constant cost for any depth)
+    page = keyset_paginate(
+        products,
+        PRODUCT_LIST_ORDERING,
+        cursor=request.GET.get("cursor"),
+        page_size=PRODUCTS_PER_PAGE,
+    )
 
-    products = products.order_by("name")
+    return page.object_list, page.next_cursor
 
-    # ✅ 3️⃣ WISHLIST PREFILL (IMPORTANT)
-    wishlist_product_ids = set()
 
-    if request.user.is_authenticated:
-        wishlist_product_ids = set(
-            WishlistItem.objects.filter(
-                wishlist__user=request.user
-            ).values_list("product_id", flat=True)
-        )
+def _wishlist_product_ids(user):
+    if not user.is_authenticated:
+        return set()
+
+    return set(
+        WishlistItem.objects.filter(
+            wishlist__user=user
+        ).values_list("product_id", flat=True)
+    )
+
+
+@login_required(login_url='accounts:login')
+def product_list(request, subcategory_slug=None):
+    subcategory, products, q, filters = _listing_queryset(
+        request, subcategory_slug
+    )
+
+    rows, next_cursor = _listing_page(request, products, q)
+
+    # Params the "load more" button must carry (filters + search)
+    listing_query = request.GET.copy()
+    listing_query.pop("cursor", None)
 
     return render(
         request,
         "catalog/product_list.html",
         {
-            "products": products,
+            "products": rows,
+            "next_cursor": next_cursor,
+            "listing_query": listing_query.urlencode(),
             "subcategory": subcategory,
             "search_query": q,
             "navbar_show": "products",
 
+            "facets": build_facets(subcategory, filters, request.GET, q),
+            "active_filters": filters,
+
             # 👇 REQUIRED FOR ❤️ PREFILL
-            "wishlist_product_ids": wishlist_product_ids,
+            "wishlist_product_ids": _wishlist_product_ids(request.user),
         }
     )
 
 
+@login_required(login_url='accounts:login')
+def product_list_more(request):
+    """
+    "Load more" endpoint: next keyset page as rendered cards + plain data.
+    """
+    _, products, q, _ = _listing_queryset(
+        request, request.GET.get("subcategory") or None
+    )
+
+    rows, next_cursor = _listing_page(request, products, q)
+
+    html = render_to_string(
+        "catalog/includes/product_cards.html",
+        {
+            "products": rows,
+            "wishlist_product_ids": _wishlist_product_ids(request.user),
+        },
+        request=request,
+    )
+
+    return JsonResponse({
+        "html": html,
+        "next_cursor": next_cursor,
+        "has_next": next_cursor is not None,
+        "products": [
+            {
+                "id": product.id,
+                "name": product.name,
+                "url": product.get_absolute_url(),
+                "price_per_kg": str(product.subcategory.price_per_kg),
+                "min_price": str(product.listing.min_price),
+                "max_price": str(product.listing.max_price),
+                "total_stock": product.listing.total_stock,
+                "colors": product.listing.colors,
+                "sizes": product.listing.sizes,
+            }
+            for product in rows
+        ],
+    })
+
+
+@login_required(login_url='accounts:login')
+def search_suggest(request):
+    """
+    Autocomplete for the product search box (called per keystroke).
+    """
+    return JsonResponse({
+        "results": suggest_products(request.GET.get("q", "")),
+    })
+
+
 @login_required(login_url='accounts:login')
 def product_detail(request, category_slug, subcategory_slug, product_slug):
 
     product = get_object_or_404(
         Product.objects
-        .filter(is_active=True, variants__is_active=True)
-        .select_related("subcategory", "subcategory__category")
-        .distinct(),
+        .filter(listing__is_sellable=True)
+        .select_related("subcategory", "subcategory__category"),
         slug=product_slug,
         subcategory__slug=subcategory_slug,
         subcategory__category__slug=category_slug,
@@ -169,79 +272,24 @@ def product_detail(request, category_slug, subcategory_slug, product_slug):
         product=product
     ).exists()
 
-    variants = (
-        ProductVariant.objects
-        .filter(product=product, is_active=True)
-        .order_by("created_at", "size_order")
-        .prefetch_related(
-            Prefetch(
-                "images",
-                queryset=ProductImage.objects.order_by(
-                    "-is_primary", "created_at")
-            )
-        )
-    )
-
-    variant_map = {}
-    for variant in variants:
-        color = variant.color
-
-        if color not in variant_map:
-            variant_map[color] = {
-                "color": color,
-                "sizes": [],
-                "images": []
-            }
-
-        variant_map[color]["sizes"].append({
-            "size": variant.size,
-            "weight_kg": variant.weight_kg,
-            "stock": variant.stock,
-            "variant_id": variant.id,
-        })
-
-        for img in variant.images.all():
-            if img.image.url not in variant_map[color]["images"]:
-                variant_map[color]["images"].append(img.image.url)
+    detail = get_product_detail_data(product)
 
     # ---------------------------------------------------
     # 🔥 IMPORTANT PART: HANDLE ?variant=ID
     # ---------------------------------------------------
 
-    selected_color = None
-    selected_size = None
-
-    variant_id = request.GET.get("variant")
-
-    if variant_id:
-        try:
-            selected_variant = variants.get(id=variant_id)
-            selected_color = selected_variant.color
-            selected_size = selected_variant.size
-        except ProductVariant.DoesNotExist:
-            pass
+    selected_color, selected_size = detail["variant_index"].get(
+        request.GET.get("variant", ""), (None, None)
+    )
 
     # ---------------------------------------------------
 
-    recommended_products = (
-        Product.objects
-        .filter(
-            subcategory=product.subcategory,
-            is_active=True,
-            variants__is_active=True,
-        )
-        .exclude(id=product.id)
-        .distinct()
-        .select_related("subcategory")
-        .order_by("-created_at")[:4]
-    )
-
     context = {
         "product": product,
         "subcategory": product.subcategory,
         "price_per_kg": product.subcategory.price_per_kg,
-        "variants": variant_map,
-        "recommended_products": recommended_products,
+        "variants": detail["variants"],
+        "recommended_products": detail["recommended_products"],
         "is_wishlisted": is_wishlisted,
         "selected_color": selected_color,
         "selected_size": selected_size,
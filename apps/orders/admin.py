@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 
-from .models import Order, OrderItem
+from .models import Order, OrderItem, Invoice, OrderStatusBatch
 
 from apps.catalog.models import ProductVariant, ProductImage
 
@@ -311,3 +311,58 @@ class OrderItemAdmin(admin.ModelAdmin):
             )
 
         return "—"
+
+
+@admin.register(Invoice)
+class InvoiceAdmin(admin.ModelAdmin):
+
+    list_display = (
+        "order",
+        "size",
+        "content_hash",
+        "rendered_at",
+    )
+
+    search_fields = (
+        "order__uuid",
+        "content_hash",
+    )
+
+    readonly_fields = (
+        "order",
+        "file",
+        "content_hash",
+        "snapshot_hash",
+        "size",
+        "rendered_at",
+    )
+
+
+@admin.register(OrderStatusBatch)
+class OrderStatusBatchAdmin(admin.ModelAdmin):
+
+    list_display = (
+        "created_at",
+        "user",
+        "to_status",
+        "updated",
+        "requested",
+    )
+
+    list_filter = (
+        "to_status",
+    )
+
+    list_select_related = ("user",)
+
+    readonly_fields = (
+        "user",
+        "to_status",
+        "requested",
+        "updated",
+        "results",
+        "created_at",
+    )
+
+    def has_add_permission(self, request):
+        return False
@@ -1,23 +1,13 @@
 
-from io import BytesIO
 from django.shortcuts import get_object_or_404, render
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
-from django.template.loader import get_template
-
-from django.conf import settings
-import os
-from django.templatetags.static import static
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
 
 
 
 # invoice_view.py
 
-import logging
-logging.getLogger("xhtml2pdf").setLevel(logging.ERROR)
-
-from xhtml2pdf import pisa
-
+from .invoices import get_invoice
 from .models import Order
 
 
@@ -36,69 +26,34 @@ def invoice_preview(request, uuid):
     return render(request, "orders/invoice_preview.html", {"order": order})
 
 
-def link_callback(uri, rel):
-    from django.conf import settings
-    import os
-
-    if uri.startswith(settings.STATIC_URL):
-        path = os.path.join(settings.BASE_DIR, uri.replace(
-            settings.STATIC_URL, "static/"))
-    else:
-        return uri
-
-    if not os.path.isfile(path):
-        raise Exception(f"Media URI must exist: {path}")
-
-    return path
-
-
-
-# 🔹 DOWNLOAD (PDF)
+# 🔹 DOWNLOAD (PDF, stored by orders.invoices)
 @login_required
 def download_invoice(request, uuid):
     order = get_object_or_404(
-        Order.objects.prefetch_related("items"),
+        Order.objects.select_related("user").prefetch_related("items"),
         uuid=uuid,
         user=request.user
     )
 
-    # ✅ STEP 1: Get absolute logo path
-    logo_path = os.path.join(settings.BASE_DIR, "static/images/logo.png")
-    logo_path = logo_path.replace("\\", "/")
-    logo_path = f"file:///{logo_path}"
-
-    # ✅ STEP 2: Pass to template
-    template = get_template("orders/invoice_pdf.html")
-    html = template.render({
-        "order": order,
-        "logo_path": logo_path
-    })
-
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = 'attachment; filename="invoice.pdf"'
-
-    pisa_status = pisa.CreatePDF(
-        html,
-        dest=response,
-        link_callback=link_callback
-    )
+    invoice = get_invoice(order)
 
-    if pisa_status.err:
+    if invoice is None:
         return HttpResponse("Error generating PDF", status=500)
 
-    return response
-
+    etag = f'"{invoice.content_hash}"'
 
-# FOR EMAIL INVOICE
-
-def generate_invoice_pdf(order):
-    template = get_template("orders/invoice_pdf.html")
-    html = template.render({"order": order})
-
-    result = BytesIO()
-    pisa_status = pisa.CreatePDF(html, dest=result)
+    if etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponseNotModified()
+    else:
+        # FileResponse sets Content-Length from the stored file
+        response = FileResponse(
+            invoice.file.open("rb"),
+            as_attachment=True,
+            filename="invoice.pdf",
+            content_type="application/pdf",
+        )
 
-    if pisa_status.err:
-        return None
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
 
-    return result.getvalue()
+    return response
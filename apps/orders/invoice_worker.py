@@ -0,0 +1,23 @@
+"""
+Entry points for the invoice export process pool (orders.invoices).
+
+Spawned workers unpickle these before Django is set up, so this module
+must not import models at load time.
+"""
+
+
+def init_worker():
+    import django
+    django.setup()
+
+
+def render_for_export(order_id):
+    from apps.orders.invoices import render_invoice
+
+    try:
+        invoice = render_invoice(order_id)
+    except Exception as e:
+        print(f"[INVOICE EXPORT] Order {order_id}: {repr(e)}")
+        invoice = None
+
+    return order_id, invoice.file.name if invoice else None
@@ -0,0 +1,373 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.template.loader import get_template
+from django.utils import timezone
+
+from xhtml2pdf import pisa
+
+from surplus_store_project.metrics import (
+    record_cache_access,
+    record_timing,
+    register_cache,
+    register_timing,
+)
+
+from . import invoice_worker
+from .models import Invoice, Order
+
+logging.getLogger("xhtml2pdf").setLevel(logging.ERROR)
+
+
+# ==============================
+# INVOICES (render once, serve from storage)
+# ==============================
+#
+# xhtml2pdf takes hundreds of ms of CPU per invoice, so PDFs are rendered
+# by a Celery task when an order is paid / refunded and stored in the
+# default storage under their content hash. Downloads and the refund
+# email reuse the stored file.
+#
+# The stored PDF carries a version of what it shows (the fields, items
+# and PAID / REFUNDED stamp of orders/invoice_pdf.html). A download
+# compares that stored version with the loaded order, so a current
+# invoice is served without rendering anything; only an order whose
+# invoice would look different is rendered again (shipping it does not
+# count).
+
+register_cache("orders.invoice")
+register_timing("orders.invoice_render")
+
+
+def link_callback(uri, rel):
+    if uri.startswith(settings.STATIC_URL):
+        path = os.path.join(settings.BASE_DIR, uri.replace(
+            settings.STATIC_URL, "static/"))
+    else:
+        return uri
+
+    if not os.path.isfile(path):
+        raise Exception(f"Media URI must exist: {path}")
+
+    return path
+
+
+def render_html(order):
+    logo_path = os.path.join(settings.BASE_DIR, "static/images/logo.png")
+    logo_path = logo_path.replace("\\", "/")
+
+    return get_template("orders/invoice_pdf.html").render({
+        "order": order,
+        "logo_path": f"file:///{logo_path}",
+    })
+
+
+def render_pdf(html):
+    """
+    PDF bytes of the invoice HTML, or None if xhtml2pdf failed.
+    """
+    started = time.perf_counter()
+
+    result = BytesIO()
+    pisa_status = pisa.CreatePDF(html, dest=result, link_callback=link_callback)
+
+    record_timing(
+        "orders.invoice_render",
+        (time.perf_counter() - started) * 1000,
+        error=bool(pisa_status.err),
+    )
+
+    if pisa_status.err:
+        return None
+
+    return result.getvalue()
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _load_order(order_id):
+    return (
+        Order.objects
+        .select_related("user")
+        .prefetch_related("items")
+        .get(id=order_id)
+    )
+
+
+# Order fields printed on the invoice
+INVOICE_FIELDS = (
+    "id",
+    "created_at",
+    "address_text",
+    "razorpay_refund_id",
+    "subtotal",
+    "shipping_fee",
+    "tax_amount",
+    "total_amount",
+)
+
+
+def _order_version(order):
+    """
+    Version of what the invoice shows; `order` needs its user and items
+    (prefetched, or one more query).
+    """
+    values = [getattr(order, field) for field in INVOICE_FIELDS]
+
+    values += [
+        order.user.username,
+        order.status == "cancelled",
+        order.payment_status == "paid",
+    ]
+
+    values += [
+        [item.product_name, item.quantity, item.unit_price, item.total_price]
+        for item in sorted(order.items.all(), key=lambda item: item.id)
+    ]
+
+    return _sha256(json.dumps(values, default=str).encode())
+
+
+def _current_version(order_id):
+    return _order_version(_load_order(order_id))
+
+
+def _is_current(invoice, snapshot_hash):
+    return (
+        invoice is not None
+        and invoice.file
+        and invoice.snapshot_hash == snapshot_hash
+        and default_storage.exists(invoice.file.name)
+    )
+
+
+def _drop_file(name):
+    # Identical PDFs share a file; keep it while anything points at it
+    if name and not Invoice.objects.filter(file=name).exists():
+        default_storage.delete(name)
+
+
+def render_invoice(order_id, force=False):
+    """
+    Make the stored invoice match the order. Returns the Invoice, or None
+    if the PDF could not be rendered.
+
+    The PDF is rendered without holding any lock; the Invoice row is only
+    locked to swap in the new file and version, and a render that lost
+    the race to an equally fresh one is discarded.
+    """
+    invoice, _ = Invoice.objects.get_or_create(order_id=order_id)
+
+    order = _load_order(order_id)
+    snapshot_hash = _order_version(order)
+
+    if not force and _is_current(invoice, snapshot_hash):
+        return invoice
+
+    pdf = render_pdf(render_html(order))
+
+    if pdf is None:
+        print(f"[INVOICE] Render failed for order {order.uuid}")
+        return None
+
+    content_hash = _sha256(pdf)
+    name = f"invoices/{content_hash[:2]}/{content_hash}.pdf"
+
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(pdf))
+
+    with transaction.atomic():
+
+        invoice = Invoice.objects.select_for_update().get(order_id=order_id)
+
+        # Someone stored a PDF of the order as it is now meanwhile
+        if not force and _is_current(invoice, _current_version(order_id)):
+            if invoice.file.name != name:
+                transaction.on_commit(lambda: _drop_file(name))
+            return invoice
+
+        old_name = invoice.file.name
+
+        invoice.file.name = name
+        invoice.content_hash = content_hash
+        invoice.snapshot_hash = snapshot_hash
+        invoice.size = len(pdf)
+        invoice.rendered_at = timezone.now()
+        invoice.save()
+
+        if old_name and old_name != name:
+            transaction.on_commit(lambda: _drop_file(old_name))
+
+    print(f"[INVOICE] Rendered invoice for order {order.uuid} ({len(pdf)} bytes)")
+    return invoice
+
+
+def get_invoice(order):
+    """
+    The current stored Invoice of a loaded order (with its user);
+    rendered inline if the background task has not caught up yet.
+    """
+    invoice = Invoice.objects.filter(order=order).first()
+
+    if _is_current(invoice, _order_version(order)):
+        record_cache_access("orders.invoice", hit=True)
+        return invoice
+
+    record_cache_access("orders.invoice", hit=False)
+    return render_invoice(order.id)
+
+
+def get_invoice_pdf(order):
+    """
+    PDF bytes for attachments (refund email), or None.
+    """
+    invoice = get_invoice(order)
+
+    if invoice is None:
+        return None
+
+    with invoice.file.open("rb") as f:
+        return f.read()
+
+
+# ==============================
+# BULK EXPORT (streamed ZIP)
+# ==============================
+#
+# stream_invoice_zip() yields a ZIP of the invoices of many orders:
+#
+#   - missing / stale PDFs are rendered in a process pool (xhtml2pdf is
+#     CPU bound), one chunk of orders ahead of the one being written
+#   - each stored PDF is copied into the archive and the bytes are
+#     yielded right away, so memory holds one chunk of futures and one
+#     PDF, whatever the number of orders
+#   - progress goes to the cache under the export token
+
+EXPORT_WORKERS = getattr(settings, "INVOICE_EXPORT_WORKERS", min(4, os.cpu_count() or 1))
+EXPORT_CHUNK = getattr(settings, "INVOICE_EXPORT_CHUNK", 32)
+EXPORT_PROGRESS_TTL = 60 * 60
+
+
+class _ZipStream:
+    """
+    Write-only sink for ZipFile; drain() hands over what was written.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def export_progress_key(token):
+    return f"invoices:export:{token}"
+
+
+def get_export_progress(token):
+    return cache.get(export_progress_key(token))
+
+
+def _set_progress(token, **progress):
+    if token:
+        cache.set(export_progress_key(token), progress, EXPORT_PROGRESS_TTL)
+
+
+def stream_invoice_zip(order_ids, total, token=None):
+    """
+    `order_ids`: iterable of order ids (e.g. values_list(...).iterator()).
+    Yields the ZIP bytes. Orders whose PDF fails to render are listed in
+    MISSING.txt at the end of the archive.
+    """
+    sink = _ZipStream()
+    archive = zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED)
+
+    done = 0
+    failed = []
+
+    _set_progress(token, done=0, total=total, failed=0, finished=False)
+
+    pool = ProcessPoolExecutor(
+        max_workers=EXPORT_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=invoice_worker.init_worker,
+    )
+
+    def write(futures):
+        nonlocal done
+
+        for future in futures:
+            order_id, name = future.result()
+
+            if name is None:
+                failed.append(order_id)
+            else:
+                with default_storage.open(name, "rb") as source, \
+                        archive.open(f"INV-{order_id:05d}.pdf", "w") as entry:
+                    shutil.copyfileobj(source, entry, 64 * 1024)
+
+            done += 1
+
+            yield sink.drain()
+
+        _set_progress(token, done=done, total=total, failed=len(failed), finished=False)
+
+    try:
+        pending = None
+        ids = iter(order_ids)
+
+        while True:
+            chunk = list(islice(ids, EXPORT_CHUNK))
+
+            if not chunk:
+                break
+
+            futures = [pool.submit(invoice_worker.render_for_export, order_id) for order_id in chunk]
+
+            if pending:
+                yield from write(pending)
+
+            pending = futures
+
+        if pending:
+            yield from write(pending)
+
+        if failed:
+            archive.writestr(
+                "MISSING.txt",
+                "Invoices that could not be rendered (order id):\n"
+                + "\n".join(str(order_id) for order_id in failed),
+            )
+
+        archive.close()
+        yield sink.drain()
+
+        _set_progress(token, done=done, total=total, failed=len(failed), finished=True)
+
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from apps.orders.rollups import backfill
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily analytics rollups (OrderDailyStats, "
+        "CustomerDailySpend) from Order, by default for the whole history."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="First day (YYYY-MM-DD), default: first order.")
+        parser.add_argument("--end", help="Last day (YYYY-MM-DD), default: today.")
+        parser.add_argument("--chunk-days", type=int, default=31)
+
+    def handle(self, *args, **options):
+        start = end = None
+
+        if options["start"]:
+            start = parse_date(options["start"])
+            if start is None:
+                raise CommandError("--start must be YYYY-MM-DD")
+
+        if options["end"]:
+            end = parse_date(options["end"])
+            if end is None:
+                raise CommandError("--end must be YYYY-MM-DD")
+
+        days = backfill(start, end, chunk_days=options["chunk_days"])
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rollups for {days} day(s)."))
@@ -0,0 +1,93 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from apps.catalog.management.commands._bench import measure, write_results
+from apps.orders.invoices import render_html, render_pdf
+from apps.orders.models import Invoice, Order, OrderItem
+
+
+BENCH_USERNAME = "bench-invoice"
+
+
+class Command(BaseCommand):
+    help = (
+        "Invoice download latency: rendering the PDF on every request "
+        "(old) vs serving the stored PDF (first request renders it)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lines", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        user, _ = get_user_model().objects.get_or_create(
+            username=BENCH_USERNAME,
+        )
+
+        order = Order.objects.create(
+            user=user,
+            address_text="Bench address",
+            status="processing",
+            payment_status="paid",
+            subtotal=Decimal("100.00"),
+            total_amount=Decimal("112.00"),
+            total_weight_kg=Decimal("1.000"),
+            tax_rate=Decimal("12.00"),
+            tax_amount=Decimal("12.00"),
+        )
+
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product_name=f"Bench item {i}",
+                color="Black",
+                size="M",
+                quantity=1,
+                weight_kg=Decimal("0.250"),
+                unit_price=Decimal("10.00"),
+                total_price=Decimal("10.00"),
+                variant_id=0,
+            )
+            for i in range(options["lines"])
+        ])
+
+        client = Client()
+        client.force_login(user)
+        url = reverse("orders:download_invoice", args=[order.uuid])
+
+        results = []
+
+        try:
+            for run in range(options["repeat"]):
+                with measure(results, f"render per request (old) #{run + 1}"):
+                    loaded = Order.objects.prefetch_related("items").get(id=order.id)
+                    render_pdf(render_html(loaded))
+
+            for run in range(options["repeat"] + 1):
+                label = (
+                    "download, first (renders)" if run == 0
+                    else f"download, stored #{run}"
+                )
+                with measure(results, label):
+                    response = client.get(url)
+                    b"".join(response.streaming_content)
+
+            etag = response["ETag"]
+            with measure(results, "download, If-None-Match (304)"):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+            if response.status_code != 304:
+                self.stderr.write(f"Expected 304, got {response.status_code}")
+
+        finally:
+            invoice = Invoice.objects.filter(order=order).first()
+            if invoice and invoice.file:
+                invoice.file.delete(save=False)
+            order.delete()
+            user.delete()
+
+        write_results(self.stdout, results)
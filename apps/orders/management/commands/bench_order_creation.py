@@ -0,0 +1,139 @@
+from dataclasses import replace
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+
+from apps.cart.models import Cart, CartItem
+from apps.catalog.management.commands._bench import (
+    seed_products,
+    drop_seed,
+    measure,
+    write_results,
+)
+from apps.catalog.models import ProductVariant
+from apps.orders.models import OrderItem
+from apps.orders.pricing import price_cart
+from apps.orders.services import materialize_order
+
+
+BENCH_USERNAME = "bench-orders"
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Price + materialize orders from 1/10/50/200-line carts "
+        "(queries + wall time). Every run is rolled back; the payment "
+        "gateway is not called."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lines", type=int, nargs="+", default=[1, 10, 50, 200],
+        )
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        lines = options["lines"]
+
+        subcategory = seed_products(max(lines), stdout=self.stdout)
+
+        user, _ = get_user_model().objects.get_or_create(
+            username=BENCH_USERNAME,
+        )
+        cart, _ = Cart.objects.get_or_create(user=user)
+
+        request = RequestFactory().post("/order/place-order/")
+        request.user = user
+        request.session = {}
+
+        variants = list(
+            ProductVariant.objects
+            .filter(product__subcategory=subcategory)
+            .select_related("product__subcategory")
+            .order_by("id")[:max(lines)]
+        )
+
+        results = []
+
+        try:
+            for count in lines:
+                cart.items.all().delete()
+                CartItem.objects.bulk_create([
+                    CartItem(
+                        cart=cart,
+                        variant=variant,
+                        quantity=1,
+                        product_name=variant.product.name,
+                        color=variant.color,
+                        size=variant.size,
+                        weight_kg=variant.weight_kg,
+                        price_per_kg=variant.product.subcategory.price_per_kg,
+                        unit_price=(
+                            variant.weight_kg
+                            * variant.product.subcategory.price_per_kg
+                        ),
+                    )
+                    for variant in variants[:count]
+                ])
+
+                for run in range(options["repeat"]):
+                    self._run(results, f"{count} lines: bulk #{run + 1}",
+                              request, cart, bulk=True)
+
+                self._run(results, f"{count} lines: per-row (old)",
+                          request, cart, bulk=False)
+
+        finally:
+            cart.items.all().delete()
+            cart.delete()
+            user.delete()
+            drop_seed()
+
+        write_results(self.stdout, results)
+
+    def _run(self, results, label, request, cart, bulk):
+        try:
+            with transaction.atomic():
+                with measure(results, label):
+                    priced = price_cart(cart, request.user)
+
+                    if bulk:
+                        materialize_order(request, priced, "Bench address")
+                    else:
+                        self._per_row(request, priced)
+
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _per_row(self, request, priced):
+        # The previous shape: one INSERT (and a category lookup) per line
+        order = materialize_order(
+            request, replace(priced, lines=()), "Bench address",
+        )
+
+        for line in priced.lines:
+            product = ProductVariant.objects.select_related(
+                "product__subcategory",
+            ).get(id=line.item.variant_id).product
+
+            OrderItem.objects.create(
+                order=order,
+                product_name=product.name,
+                color=line.item.color,
+                size=line.item.size,
+                quantity=line.item.quantity,
+                weight_kg=line.item.weight_kg,
+                unit_price=line.unit_price,
+                total_price=line.line_total,
+                variant_id=line.item.variant_id,
+                product_url=request.build_absolute_uri(
+                    product.get_absolute_url()
+                ),
+            )
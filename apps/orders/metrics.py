@@ -0,0 +1,99 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q, Sum
+
+from surplus_store_project.cache import get_tag_version, invalidate_tags
+from surplus_store_project.metrics import record_cache_access, register_cache
+
+from .models import Order, OrderDailyStats
+
+
+# ==============================
+# ORDER SUMMARY COUNTERS
+# ==============================
+#
+# Every summary number of the dashboard / analytics comes from ONE
+# conditional aggregate over the daily rollups (orders.rollups):
+#
+#   SUM(orders), SUM(orders) FILTER (WHERE status = 'delivered'), ...
+#
+# and is cached per date window for a few seconds. Every rollup refresh
+# bumps the "orders.summary" cache tag, so the counters change as soon
+# as the rollups do.
+
+ORDER_METRICS_CACHE_TTL = getattr(settings, "ORDER_METRICS_CACHE_TTL", 30)
+
+STATUSES = [value for value, _ in Order.ORDER_STATUS_CHOICES]
+
+SUMMARY_TAG = "orders.summary"
+
+register_cache("orders.summary")
+
+
+def _aggregates():
+    aggregates = {
+        "total_orders": Sum("orders", default=0),
+        "paid_orders": Sum("paid_orders", default=0),
+        "total_revenue": Sum("revenue", default=0),
+        "refund_count": Sum("refunds", default=0),
+        "total_refunded": Sum("refunded_amount", default=0),
+    }
+
+    for status in STATUSES:
+        aggregates[f"status_{status}"] = Sum(
+            "orders", filter=Q(status=status), default=0,
+        )
+
+    return aggregates
+
+
+def summary_cache_key(start_date=None, end_date=None):
+    version = get_tag_version(SUMMARY_TAG)
+    return f"orders:summary:{version}:{start_date or ''}:{end_date or ''}"
+
+
+def invalidate_order_summary():
+    invalidate_tags(SUMMARY_TAG)
+
+
+def order_summary(start_date=None, end_date=None):
+    """
+    Counters for orders created between the two days (inclusive; None =
+    open ended):
+
+        {"total_orders", "paid_orders", "total_revenue", "refund_count",
+         "total_refunded", "by_status": {"pending": 3, ...}}
+    """
+    key = summary_cache_key(start_date, end_date)
+
+    summary = cache.get(key)
+    record_cache_access("orders.summary", hit=summary is not None)
+
+    if summary is not None:
+        return summary
+
+    stats = OrderDailyStats.objects.all()
+
+    if start_date:
+        stats = stats.filter(date__gte=start_date)
+
+    if end_date:
+        stats = stats.filter(date__lte=end_date)
+
+    row = stats.aggregate(**_aggregates())
+
+    summary = {
+        "total_orders": row["total_orders"],
+        "paid_orders": row["paid_orders"],
+        "total_revenue": row["total_revenue"],
+        "refund_count": row["refund_count"],
+        "total_refunded": row["total_refunded"],
+        "by_status": {
+            status: row[f"status_{status}"]
+            for status in STATUSES
+        },
+    }
+
+    cache.set(key, summary, ORDER_METRICS_CACHE_TTL)
+
+    return summary
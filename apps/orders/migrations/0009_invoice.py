@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_order_pending_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Invoice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(blank=True, upload_to='invoices/')),
+                ('content_hash', models.CharField(blank=True, help_text='SHA-256 of the PDF (served as ETag)', max_length=64)),
+                ('snapshot_hash', models.CharField(blank=True, help_text='SHA-256 of the rendered invoice HTML', max_length=64)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('rendered_at', models.DateTimeField(blank=True, null=True)),
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='invoice', to='orders.order')),
+            ],
+        ),
+    ]
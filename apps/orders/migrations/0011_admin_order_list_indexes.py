@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:33
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Built without locking writes on large tables
+    atomic = False
+
+    dependencies = [
+        ('orders', '0010_order_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(fields=['created_at', 'id'], name='order_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='order_status_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(fields=['payment_status', 'created_at', 'id'], name='order_payment_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(condition=models.Q(('razorpay_payment_id__isnull', False)), fields=['razorpay_payment_id'], name='order_rzp_payment_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(condition=models.Q(('razorpay_refund_id__isnull', False)), fields=['razorpay_refund_id'], name='order_rzp_refund_idx'),
+        ),
+    ]
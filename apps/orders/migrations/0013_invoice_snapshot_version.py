@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0012_order_status_batch'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='invoice',
+            name='snapshot_hash',
+            field=models.CharField(blank=True, help_text='Version of the order the PDF was rendered from', max_length=64),
+        ),
+    ]
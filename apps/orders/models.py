@@ -144,6 +144,38 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Expiry sweep (orders.tasks.expire_pending_orders)
+            models.Index(
+                fields=["created_at"],
+                condition=Q(status="pending"),
+                name="order_pending_created_idx",
+            ),
+            # Admin order list: keyset pages, newest first, per filter
+            models.Index(
+                fields=["created_at", "id"],
+                name="order_created_idx",
+            ),
+            models.Index(
+                fields=["status", "created_at", "id"],
+                name="order_status_created_idx",
+            ),
+            models.Index(
+                fields=["payment_status", "created_at", "id"],
+                name="order_payment_created_idx",
+            ),
+            # Admin search by Razorpay id (mostly NULL, so partial)
+            models.Index(
+                fields=["razorpay_payment_id"],
+                condition=Q(razorpay_payment_id__isnull=False),
+                name="order_rzp_payment_idx",
+            ),
+            models.Index(
+                fields=["razorpay_refund_id"],
+                condition=Q(razorpay_refund_id__isnull=False),
+                name="order_rzp_refund_idx",
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["user"],
@@ -200,3 +232,159 @@ class OrderItem(models.Model):
 
     def __str__(self):
         return f"{self.product_name} × {self.quantity}"
+
+
+class Invoice(models.Model):
+    """
+    Stored invoice PDF of an order (see orders.invoices).
+    """
+
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.CASCADE,
+        related_name="invoice"
+    )
+
+    # invoices/<hash[:2]>/<hash>.pdf — named by content
+    file = models.FileField(upload_to="invoices/", blank=True)
+
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="SHA-256 of the PDF (served as ETag)"
+    )
+
+    snapshot_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Version of the order the PDF was rendered from"
+    )
+
+    size = models.PositiveIntegerField(default=0)
+
+    rendered_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Invoice for {self.order.uuid}"
+
+
+# ==============================
+# ANALYTICS ROLLUPS (see orders.rollups)
+# ==============================
+
+class OrderDailyStats(models.Model):
+    """
+    Orders created on `date` with a given status.
+    """
+
+    date = models.DateField()
+
+    status = models.CharField(
+        max_length=20,
+        choices=Order.ORDER_STATUS_CHOICES
+    )
+
+    orders = models.PositiveIntegerField(default=0)
+
+    paid_orders = models.PositiveIntegerField(default=0)
+
+    revenue = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal("0.00"),
+        help_text="Total of paid orders"
+    )
+
+    refunds = models.PositiveIntegerField(default=0)
+
+    refunded_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal("0.00")
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "status"],
+                name="unique_order_daily_stats"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.status}: {self.orders}"
+
+
+class CustomerDailySpend(models.Model):
+    """
+    Paid orders created on `date` by one customer.
+    """
+
+    date = models.DateField()
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+"
+    )
+
+    orders = models.PositiveIntegerField(default=0)
+
+    spent = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal("0.00")
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "user"],
+                name="unique_customer_daily_spend"
+            )
+        ]
+
+
+class RollupDirtyDay(models.Model):
+    """
+    A day whose rollups must be recomputed (an order of it changed).
+    """
+
+    date = models.DateField(unique=True)
+
+    marked_at = models.DateTimeField(auto_now_add=True)
+
+
+class OrderStatusBatch(models.Model):
+    """
+    Audit row of one bulk status change (see orders.state_machine): who
+    moved which orders to what, and how each of them fared.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="order_status_batches"
+    )
+
+    to_status = models.CharField(
+        max_length=20,
+        choices=Order.ORDER_STATUS_CHOICES
+    )
+
+    requested = models.PositiveIntegerField(default=0)
+
+    updated = models.PositiveIntegerField(default=0)
+
+    # [{"order_id", "uuid", "from", "ok", "message"}, ...]
+    results = models.JSONField(default=list)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.updated}/{self.requested} orders → {self.to_status}"
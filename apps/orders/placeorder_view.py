@@ -5,24 +5,27 @@ from django.contrib import messages
 from django.db import transaction
 from django.conf import settings
 from django.http import JsonResponse
+from django.core.exceptions import ValidationError
 from django.utils import timezone
 
 from datetime import timedelta
 
 from apps.cart.models import Cart
+from apps.catalog.inventory import release_reservations, PENDING_ORDER_MINUTES
 from apps.orders.models import Order
-from apps.payments.models import Payment
-from apps.payments.services import create_razorpay_order
+from apps.payments.services import start_payment_attempt
 
 from .services import create_order_from_checkout
 
 from .services import cart_matches_order
 
+from surplus_store_project.idempotency import idempotent
+
 
 
 @login_required(login_url="accounts:login")
 @require_POST
-@transaction.atomic
+@idempotent
 def place_order(request):
 
     print("PLACE ORDER CALLED")
@@ -40,139 +43,125 @@ def place_order(request):
         })
 
     # -------------------------------------------------
-    # 2️⃣ Check Pending Order
+    # 2️⃣ Check Pending Order (short transaction)
     # -------------------------------------------------
-
-    pending_order = (
-        Order.objects
-        .select_for_update()
-        .filter(
-            user=request.user,
-            status="pending",
-            payment_status="pending"
+    with transaction.atomic():
+
+        pending_order = (
+            Order.objects
+            .select_for_update()
+            .filter(
+                user=request.user,
+                status="pending",
+                payment_status="pending"
+            )
+            .first()
         )
-        .first()
-    )
 
-    if pending_order:
-        
-
-        # -------------------------------
-        # Expire order after 30 minutes
-        # -------------------------------
-        if pending_order.created_at < timezone.now() - timedelta(minutes=30):
+        if pending_order:
 
-            pending_order.status = "cancelled"
-            pending_order.payment_status = "failed"
-            pending_order.save()
+            # -------------------------------
+            # Expire order after 30 minutes
+            # -------------------------------
+            if pending_order.created_at < timezone.now() - timedelta(minutes=PENDING_ORDER_MINUTES):
 
-            pending_order = None
+                pending_order.status = "cancelled"
+                pending_order.payment_status = "failed"
+                pending_order.save()
 
-        # -------------------------------
-        # Detect cart changes
-        # -------------------------------
-        elif not cart_matches_order(cart, pending_order):
+                release_reservations(str(pending_order.uuid))
 
-            pending_order.status = "cancelled"
-            pending_order.payment_status = "failed"
-            pending_order.save()
+                pending_order = None
 
-            pending_order = None
+            # -------------------------------
+            # Detect cart changes
+            # -------------------------------
+            elif not cart_matches_order(cart, pending_order):
 
-        # -------------------------------
-        # Reuse order if still valid
-        # -------------------------------
-        if pending_order:
+                pending_order.status = "cancelled"
+                pending_order.payment_status = "failed"
+                pending_order.save()
 
+                release_reservations(str(pending_order.uuid))
 
-            # Reset order payment status for retry
-            pending_order.payment_status = "pending"
-            pending_order.save(update_fields=["payment_status"])
+                pending_order = None
 
-            Payment.objects.filter(order=pending_order).exclude(status="success").update(status="failed")
+    order = pending_order
 
-            # Create new Razorpay order
-            razorpay_order = create_razorpay_order(pending_order)
+    if not order:
 
+        # -------------------------------------------------
+        # 3️⃣ Get Shipping + Address
+        # -------------------------------------------------
+        shipping_method = request.POST.get("shipping_method", "standard")
+        address_id = request.POST.get("selected_address")
 
-            if not razorpay_order:
+        if not address_id:
+            messages.error(request, "Please select delivery address.")
+            return JsonResponse({
+                "success": False,
+                "error": "Address not selected"
+            })
 
-                return JsonResponse({
-                    "success": False,
-                    "error": "Payment gateway unavailable. Please retry."
-                })
+        address = get_object_or_404(
+            request.user.addresses,
+            id=address_id
+        )
 
-            # Create new payment attempt
-            Payment.objects.create(
-                order=pending_order,
-                gateway="razorpay",
-                razorpay_order_id=razorpay_order["id"],
-                amount=pending_order.total_amount,
-                status="created"
+        # -------------------------------------------------
+        # 4️⃣ Create Address Snapshot
+        # -------------------------------------------------
+        address_text = f"""
+            {address.full_name}
+            {address.address_line_1}
+            {address.address_line_2 or ""}
+            {address.city}, {address.state} - {address.pincode}
+            {address.country}
+        """
+
+        # -------------------------------------------------
+        # 5️⃣ Create Order (committed before the gateway call)
+        # -------------------------------------------------
+        try:
+
+            order = create_order_from_checkout(
+                request=request,
+                cart=cart,
+                shipping_method=shipping_method,
+                address_text=address_text,
             )
 
-            return JsonResponse({
-                "success": True,
-                "order_uuid": str(pending_order.uuid),
-                "razorpay_order_id": razorpay_order["id"],
-                "amount": int(pending_order.total_amount * 100),
-                "key": settings.RAZORPAY_KEY_ID
-            })                                                                                                                                      
+        except ValidationError as e:
 
-    # -------------------------------------------------
-    # 3️⃣ Get Shipping + Address
-    # -------------------------------------------------
-    shipping_method = request.POST.get("shipping_method", "standard")
-    address_id = request.POST.get("selected_address")
+            # Cart changed / stock held by other checkouts
+            return JsonResponse({
+                "success": False,
+                "error": e.messages[0]
+            })
 
-    if not address_id:
-        messages.error(request, "Please select delivery address.")
-        return JsonResponse({
-            "success": False,
-            "error": "Address not selected"
-        })
+        except Exception as e:
 
-    address = get_object_or_404(
-        request.user.addresses,
-        id=address_id
-    )
+            print("PLACE ORDER ERROR:", e)
 
-    # -------------------------------------------------
-    # 4️⃣ Create Address Snapshot
-    # -------------------------------------------------
-    address_text = f"""
-        {address.full_name}
-        {address.address_line_1}
-        {address.address_line_2 or ""}
-        {address.city}, {address.state} - {address.pincode}
-        {address.country}
-    """
+            return JsonResponse({
+                "success": False,
+                "error": "Unable to create order. Please try again."
+            })
 
     # -------------------------------------------------
-    # 5️⃣ Create Order
+    # 6️⃣ Razorpay Order (no transaction / lock held)
+    #    + Payment attempt (short transaction)
     # -------------------------------------------------
+    razorpay_order = start_payment_attempt(order)
 
-    try:
-
-        order, razorpay_order = create_order_from_checkout(
-            request=request,
-            cart=cart,
-            shipping_method=shipping_method,
-            address_text=address_text,
-        )
-
-
-    except Exception as e:
-
-        print("PLACE ORDER ERROR:", e)
-
+    if not razorpay_order:
         return JsonResponse({
             "success": False,
-            "error": "Unable to create order. Please try again."
+            "error": "Payment gateway unavailable. Please retry."
         })
 
     # -------------------------------------------------
-    # 6️⃣ Return Razorpay Data
+    # 7️⃣ Return Razorpay Data
     # -------------------------------------------------
     return JsonResponse({
         "success": True,
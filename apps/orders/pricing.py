@@ -0,0 +1,194 @@
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+
+from apps.cart.services import annotate_item_status, CartItemStatus, round_money
+from apps.promotions.services import validate_promo_for_cart
+
+
+# ==============================
+# CART PRICING
+# ==============================
+#
+# Every checkout number (subtotal, weight, promo discount, tax, shipping,
+# total) is computed here, in one pass over the cart lines loaded once.
+# The checkout page, the AJAX summary, the promo endpoint and order
+# creation all consume the same PricedCart, so what the customer sees is
+# exactly what the order is created with.
+#
+# Prices are recalculated from the LIVE subcategory price, not the
+# snapshot stored on the cart item.
+
+# 12% — whole rupee rounding intentional
+TAX_RATE = Decimal("12.00")
+
+SHIPPING_OPTIONS = {
+    "standard": {"fee": Decimal("0.00"), "min_days": 7, "max_days": 8},
+    "express": {"fee": Decimal("99.00"), "min_days": 4, "max_days": 5},
+}
+
+
+def shipping_option(shipping_method):
+    """
+    (method, option) — unknown methods fall back to standard.
+    """
+    if shipping_method not in SHIPPING_OPTIONS:
+        shipping_method = "standard"
+    return shipping_method, SHIPPING_OPTIONS[shipping_method]
+
+
+@dataclass(frozen=True)
+class PricedLine:
+    item: object
+    status: str
+    unit_price: Decimal
+    line_total: Decimal
+    weight_kg: Decimal
+
+
+@dataclass(frozen=True)
+class PricedCart:
+    cart: object
+    lines: tuple
+
+    subtotal: Decimal
+    total_weight: Decimal
+
+    promo_code: str
+    promo: object
+    promo_error: str
+    discount: Decimal
+
+    taxable_amount: Decimal
+    tax_rate: Decimal
+    tax_amount: Decimal
+
+    shipping_method: str
+    shipping_fee: Decimal
+
+    total: Decimal
+
+    @property
+    def is_empty(self):
+        return not self.lines
+
+    @property
+    def is_valid(self):
+        return all(line.status == CartItemStatus.VALID for line in self.lines)
+
+    def as_summary(self):
+        return {
+            "subtotal": str(self.subtotal),
+            "discount": str(self.discount),
+            "shipping": str(self.shipping_fee),
+            "tax": str(self.tax_amount),
+            "total": str(self.total),
+            "weight": str(round(self.total_weight, 3)),
+        }
+
+
+def _quantize(value):
+    return value.quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+
+
+def price_cart(cart, user, shipping_method="standard", promo_code=None):
+    lines = []
+    subtotal = Decimal("0.00")
+    total_weight = Decimal("0.000")
+
+    items = annotate_item_status(cart.items.select_related(
+        "variant",
+        "variant__product",
+        "variant__product__subcategory",
+        "variant__product__subcategory__category",
+    ))
+
+    for item in items:
+        unit_price = round_money(
+            item.variant.weight_kg
+            * item.variant.product.subcategory.price_per_kg
+        )
+        line_total = round_money(unit_price * item.quantity)
+        weight = item.weight_kg * item.quantity
+
+        subtotal += line_total
+        total_weight += weight
+
+        lines.append(PricedLine(
+            item=item,
+            status=item.line_status,
+            unit_price=unit_price,
+            line_total=line_total,
+            weight_kg=weight,
+        ))
+
+    subtotal = round_money(subtotal)
+
+    # ---------- PROMO ----------
+    promo = None
+    promo_error = None
+    discount = Decimal("0.00")
+
+    if promo_code and lines:
+        result = validate_promo_for_cart(
+            user=user,
+            cart=cart,
+            code=promo_code,
+            subtotal=subtotal,
+        )
+
+        if result.success:
+            promo = result.promo
+            discount = round_money(result.discount)
+        else:
+            promo_error = result.error
+            promo_code = None
+    else:
+        promo_code = None
+
+    taxable_amount = max(subtotal - discount, Decimal("0.00"))
+
+    # ---------- TAX + SHIPPING + TOTAL ----------
+    tax_amount = _quantize(taxable_amount * TAX_RATE / Decimal("100"))
+
+    shipping_method, option = shipping_option(shipping_method)
+    shipping_fee = option["fee"]
+
+    total = _quantize(taxable_amount + tax_amount + shipping_fee)
+
+    return PricedCart(
+        cart=cart,
+        lines=tuple(lines),
+        subtotal=subtotal,
+        total_weight=total_weight,
+        promo_code=promo_code,
+        promo=promo,
+        promo_error=promo_error,
+        discount=discount,
+        taxable_amount=taxable_amount,
+        tax_rate=TAX_RATE,
+        tax_amount=tax_amount,
+        shipping_method=shipping_method,
+        shipping_fee=shipping_fee,
+        total=total,
+    )
+
+
+def get_priced_cart(request, cart, shipping_method="standard"):
+    """
+    PricedCart for the promo applied in the session, memoized on the
+    request (the same request never prices the same cart twice).
+    """
+    promo_code = request.session.get("applied_promo")
+
+    key = (cart.id, shipping_option(shipping_method)[0], promo_code)
+
+    memo = request.__dict__.setdefault("_priced_carts", {})
+    if key not in memo:
+        memo[key] = price_cart(
+            cart,
+            request.user,
+            shipping_method=shipping_method,
+            promo_code=promo_code,
+        )
+
+    return memo[key]
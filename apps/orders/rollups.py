@@ -0,0 +1,270 @@
+from datetime import datetime, time, timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .metrics import invalidate_order_summary
+from .models import Order, OrderDailyStats, CustomerDailySpend, RollupDirtyDay
+
+
+# ==============================
+# ANALYTICS ROLLUPS
+# ==============================
+#
+# Admin analytics read per-day tables instead of scanning Order:
+#
+#   OrderDailyStats      (date, status) → orders, paid, revenue, refunds
+#   CustomerDailySpend   (date, user)   → paid orders, spent
+#
+# Orders are bucketed by the day they were created. A day is always
+# recomputed as a whole from its own orders (idempotent, no deltas to
+# get wrong):
+#
+#   1. any change to an order marks its day dirty (RollupDirtyDay) —
+#      the post_save / post_delete signals, or mark_orders_dirty() after
+#      a queryset .update()
+#   2. after commit a refresh task is queued (coalesced through a cache
+#      flag), and the beat job picks up anything left over
+#   3. the refresh claims dirty days with SKIP LOCKED, deletes them in a
+#      short transaction of their own and only then rebuilds them — an
+#      order saved meanwhile re-inserts its day instead of waiting behind
+#      the rebuild
+#
+# `backfill_order_rollups` rebuilds any range from scratch.
+
+ANALYTICS_MAX_DAYS = getattr(settings, "ANALYTICS_MAX_DAYS", 365)
+
+# Changes within this many seconds share one refresh
+ROLLUP_REFRESH_DELAY = getattr(settings, "ROLLUP_REFRESH_DELAY", 5)
+
+SCHEDULED_FLAG = "orders:rollups:scheduled"
+
+# Advisory lock class of a day's rebuild (pg_advisory_xact_lock(class, day))
+REBUILD_LOCK = 4021
+
+PAID = Q(payment_status="paid")
+REFUNDED = Q(refund_status="processed")
+
+
+def order_day(created_at):
+    return timezone.localtime(created_at).date()
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+# ---------- DIRTY DAYS ----------
+
+def mark_dirty(days):
+    days = {day for day in days if day}
+
+    if not days:
+        return
+
+    RollupDirtyDay.objects.bulk_create(
+        [RollupDirtyDay(date=day) for day in days],
+        ignore_conflicts=True,
+    )
+
+    transaction.on_commit(schedule_refresh)
+
+
+def mark_orders_dirty(order_ids):
+    """
+    For queryset .update() calls, which skip the signals.
+    """
+    mark_dirty(
+        order_day(created_at)
+        for created_at in Order.objects.filter(id__in=order_ids).values_list(
+            "created_at", flat=True
+        ).order_by()
+    )
+
+
+def schedule_refresh():
+    from .tasks import refresh_order_rollups
+
+    if not cache.add(SCHEDULED_FLAG, 1, ROLLUP_REFRESH_DELAY * 6):
+        return
+
+    try:
+        refresh_order_rollups.apply_async(countdown=ROLLUP_REFRESH_DELAY)
+    except Exception as e:
+        # The beat job picks the dirty days up anyway
+        cache.delete(SCHEDULED_FLAG)
+        print(f"[ROLLUPS] Could not queue refresh: {repr(e)}")
+
+
+# ---------- REFRESH ----------
+
+@transaction.atomic
+def refresh_days(days):
+    """
+    Recompute the rollups of the given days from their orders.
+    """
+    days = sorted(set(days))
+
+    if not days:
+        return 0
+
+    # Rebuilds of the same day take turns (sorted, so they cannot deadlock)
+    with connection.cursor() as cursor:
+        for day in days:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(%s, %s)",
+                [REBUILD_LOCK, day.toordinal()],
+            )
+
+    # Ranges rather than created_at__date, so the index is used
+    orders = Order.objects.filter(reduce(or_, [
+        Q(created_at__gte=_day_start(day),
+          created_at__lt=_day_start(day + timedelta(days=1)))
+        for day in days
+    ])).order_by()
+
+    stats = (
+        orders
+        .annotate(day=TruncDate("created_at"))
+        .values("day", "status")
+        .annotate(
+            orders=Count("id"),
+            paid_orders=Count("id", filter=PAID),
+            revenue=Sum("total_amount", filter=PAID, default=0),
+            refunds=Count("id", filter=REFUNDED),
+            refunded_amount=Sum("total_amount", filter=REFUNDED, default=0),
+        )
+    )
+
+    spend = (
+        orders
+        .filter(PAID)
+        .annotate(day=TruncDate("created_at"))
+        .values("day", "user_id")
+        .annotate(orders=Count("id"), spent=Sum("total_amount"))
+    )
+
+    OrderDailyStats.objects.filter(date__in=days).delete()
+    CustomerDailySpend.objects.filter(date__in=days).delete()
+
+    OrderDailyStats.objects.bulk_create([
+        OrderDailyStats(
+            date=row["day"],
+            status=row["status"],
+            orders=row["orders"],
+            paid_orders=row["paid_orders"],
+            revenue=row["revenue"],
+            refunds=row["refunds"],
+            refunded_amount=row["refunded_amount"],
+        )
+        for row in stats
+    ])
+
+    CustomerDailySpend.objects.bulk_create([
+        CustomerDailySpend(
+            date=row["day"],
+            user_id=row["user_id"],
+            orders=row["orders"],
+            spent=row["spent"],
+        )
+        for row in spend
+    ])
+
+    transaction.on_commit(invalidate_order_summary)
+
+    return len(days)
+
+
+def refresh_dirty_days(limit=366):
+    """
+    Rebuild the days marked dirty. Concurrent runs skip each other's
+    days; a day marked again meanwhile is rebuilt on the next run.
+    """
+    cache.delete(SCHEDULED_FLAG)
+
+    refreshed = 0
+
+    while True:
+        # Claimed and committed before the rebuild, so mark_dirty() never
+        # waits on these rows
+        with transaction.atomic():
+
+            dirty = list(
+                RollupDirtyDay.objects
+                .select_for_update(skip_locked=True)
+                .order_by("date")
+                .values_list("id", "date")[:limit]
+            )
+
+            if not dirty:
+                return refreshed
+
+            RollupDirtyDay.objects.filter(
+                id__in=[dirty_id for dirty_id, _ in dirty]
+            ).delete()
+
+        days = [day for _, day in dirty]
+
+        try:
+            refreshed += refresh_days(days)
+        except Exception:
+            # Left for the next run
+            mark_dirty(days)
+            raise
+
+
+def backfill(start=None, end=None, chunk_days=31):
+    """
+    Rebuild every day from `start` (first order) to `end` (today).
+    """
+    if start is None:
+        first = Order.objects.order_by("created_at").values_list(
+            "created_at", flat=True
+        ).first()
+
+        if first is None:
+            return 0
+
+        start = order_day(first)
+
+    end = end or timezone.localdate()
+
+    refreshed = 0
+    day = start
+
+    while day <= end:
+        chunk_end = min(day + timedelta(days=chunk_days - 1), end)
+
+        refreshed += refresh_days(
+            day + timedelta(days=offset)
+            for offset in range((chunk_end - day).days + 1)
+        )
+
+        day = chunk_end + timedelta(days=1)
+
+    return refreshed
+
+
+# ---------- READ ----------
+
+def clamp_days(value, default=30):
+    try:
+        days = int(value)
+    except (TypeError, ValueError):
+        days = default
+
+    return min(max(days, 1), ANALYTICS_MAX_DAYS)
+
+
+def window(days):
+    """
+    (first_day, last_day) of the last `days` days, today included.
+    """
+    end = timezone.localdate()
+    return end - timedelta(days=days - 1), end
@@ -0,0 +1,13 @@
+from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete
+
+from .models import Order
+from .rollups import mark_dirty, order_day
+
+
+# ---------- ANALYTICS ROLLUPS (day of the order) ----------
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def mark_rollup_day_dirty(sender, instance, **kwargs):
+    mark_dirty([order_day(instance.created_at)])
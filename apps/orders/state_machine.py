@@ -0,0 +1,195 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.catalog.inventory import release_reservations
+
+from .models import Order, OrderStatusBatch
+from .rollups import mark_orders_dirty
+
+
+# ==============================
+# ORDER STATUS STATE MACHINE
+# ==============================
+#
+# The one table of status changes an admin may make. The order detail
+# page, the list's "Update Status" button and the bulk action all check
+# against it.
+#
+# Bulk changes are set-based: the requested orders are locked once,
+# checked here, and moved with one
+#
+#   UPDATE orders_order SET status = <to> WHERE id IN (...) AND status = <from>
+#
+# per source status. The side effects (stock holds, rollups) run once
+# for the whole set, and the batch leaves one OrderStatusBatch audit row
+# holding the per-order results.
+
+TRANSITIONS = {
+    "pending": ("processing", "cancelled"),
+    "processing": ("shipped", "cancelled"),
+    "shipped": ("out_for_delivery",),
+    "out_for_delivery": ("delivered",),
+    "delivered": (),
+    "cancelled": (),
+}
+
+# Most orders one bulk request may touch
+BULK_STATUS_LIMIT = getattr(settings, "BULK_STATUS_LIMIT", 1000)
+
+STATUS_LABELS = dict(Order.ORDER_STATUS_CHOICES)
+
+
+def allowed_targets(status):
+    return TRANSITIONS.get(status, ())
+
+
+def transition_error(order, new_status):
+    """
+    Why `order` cannot move to `new_status`, or None if it can.
+    """
+    if new_status not in TRANSITIONS:
+        return f"Unknown status: {new_status}"
+
+    if not allowed_targets(order.status):
+        return f"{STATUS_LABELS.get(order.status, order.status)} orders cannot be modified"
+
+    if new_status not in allowed_targets(order.status):
+        return f"Invalid status change: {order.status} → {new_status}"
+
+    # Paid orders are cancelled through the refund flow
+    if (
+        new_status == "cancelled"
+        and order.payment_status == "paid"
+        and order.refund_status != "processed"
+    ):
+        return "Cannot cancel a paid order without refund"
+
+    return None
+
+
+def after_transition(orders, new_status):
+    """
+    Side effects of orders having just moved to `new_status`.
+    """
+    # Unpaid order cancelled → its stock is available again
+    if new_status == "cancelled":
+        release_reservations(*[str(order.uuid) for order in orders])
+
+
+# ---------- ONE ORDER ----------
+
+def transition(order, new_status):
+    """
+    Move one order. Returns an error message, or None once it is done.
+    """
+    with transaction.atomic():
+
+        locked = Order.objects.select_for_update().get(id=order.id)
+
+        error = transition_error(locked, new_status)
+
+        if error:
+            return error
+
+        locked.status = new_status
+        locked.save(update_fields=["status", "updated_at"])
+
+        after_transition([locked], new_status)
+
+    order.status = new_status
+    return None
+
+
+# ---------- MANY ORDERS ----------
+
+def bulk_transition(order_ids, new_status, user=None):
+    """
+    Move every order of `order_ids` that may go to `new_status`; the
+    others are left alone. Returns the OrderStatusBatch, whose `results`
+    say what happened to each requested order (in request order).
+    """
+    order_ids = list(dict.fromkeys(order_ids))
+
+    if new_status not in TRANSITIONS:
+        raise ValueError(f"Unknown status: {new_status}")
+
+    if len(order_ids) > BULK_STATUS_LIMIT:
+        raise ValueError(f"At most {BULK_STATUS_LIMIT} orders per batch")
+
+    with transaction.atomic():
+
+        # Locked in id order, so overlapping batches cannot deadlock
+        orders = {
+            order.id: order
+            for order in (
+                Order.objects
+                .select_for_update()
+                .filter(id__in=order_ids)
+                .only("id", "uuid", "status", "payment_status", "refund_status")
+                .order_by("id")
+            )
+        }
+
+        results = []
+        by_source = defaultdict(list)
+
+        for order_id in order_ids:
+            order = orders.get(order_id)
+
+            if order is None:
+                results.append({
+                    "order_id": order_id,
+                    "uuid": None,
+                    "from": None,
+                    "ok": False,
+                    "message": "Order not found",
+                })
+                continue
+
+            error = transition_error(order, new_status)
+
+            results.append({
+                "order_id": order_id,
+                "uuid": str(order.uuid),
+                "from": order.status,
+                "ok": error is None,
+                "message": error or f"{order.status} → {new_status}",
+            })
+
+            if error is None:
+                by_source[order.status].append(order)
+
+        now = timezone.now()
+        moved = []
+
+        for source, group in by_source.items():
+            Order.objects.filter(
+                id__in=[order.id for order in group],
+                status=source,
+            ).update(status=new_status, updated_at=now)
+
+            moved.extend(group)
+
+        if moved:
+            after_transition(moved, new_status)
+
+            # .update() skips the signals that keep the rollups in sync
+            mark_orders_dirty([order.id for order in moved])
+
+        batch = OrderStatusBatch.objects.create(
+            user=user,
+            to_status=new_status,
+            requested=len(order_ids),
+            updated=len(moved),
+            results=results,
+        )
+
+    print(
+        f"[ORDERS] Bulk status → {new_status}: {len(moved)}/{len(order_ids)} "
+        f"moved (batch {batch.id})"
+    )
+
+    return batch
@@ -1,11 +1,20 @@
 from celery import shared_task
-import razorpay
 from django.conf import settings
 from django.core.mail import EmailMessage
 from django.db import transaction
+from django.utils import timezone
+
+from datetime import timedelta
 
 from .models import Order
-from .invoice_view import generate_invoice_pdf
+from .invoices import get_invoice_pdf, render_invoice
+from .rollups import mark_orders_dirty, refresh_dirty_days
+
+from apps.payments.gateway import get_gateway
+from apps.payments.models import Payment
+from apps.catalog.inventory import release_reservations, PENDING_ORDER_MINUTES
+
+from surplus_store_project.metrics import record_job, register_job
 
 
 # -------------------------------------------------
@@ -52,16 +61,7 @@ def process_refund(self, order_id):
         print("Refund amount:", amount)
         print("Calling Razorpay refund API...")
 
-        client = razorpay.Client(
-            auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
-        )
-
-        refund = client.payment.refund(
-            order.razorpay_payment_id,
-            {
-                "amount": amount
-            }
-        )
+        refund = get_gateway().refund(order.razorpay_payment_id, amount)
 
         print("Refund response:", refund)
 
@@ -82,15 +82,41 @@ def process_refund(self, order_id):
         print("❌ FINAL FAILURE — NOT RETRYING")
 
 
+# -------------------------------------------------
+# 🔹 INVOICE PRE-RENDER TASK
+# -------------------------------------------------
+# Queued when an order is paid or refunded; no-op if the stored PDF
+# already matches the order.
+@shared_task(bind=True, max_retries=3)
+def render_order_invoice(self, order_id):
+    try:
+        if render_invoice(order_id) is None:
+            print(f"[INVOICE ERROR] Order {order_id}: PDF not rendered")
+
+    except Order.DoesNotExist:
+        print(f"[INVOICE] Order {order_id} no longer exists")
+
+    except Exception as e:
+        print(f"[INVOICE ERROR] Order {order_id}: {repr(e)}")
+
+        raise self.retry(exc=e, countdown=30)
+
+
 # -------------------------------------------------
 # 🔹 REFUND EMAIL TASK (WITH PDF)
 # -------------------------------------------------
 @shared_task(bind=True, max_retries=3)
 def send_refund_email(self, order_id):
     try:
-        order = Order.objects.select_related("user").get(id=order_id)
+        order = (
+            Order.objects
+            .select_related("user")
+            .prefetch_related("items")
+            .get(id=order_id)
+        )
 
-        pdf_bytes = generate_invoice_pdf(order)
+        # Stored PDF when current, rendered once otherwise
+        pdf_bytes = get_invoice_pdf(order)
 
         subject = "Refund Processed Successfully"
 
@@ -136,3 +162,191 @@ Surplus Store
         print(f"[EMAIL ERROR] Order {order_id}: {repr(e)}")
 
         raise self.retry(exc=e, countdown=10)
+
+
+# -------------------------------------------------
+# 🔹 STRANDED CHECKOUT RECOVERY (beat)
+# -------------------------------------------------
+# Checkout commits the order BEFORE calling the gateway and attaches
+# the Payment afterwards. If the gateway failed (and the customer never
+# retried) or the worker died between those phases, the order is pending
+# with no payment attempt at all: the customer never got a Razorpay order
+# to pay, so it is safe to cancel.
+
+STRANDED_ORDER_MINUTES = getattr(settings, "STRANDED_ORDER_MINUTES", 15)
+
+register_job("cancel_stranded_orders", "orders")
+
+
+@shared_task
+def cancel_stranded_orders():
+    cutoff = timezone.now() - timedelta(minutes=STRANDED_ORDER_MINUTES)
+
+    stranded_ids = list(
+        Order.objects.filter(
+            status="pending",
+            payment_status="pending",
+            created_at__lt=cutoff,
+            payments__isnull=True,
+        ).values_list("id", flat=True)[:500]
+    )
+
+    cancelled = 0
+
+    for order_id in stranded_ids:
+        with transaction.atomic():
+
+            # Re-check under the lock: a late payment attempt wins
+            order = (
+                Order.objects
+                .select_for_update(skip_locked=True, of=("self",))
+                .filter(
+                    id=order_id,
+                    status="pending",
+                    payment_status="pending",
+                    payments__isnull=True,
+                )
+                .first()
+            )
+
+            if not order:
+                continue
+
+            order.status = "cancelled"
+            order.payment_status = "failed"
+            order.save(update_fields=["status", "payment_status", "updated_at"])
+
+            release_reservations(str(order.uuid))
+
+            cancelled += 1
+
+    record_job("cancel_stranded_orders", orders=cancelled)
+
+    print(f"[CHECKOUT RECOVERY] Cancelled {cancelled} stranded order(s)")
+    return cancelled
+
+
+# -------------------------------------------------
+# 🔹 EXPIRE STALE PENDING ORDERS (beat)
+# -------------------------------------------------
+# Pending orders past the PENDING_ORDER_MINUTES window (with or without a
+# payment attempt) are cancelled in batches: their open Payments are
+# failed and their stock holds released, a few set-based statements per
+# batch.
+#
+# Safe on several workers at once: each batch locks its orders with
+# SKIP LOCKED, so concurrent sweeps (and checkouts holding an order)
+# never wait on each other. Orders whose Payment is locked are being
+# paid right now (payment.captured locks the Payment, then the Order)
+# and are left for the next run instead of deadlocking with it.
+
+EXPIRE_BATCH_SIZE = getattr(settings, "EXPIRE_ORDERS_BATCH_SIZE", 500)
+
+register_job("expire_pending_orders", "orders", "payments", "reservations")
+
+
+def _expire_batch(cutoff, batch_size):
+    """
+    Expire one batch. Returns (orders, payments, reservations).
+    """
+    with transaction.atomic():
+
+        candidates = dict(
+            Order.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                status="pending",
+                payment_status="pending",
+                created_at__lt=cutoff,
+            )
+            .order_by("id")
+            .values_list("id", "uuid")[:batch_size]
+        )
+
+        if not candidates:
+            return 0, 0, 0
+
+        payments = dict(
+            Payment.objects
+            .filter(order_id__in=candidates)
+            .values_list("id", "order_id")
+        )
+
+        unlocked = set(
+            Payment.objects
+            .select_for_update(skip_locked=True)
+            .filter(id__in=payments)
+            .values_list("id", flat=True)
+        )
+
+        busy = {
+            order_id
+            for payment_id, order_id in payments.items()
+            if payment_id not in unlocked
+        }
+
+        order_ids = [order_id for order_id in candidates if order_id not in busy]
+
+        now = timezone.now()
+
+        expired = Order.objects.filter(id__in=order_ids).update(
+            status="cancelled",
+            payment_status="failed",
+            updated_at=now,
+        )
+
+        failed = Payment.objects.filter(
+            order_id__in=order_ids,
+            status="created",
+        ).update(status="failed", updated_at=now)
+
+        # .update() skips the signals that keep the analytics rollups in sync
+        mark_orders_dirty(order_ids)
+
+        released = release_reservations(
+            *[str(candidates[order_id]) for order_id in order_ids]
+        )
+
+    return expired, failed, released
+
+
+@shared_task
+def expire_pending_orders(batch_size=EXPIRE_BATCH_SIZE, max_batches=20):
+    cutoff = timezone.now() - timedelta(minutes=PENDING_ORDER_MINUTES)
+
+    totals = {"orders": 0, "payments": 0, "reservations": 0}
+
+    for _ in range(max_batches):
+        orders, payments, reservations = _expire_batch(cutoff, batch_size)
+
+        totals["orders"] += orders
+        totals["payments"] += payments
+        totals["reservations"] += reservations
+
+        # Nothing left, or only rows someone else is working on
+        if orders == 0:
+            break
+
+    record_job("expire_pending_orders", **totals)
+
+    print(
+        f"[ORDER EXPIRY] Cancelled {totals['orders']} order(s), "
+        f"failed {totals['payments']} payment(s), "
+        f"released {totals['reservations']} hold(s)"
+    )
+    return totals
+
+
+# -------------------------------------------------
+# 🔹 ANALYTICS ROLLUPS (queued on change + beat)
+# -------------------------------------------------
+register_job("refresh_order_rollups", "days")
+
+
+@shared_task
+def refresh_order_rollups():
+    days = refresh_dirty_days()
+
+    record_job("refresh_order_rollups", days=days)
+
+    return days
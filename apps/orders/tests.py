@@ -1,3 +1,90 @@
-from django.test import TestCase
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from . import invoices
+from .models import Invoice, Order, OrderItem
+from .state_machine import bulk_transition
+
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class InvoiceVersionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        customer = User.objects.create_user("shopper", "shopper@example.com", "pass")
+
+        cls.order = Order.objects.create(
+            user=customer,
+            address_text="Test address",
+            status="pending",
+            payment_status="paid",
+            subtotal=Decimal("200.00"),
+            total_amount=Decimal("224.00"),
+            total_weight_kg=Decimal("0.250"),
+            tax_rate=Decimal("12.00"),
+            tax_amount=Decimal("24.00"),
+        )
+
+        OrderItem.objects.create(
+            order=cls.order,
+            product_name="Washed Tee",
+            color="Black",
+            size="M",
+            quantity=1,
+            weight_kg=Decimal("0.250"),
+            unit_price=Decimal("200.00"),
+            total_price=Decimal("200.00"),
+            variant_id=1,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def version(self):
+        return invoices._current_version(self.order.id)
+
+    def test_shipping_keeps_the_invoice_current(self):
+        Invoice.objects.create(
+            order=self.order,
+            file="invoices/current.pdf",
+            snapshot_hash=self.version(),
+        )
+
+        for status in ("processing", "shipped", "out_for_delivery", "delivered"):
+            bulk_transition([self.order.id], status)
+
+        order = invoices._load_order(self.order.id)
+
+        with mock.patch.object(invoices.default_storage, "exists", return_value=True), \
+                mock.patch.object(invoices, "render_invoice") as render:
+            invoice = invoices.get_invoice(order)
+
+        render.assert_not_called()
+        self.assertEqual(invoice.file.name, "invoices/current.pdf")
+
+    def test_refund_changes_the_version(self):
+        before = self.version()
+
+        Order.objects.filter(id=self.order.id).update(
+            status="cancelled",
+            refund_status="processed",
+            razorpay_refund_id="rfnd_test",
+        )
+
+        self.assertNotEqual(self.version(), before)
+
+    def test_item_change_changes_the_version(self):
+        before = self.version()
+
+        self.order.items.update(quantity=2, total_price=Decimal("400.00"))
+
+        self.assertNotEqual(self.version(), before)
@@ -6,9 +6,8 @@ from django.shortcuts import render, redirect
 from django.contrib import messages
 
 from apps.cart.models import Cart
-from apps.cart.services import can_proceed_to_checkout
-from apps.promotions.services import validate_promo_for_cart
-from .services import get_shipping_preview, calculate_checkout_totals
+from .pricing import get_priced_cart, price_cart
+from .services import get_shipping_preview
 
 from .models import Order
 
@@ -16,9 +15,7 @@ from allauth.account.models import EmailAddress
 
 from django.utils import timezone
 
-from apps.catalog.models import ProductImage
-
-from decimal import Decimal, ROUND_HALF_UP
+from apps.catalog.services import resolve_display_images
 
 from django.db import transaction
 from datetime import timedelta
@@ -34,15 +31,19 @@ from .tasks import process_refund
 def start_checkout(request):
 
     # -------------------------------------------------
-    # 1️⃣ Load Cart
+    # 1️⃣ Load Cart + Price It (one pass)
     # -------------------------------------------------
     cart = Cart.objects.filter(user=request.user).first()
 
-    if not cart or not cart.items.exists():
+    selected_shipping = request.GET.get("shipping", "standard")
+
+    priced = get_priced_cart(request, cart, selected_shipping) if cart else None
+
+    if not priced or priced.is_empty:
         messages.error(request, "Your cart is empty.")
         return redirect("cart:cart")
 
-    if not can_proceed_to_checkout(cart):
+    if not priced.is_valid:
         messages.error(
             request,
             "Your cart contains unavailable or out-of-stock items."
@@ -80,96 +81,26 @@ def start_checkout(request):
     # -------------------------------------------------
     # 5️⃣ Shipping
     # -------------------------------------------------
-    selected_shipping = request.GET.get("shipping", "standard")
-
     standard_shipping = get_shipping_preview("standard")
     express_shipping = get_shipping_preview("express")
 
-    if selected_shipping == "express":
-        shipping_fee = Decimal(express_shipping["fee"])
-    else:
-        shipping_fee = Decimal("0.00")
-
     # -------------------------------------------------
     # 6️⃣ Build Cart Items
     # -------------------------------------------------
-    cart_items = []
-
-    for item in cart.items.select_related(
-        "variant",
-        "variant__product",
-        "variant__product__subcategory",
-        "variant__product__subcategory__category",
-    ):
-
-        item.display_image = (
-            ProductImage.objects
-            .filter(
-                variant__product=item.variant.product,
-                variant__color=item.color,
-            )
-            .order_by("-is_primary", "created_at")
-            .first()
-        )
-
-        cart_items.append(item)
-
-    # -------------------------------------------------
-    # 7️⃣ Promo Revalidation
-    # -------------------------------------------------
-    applied_code = request.session.get("applied_promo")
-
-    discount = Decimal("0.00")
-    applied_promo = None
-    promo_error = None
-
-    if applied_code:
-
-        result = validate_promo_for_cart(
-            user=request.user,
-            cart=cart,
-            code=applied_code
-        )
-
-        if result.success:
-            discount = result.discount
-            applied_promo = result.promo
-        else:
-            promo_error = result.error
-
-    # -------------------------------------------------
-    # 8️⃣ Totals
-    # -------------------------------------------------
-    subtotal = cart.subtotal
-
-    taxable_amount = subtotal - discount
-
-    tax_rate = Decimal("12.00")
-
-    tax_amount = (
-        taxable_amount * tax_rate / Decimal("100")
-    ).quantize(
-        Decimal("1"),
-        rounding=ROUND_HALF_UP
-    )
+    cart_items = [line.item for line in priced.lines]
 
-    final_total = (
-        taxable_amount + tax_amount + shipping_fee
-    ).quantize(
-        Decimal("1"),
-        rounding=ROUND_HALF_UP
+    display_images = resolve_display_images(
+        (item.variant.product_id, item.color) for item in cart_items
     )
 
-    # -------------------------------------------------
-    # 9️⃣ Total Weight
-    # -------------------------------------------------
-    total_weight = sum(
-        item.weight_kg * item.quantity
-        for item in cart.items.all()
-    )
+    for line in priced.lines:
+        line.item.line_total = line.line_total
+        line.item.display_image = display_images.get(
+            (line.item.variant.product_id, line.item.color)
+        )
 
     # -------------------------------------------------
-    # 🔟 Checkout Issues
+    # 7️⃣ Checkout Issues
     # -------------------------------------------------
     checkout_issues = []
 
@@ -204,7 +135,7 @@ def start_checkout(request):
     checkout_blocked = len(checkout_issues) > 0
 
     # -------------------------------------------------
-    # 1️⃣1️⃣ Render
+    # 8️⃣ Render
     # -------------------------------------------------
     return render(
         request,
@@ -213,20 +144,20 @@ def start_checkout(request):
             "cart": cart,
             "cart_items": cart_items,
 
-            "cart_subtotal": subtotal,
-            "discount": discount,
-            "applied_promo": applied_promo,
-            "promo_error": promo_error,
+            "cart_subtotal": priced.subtotal,
+            "discount": priced.discount,
+            "applied_promo": priced.promo,
+            "promo_error": priced.promo_error,
 
-            "shipping_fee": shipping_fee,
+            "shipping_fee": priced.shipping_fee,
             "selected_shipping": selected_shipping,
             "standard_shipping": standard_shipping,
             "express_shipping": express_shipping,
 
-            "total_weight": round(total_weight, 3),
+            "total_weight": round(priced.total_weight, 3),
 
-            "tax_amount": tax_amount,
-            "final_total": final_total,
+            "tax_amount": priced.tax_amount,
+            "final_total": priced.total,
 
             "email_verified": email_verified,
             "phone_present": phone_present,
@@ -277,21 +208,17 @@ def update_promo_ajax(request):
                 "error": "Please enter a promo code."
             }, status=400)
 
-        result = validate_promo_for_cart(
-            user=request.user,
-            cart=cart,
-            code=code
-        )
+        priced = price_cart(cart, request.user, promo_code=code)
 
-        if result.success:
+        if priced.promo:
 
             # ✅ Store only if valid
             request.session["applied_promo"] = code.upper()
 
             return JsonResponse({
                 "success": True,
-                "code": result.promo.code,
-                "discount": str(result.discount)
+                "code": priced.promo.code,
+                "discount": str(priced.discount)
             })
 
         else:
@@ -301,7 +228,7 @@ def update_promo_ajax(request):
 
             return JsonResponse({
                 "success": False,
-                "error": result.error
+                "error": priced.promo_error
             }, status=400)
 
     # ---------------------------
@@ -319,72 +246,14 @@ def update_checkout_summary(request):
 
     cart = Cart.objects.filter(user=request.user).first()
 
-    if not cart or not cart.items.exists():
-        return JsonResponse({"error": "Cart empty"}, status=400)
-
     shipping_method = request.POST.get("shipping", "standard")
 
-    # --------------------
-    # SHIPPING
-    # --------------------
-    if shipping_method == "express":
-        express = get_shipping_preview("express")
-        shipping_fee = Decimal(express["fee"])
-    else:
-        shipping_fee = Decimal("0.00")
-
-    # --------------------
-    # PROMO (from session)
-    # --------------------
-    applied_code = request.session.get("applied_promo")
-    discount = Decimal("0.00")
-
-    if applied_code:
-        result = validate_promo_for_cart(
-            user=request.user,
-            cart=cart,
-            code=applied_code
-        )
-        if result.success:
-            discount = result.discount
-
-    # --------------------
-    # TOTAL WEIGHT
-    # --------------------
-    total_weight = sum(
-        item.weight_kg * item.quantity
-        for item in cart.items.all()
-    )
-
-    # --------------------
-    # TAX + TOTAL
-    # --------------------
-    subtotal = cart.subtotal
-    taxable_amount = subtotal - discount
-    tax_rate = Decimal("12.00")
-
-    tax_amount = (
-        taxable_amount * tax_rate / Decimal("100")
-    ).quantize(
-        Decimal("1"),
-        rounding=ROUND_HALF_UP
-    )
+    priced = get_priced_cart(request, cart, shipping_method) if cart else None
 
-    final_total = (
-        taxable_amount + tax_amount + shipping_fee
-    ).quantize(
-        Decimal("1"),
-        rounding=ROUND_HALF_UP
-    )
+    if not priced or priced.is_empty:
+        return JsonResponse({"error": "Cart empty"}, status=400)
 
-    return JsonResponse({
-        "subtotal": str(subtotal),
-        "discount": str(discount),
-        "shipping": str(shipping_fee),
-        "tax": str(tax_amount),
-        "total": str(final_total),
-        "weight": str(round(total_weight, 3)),
-    })
+    return JsonResponse(priced.as_summary())
 
 
 
@@ -2,11 +2,15 @@ from django.shortcuts import render
 
 from django.http import HttpResponse
 
+from surplus_store_project.cache import cache_public_page
+
 # Create your views here.
 
 
+@cache_public_page(tags=["pages"])
 def landing_view(request):
     return render(request , 'pages/landing.html')
 
+@cache_public_page(tags=["pages"])
 def about_view(request):
-    return render(request, 'pages/about.html')
\ No newline at end of file
+    return render(request, 'pages/about.html')
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Payment
+from .models import Payment, WebhookEvent
 
 
 @admin.register(Payment)
@@ -25,3 +25,26 @@ class PaymentAdmin(admin.ModelAdmin):
         "gateway",
         "created_at",
     )
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+
+    list_display = (
+        "event_type",
+        "event_id",
+        "ordering_key",
+        "status",
+        "attempts",
+        "received_at",
+    )
+
+    search_fields = (
+        "event_id",
+        "ordering_key",
+    )
+
+    list_filter = (
+        "status",
+        "event_type",
+    )
@@ -0,0 +1,207 @@
+from django.db import transaction
+
+from apps.payments.models import Payment
+from apps.payments.services import capture_payment
+
+# For CELERY REFUND-EMAIL
+from apps.orders.tasks import render_order_invoice, send_refund_email
+
+
+# ==============================
+# WEBHOOK EVENT HANDLERS
+# ==============================
+#
+# Run by payments.tasks for each stored WebhookEvent, inside the task's
+# transaction. Raising marks the event failed and it is retried with
+# backoff (then dead-lettered); returning means processed.
+
+
+class EventNotReady(Exception):
+    """
+    The event refers to rows that do not exist yet (e.g. payment.captured
+    arriving before checkout attached the Payment, or a refund arriving
+    before the capture) — retry later.
+    """
+
+
+def ordering_key(event):
+    """
+    Events with the same key are processed one at a time, in order.
+    Every event of a checkout (capture, failure, refunds) is keyed by its
+    Razorpay order id.
+    """
+    payload_data = event.get("payload", {})
+
+    payment_entity = payload_data.get("payment", {}).get("entity", {})
+
+    if payment_entity.get("order_id"):
+        return payment_entity["order_id"]
+
+    # Refund events without the payment entity: resolve through Payment
+    razorpay_payment_id = (
+        payment_entity.get("id")
+        or payload_data.get("refund", {}).get("entity", {}).get("payment_id")
+    )
+
+    if not razorpay_payment_id:
+        return ""
+
+    razorpay_order_id = (
+        Payment.objects
+        .filter(razorpay_payment_id=razorpay_payment_id)
+        .values_list("razorpay_order_id", flat=True)
+        .first()
+    )
+
+    return razorpay_order_id or razorpay_payment_id
+
+
+def handle_event(event_type, event):
+
+    payload_data = event.get("payload", {})
+
+    handler = HANDLERS.get(event_type)
+
+    if handler:
+        handler(payload_data)
+    else:
+        print("Webhook: ignoring event", event_type)
+
+
+# -------------------------------------------------
+# payment.captured
+# -------------------------------------------------
+def payment_captured(payload_data):
+
+    payment_entity = payload_data.get("payment", {}).get("entity", {})
+
+    razorpay_payment_id = payment_entity.get("id")
+    razorpay_order_id = payment_entity.get("order_id")
+
+    if not razorpay_order_id:
+        print("Webhook: Missing order_id in payment")
+        return
+
+    payment = (
+        Payment.objects
+        .select_related("order")
+        .select_for_update(of=("self",))
+        .filter(razorpay_order_id=razorpay_order_id)
+        .first()
+    )
+
+    if not payment:
+        raise EventNotReady(f"Payment record not found for {razorpay_order_id}")
+
+    # Already captured by the checkout callback (or an earlier delivery)
+    if not capture_payment(payment, razorpay_payment_id):
+        print("Webhook: payment already processed")
+        return
+
+    print(f"Webhook: Order {payment.order.uuid} marked as PAID")
+
+
+# -------------------------------------------------
+# payment.failed
+# -------------------------------------------------
+def payment_failed(payload_data):
+
+    payment_entity = payload_data.get("payment", {}).get("entity", {})
+    razorpay_order_id = payment_entity.get("order_id")
+
+    if not razorpay_order_id:
+        return
+
+    payment = Payment.objects.filter(
+        razorpay_order_id=razorpay_order_id
+    ).select_related("order").first()
+
+    if not payment:
+        print("Webhook: Failed payment record not found")
+        return
+
+    if payment.status != "success":
+        payment.status = "failed"
+        payment.save()
+
+        print(f"Webhook: Payment failed for order {payment.order.uuid}")
+
+
+# -------------------------------------------------
+# refund.processed
+# -------------------------------------------------
+def refund_processed(payload_data):
+
+    print("Webhook: Refund received from Razorpay")
+
+    refund_entity = payload_data.get("refund", {}).get("entity", {})
+
+    razorpay_payment_id = refund_entity.get("payment_id")
+    razorpay_refund_id = refund_entity.get("id")
+
+    if not razorpay_payment_id:
+        print("Webhook: Missing payment_id in refund")
+        return
+
+    # ✅ SAFE lookup via Payment
+    payment = Payment.objects.filter(
+        razorpay_payment_id=razorpay_payment_id
+    ).select_related("order").first()
+
+    # Refund seen before the capture attached the payment id
+    if not payment:
+        raise EventNotReady(f"Payment not found for refund of {razorpay_payment_id}")
+
+    order = payment.order
+
+    # ✅ Strong duplicate protection
+    if order.razorpay_refund_id == razorpay_refund_id:
+        print("Webhook: Refund already recorded")
+        return
+
+    order.razorpay_refund_id = razorpay_refund_id
+    order.refund_status = "processed"
+    order.save()
+
+    print(f"Webhook: Refund SUCCESS for order {order.uuid}")
+
+    # CELERY REFUND EMAIL + INVOICE (only once the refund is committed)
+    transaction.on_commit(lambda: render_order_invoice.delay(order.id))
+    transaction.on_commit(lambda: send_refund_email.delay(order.id))
+
+
+# -------------------------------------------------
+# refund.failed
+# -------------------------------------------------
+def refund_failed(payload_data):
+
+    print("Webhook: Refund FAILED event received")
+
+    refund_entity = payload_data.get("refund", {}).get("entity", {})
+
+    razorpay_payment_id = refund_entity.get("payment_id")
+
+    if not razorpay_payment_id:
+        return
+
+    payment = Payment.objects.filter(
+        razorpay_payment_id=razorpay_payment_id
+    ).select_related("order").first()
+
+    if not payment:
+        raise EventNotReady(f"Payment not found for refund of {razorpay_payment_id}")
+
+    order = payment.order
+
+    order.refund_status = "failed"
+    order.save()
+
+    print(f"Webhook: Refund FAILED for order {order.uuid}")
+
+
+HANDLERS = {
+    "payment.captured": payment_captured,
+    "payment.failed": payment_failed,
+    "refund.processed": refund_processed,
+    "refund.failed": refund_failed,
+}
@@ -0,0 +1,242 @@
+import hashlib
+import hmac
+import json
+import random
+import time
+import uuid
+
+import razorpay
+import requests
+from django.conf import settings
+
+
+# ==============================
+# FAKE RAZORPAY CLIENT (local / load testing)
+# ==============================
+#
+# Enabled with RAZORPAY_FAKE=True. Mimics the parts of razorpay.Client
+# the store uses (orders, payments, refunds, signature checks) without
+# network access. RAZORPAY_FAKE_LATENCY_MS adds a sleep per call to
+# reproduce the real gateway round trip, and RAZORPAY_FAKE_FAILURE_RATE
+# (0..1) makes a share of calls fail.
+#
+# Like the real gateway it sends signed webhooks (payment.captured,
+# refund.processed): in-process to payments.webhooks by default, or as
+# an HTTP POST to RAZORPAY_FAKE_WEBHOOK_URL. RAZORPAY_FAKE_WEBHOOKS=False
+# turns them off.
+#
+# State is kept in memory, per process.
+
+
+def _fake_id(prefix):
+    return f"{prefix}_fake{uuid.uuid4().hex[:14]}"
+
+
+class _FakeOrders:
+    def __init__(self, client):
+        self.client = client
+
+    def create(self, data=None, **kwargs):
+        self.client.simulate_call()
+
+        order = {
+            "id": _fake_id("order"),
+            "entity": "order",
+            "amount": data["amount"],
+            "amount_paid": 0,
+            "amount_due": data["amount"],
+            "currency": data.get("currency", "INR"),
+            "receipt": data.get("receipt"),
+            "status": "created",
+            "notes": data.get("notes", {}),
+            "created_at": int(time.time()),
+        }
+
+        self.client.orders[order["id"]] = order
+        return order
+
+    def fetch(self, order_id, data=None, **kwargs):
+        self.client.simulate_call()
+
+        try:
+            return self.client.orders[order_id]
+        except KeyError:
+            raise razorpay.errors.BadRequestError(
+                "The id provided does not exist"
+            )
+
+
+class _FakePayments:
+    def __init__(self, client):
+        self.client = client
+
+    def fetch(self, payment_id, data=None, **kwargs):
+        self.client.simulate_call()
+
+        try:
+            return self.client.payments[payment_id]
+        except KeyError:
+            raise razorpay.errors.BadRequestError(
+                "The id provided does not exist"
+            )
+
+    def refund(self, payment_id, data=None, **kwargs):
+        self.client.simulate_call()
+
+        payment = self.client.payments.get(payment_id, {})
+
+        refund = {
+            "id": _fake_id("rfnd"),
+            "entity": "refund",
+            "payment_id": payment_id,
+            "amount": (data or {}).get("amount", payment.get("amount")),
+            "currency": payment.get("currency", "INR"),
+            "status": "processed",
+            "created_at": int(time.time()),
+        }
+
+        self.client.emit_webhook("refund.processed", {"refund": refund})
+        return refund
+
+
+class _FakeUtility:
+    def __init__(self, client):
+        self.client = client
+
+    def verify_payment_signature(self, parameters):
+        expected = self.client.sign_payment(
+            parameters["razorpay_order_id"],
+            parameters["razorpay_payment_id"],
+        )
+
+        if not hmac.compare_digest(expected, parameters["razorpay_signature"]):
+            raise razorpay.errors.SignatureVerificationError(
+                "Razorpay Signature Verification Failed"
+            )
+
+        return True
+
+
+class FakeRazorpayClient:
+
+    def __init__(self, latency_ms=None, failure_rate=None, webhooks=None):
+        self.latency_ms = (
+            getattr(settings, "RAZORPAY_FAKE_LATENCY_MS", 0)
+            if latency_ms is None else latency_ms
+        )
+        self.failure_rate = (
+            getattr(settings, "RAZORPAY_FAKE_FAILURE_RATE", 0)
+            if failure_rate is None else failure_rate
+        )
+        self.webhooks = (
+            getattr(settings, "RAZORPAY_FAKE_WEBHOOKS", True)
+            if webhooks is None else webhooks
+        )
+
+        self.orders = {}
+        self.payments = {}
+
+        self.order = _FakeOrders(self)
+        self.payment = _FakePayments(self)
+        self.utility = _FakeUtility(self)
+
+    def simulate_call(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise ConnectionError("Fake Razorpay: simulated gateway failure")
+
+    # ---------- CUSTOMER SIDE ----------
+
+    def sign_payment(self, order_id, payment_id):
+        return hmac.new(
+            bytes(settings.RAZORPAY_KEY_SECRET, "utf-8"),
+            f"{order_id}|{payment_id}".encode(),
+            hashlib.sha256,
+        ).hexdigest()
+
+    def capture_payment(self, order_id):
+        """
+        What Razorpay Checkout does when the customer pays: captures a
+        payment for the order, sends payment.captured and returns the
+        fields the browser posts to payments:verify_payment.
+        """
+        order = self.orders[order_id]
+
+        payment = {
+            "id": _fake_id("pay"),
+            "entity": "payment",
+            "amount": order["amount"],
+            "currency": order["currency"],
+            "status": "captured",
+            "order_id": order_id,
+            "method": "upi",
+            "captured": True,
+            "created_at": int(time.time()),
+        }
+
+        self.payments[payment["id"]] = payment
+
+        order["status"] = "paid"
+        order["amount_paid"] = order["amount"]
+        order["amount_due"] = 0
+
+        self.emit_webhook("payment.captured", {"payment": payment})
+
+        return {
+            "razorpay_order_id": order_id,
+            "razorpay_payment_id": payment["id"],
+            "razorpay_signature": self.sign_payment(order_id, payment["id"]),
+        }
+
+    # ---------- WEBHOOKS ----------
+
+    def emit_webhook(self, event, entities):
+        if not self.webhooks:
+            return
+
+        body = json.dumps({
+            "entity": "event",
+            "event": event,
+            "payload": {
+                name: {"entity": entity}
+                for name, entity in entities.items()
+            },
+            "created_at": int(time.time()),
+        }).encode()
+
+        signature = hmac.new(
+            bytes(settings.RAZORPAY_WEBHOOK_SECRET, "utf-8"),
+            body,
+            hashlib.sha256,
+        ).hexdigest()
+
+        # A broken webhook must not fail the gateway call that sent it
+        try:
+            url = getattr(settings, "RAZORPAY_FAKE_WEBHOOK_URL", "")
+
+            if url:
+                requests.post(
+                    url,
+                    data=body,
+                    headers={
+                        "Content-Type": "application/json",
+                        "X-Razorpay-Signature": signature,
+                    },
+                    timeout=10,
+                )
+            else:
+                from django.test import RequestFactory
+
+                from .webhooks import razorpay_webhook
+
+                razorpay_webhook(RequestFactory().post(
+                    "/payments/webhook/",
+                    data=body,
+                    content_type="application/json",
+                    HTTP_X_RAZORPAY_SIGNATURE=signature,
+                ))
+
+        except Exception as e:
+            print("FAKE RAZORPAY WEBHOOK FAILED:", event, repr(e))
@@ -0,0 +1,174 @@
+import time
+from functools import lru_cache
+
+import razorpay
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from surplus_store_project.metrics import record_timing, register_timing
+
+from .fake_gateway import FakeRazorpayClient
+
+
+# ==============================
+# PAYMENT GATEWAY
+# ==============================
+#
+# Every call to Razorpay goes through PaymentGateway (get_gateway()):
+#
+# - one keep-alive requests.Session per process, with a connection pool
+#   of RAZORPAY_POOL_SIZE, instead of a new client / TLS handshake per
+#   task or view
+# - (connect, read) timeouts on every call
+# - bounded retries with backoff: connection failures (the request never
+#   reached Razorpay) are retried for every call, read timeouts and 5xx
+#   only for idempotent GETs, so an order or refund is never created twice
+# - latency / error metrics per operation ("gateway.<op>")
+#
+# With RAZORPAY_FAKE=True the same wrapper drives the in-process
+# FakeRazorpayClient, so the code paths are identical offline.
+
+OPERATIONS = (
+    "create_order",
+    "fetch_order",
+    "fetch_payment",
+    "refund",
+)
+
+for _operation in OPERATIONS:
+    register_timing(f"gateway.{_operation}")
+
+
+class GatewayError(Exception):
+    """
+    Any failed gateway call (network, timeout, rejected by Razorpay).
+    The original exception is chained as __cause__.
+    """
+
+
+def build_session():
+    retry = Retry(
+        total=settings.RAZORPAY_MAX_RETRIES,
+        connect=settings.RAZORPAY_MAX_RETRIES,
+        read=settings.RAZORPAY_MAX_RETRIES,
+        status=settings.RAZORPAY_MAX_RETRIES,
+        backoff_factor=settings.RAZORPAY_RETRY_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    )
+
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings.RAZORPAY_POOL_SIZE,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+
+    return session
+
+
+class PaymentGateway:
+
+    def __init__(self, client):
+        self.client = client
+        self.timeout = (
+            settings.RAZORPAY_CONNECT_TIMEOUT,
+            settings.RAZORPAY_READ_TIMEOUT,
+        )
+
+    def _call(self, operation, func, *args, timeout=None):
+        started = time.perf_counter()
+        error = False
+
+        try:
+            return func(*args, timeout=timeout or self.timeout)
+
+        except Exception as e:
+            error = True
+            raise GatewayError(f"{operation} failed: {e}") from e
+
+        finally:
+            record_timing(
+                f"gateway.{operation}",
+                (time.perf_counter() - started) * 1000,
+                error=error,
+            )
+
+    # ---------- ORDERS ----------
+
+    def create_order(self, amount, receipt, notes=None, currency="INR", timeout=None):
+        """
+        `amount` in paise.
+        """
+        return self._call(
+            "create_order",
+            self.client.order.create,
+            {
+                "amount": amount,
+                "currency": currency,
+                "receipt": receipt,
+                "notes": notes or {},
+            },
+            timeout=timeout,
+        )
+
+    def fetch_order(self, order_id, timeout=None):
+        return self._call(
+            "fetch_order", self.client.order.fetch, order_id, {},
+            timeout=timeout,
+        )
+
+    # ---------- PAYMENTS ----------
+
+    def fetch_payment(self, payment_id, timeout=None):
+        return self._call(
+            "fetch_payment", self.client.payment.fetch, payment_id, {},
+            timeout=timeout,
+        )
+
+    def refund(self, payment_id, amount, timeout=None):
+        """
+        `amount` in paise.
+        """
+        return self._call(
+            "refund",
+            self.client.payment.refund,
+            payment_id,
+            {"amount": amount},
+            timeout=timeout,
+        )
+
+    def verify_payment_signature(self, order_id, payment_id, signature):
+        """
+        Local HMAC check, no network call.
+        """
+        try:
+            self.client.utility.verify_payment_signature({
+                "razorpay_order_id": order_id,
+                "razorpay_payment_id": payment_id,
+                "razorpay_signature": signature,
+            })
+        except razorpay.errors.SignatureVerificationError:
+            return False
+
+        return True
+
+
+@lru_cache(maxsize=None)
+def get_gateway():
+    """
+    Process-wide gateway. Built on first use, so Celery prefork children
+    each open their own connection pool after the fork.
+    """
+    if settings.RAZORPAY_FAKE:
+        return PaymentGateway(FakeRazorpayClient())
+
+    return PaymentGateway(razorpay.Client(
+        session=build_session(),
+        auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET),
+    ))
@@ -0,0 +1,97 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from apps.payments.fake_gateway import FakeRazorpayClient
+from apps.payments.gateway import PaymentGateway
+
+
+class Command(BaseCommand):
+    help = (
+        "Checkout (create_order) and refund throughput through "
+        "PaymentGateway against the in-process fake gateway, at several "
+        "worker counts. No network, no database writes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--calls", type=int, default=200)
+        parser.add_argument(
+            "--threads", type=int, nargs="+", default=[1, 4, 16],
+        )
+        parser.add_argument(
+            "--latency-ms", type=int, default=200,
+            help="Simulated gateway round trip per call.",
+        )
+        parser.add_argument("--failure-rate", type=float, default=0)
+
+    def handle(self, *args, **options):
+        gateway = PaymentGateway(FakeRazorpayClient(
+            latency_ms=options["latency_ms"],
+            failure_rate=options["failure_rate"],
+            webhooks=False,
+        ))
+
+        calls = options["calls"]
+
+        self.stdout.write(
+            f"{'case':<28}{'calls/s':>10}{'p50 ms':>10}"
+            f"{'p95 ms':>10}{'errors':>8}"
+        )
+
+        for threads in options["threads"]:
+
+            order_ids = []
+
+            def create_order(i):
+                razorpay_order = gateway.create_order(
+                    amount=49900, receipt=f"bench-{i}",
+                )
+                order_ids.append(razorpay_order["id"])
+
+            self._run(f"create_order x{threads}", threads, calls, create_order)
+
+            if not order_ids:
+                continue
+
+            payment_ids = [
+                gateway.client.capture_payment(order_id)["razorpay_payment_id"]
+                for order_id in order_ids
+            ]
+
+            def refund(i):
+                gateway.refund(payment_ids[i % len(payment_ids)], 49900)
+
+            self._run(f"refund x{threads}", threads, calls, refund)
+
+    def _run(self, label, threads, calls, func):
+        latencies = []
+        errors = 0
+
+        def timed(i):
+            started = time.perf_counter()
+            try:
+                func(i)
+                return (time.perf_counter() - started) * 1000, False
+            except Exception:
+                return (time.perf_counter() - started) * 1000, True
+
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for elapsed, failed in pool.map(timed, range(calls)):
+                latencies.append(elapsed)
+                errors += failed
+
+        wall = time.perf_counter() - started
+
+        p95 = (
+            statistics.quantiles(latencies, n=20)[-1]
+            if len(latencies) > 1 else latencies[0]
+        )
+
+        self.stdout.write(
+            f"{label:<28}{calls / wall:>10.1f}"
+            f"{statistics.median(latencies):>10.1f}{p95:>10.1f}{errors:>8}"
+        )
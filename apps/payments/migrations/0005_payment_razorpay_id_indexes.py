@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:33
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Built without locking writes on large tables
+    atomic = False
+
+    dependencies = [
+        ('payments', '0004_webhookevent'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='payment',
+            index=models.Index(condition=models.Q(('razorpay_order_id__isnull', False)), fields=['razorpay_order_id'], name='payment_rzp_order_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='payment',
+            index=models.Index(condition=models.Q(('razorpay_payment_id__isnull', False)), fields=['razorpay_payment_id'], name='payment_rzp_payment_idx'),
+        ),
+    ]
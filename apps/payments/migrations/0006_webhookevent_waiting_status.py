@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_payment_razorpay_id_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='webhookevent',
+            name='status',
+            field=models.CharField(choices=[('received', 'Received'), ('failed', 'Failed (will retry)'), ('waiting', 'Waiting for an earlier event'), ('processed', 'Processed'), ('dead', 'Dead')], default='received', max_length=20),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from apps.orders.models import Order
 
 
@@ -53,5 +54,74 @@ class Payment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Webhook lookups and admin search by Razorpay id
+            models.Index(
+                fields=["razorpay_order_id"],
+                condition=Q(razorpay_order_id__isnull=False),
+                name="payment_rzp_order_idx",
+            ),
+            models.Index(
+                fields=["razorpay_payment_id"],
+                condition=Q(razorpay_payment_id__isnull=False),
+                name="payment_rzp_payment_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"Payment for {self.order.uuid}"
+
+
+class WebhookEvent(models.Model):
+    """
+    Inbox of verified Razorpay webhooks. The webhook view only stores the
+    event; payments.tasks processes it (in order per `ordering_key`).
+    """
+
+    STATUS = (
+        ("received", "Received"),
+        ("failed", "Failed (will retry)"),
+        ("waiting", "Waiting for an earlier event"),
+        ("processed", "Processed"),
+        ("dead", "Dead"),
+    )
+
+    # Razorpay's X-Razorpay-Event-Id (redeliveries keep the same id)
+    event_id = models.CharField(max_length=100, unique=True)
+
+    event_type = models.CharField(max_length=50)
+
+    # Razorpay order id (refund.* included, see payments.events)
+    ordering_key = models.CharField(max_length=100)
+
+    payload = models.JSONField()
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS,
+        default="received"
+    )
+
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(
+                fields=["ordering_key", "status", "id"],
+                name="webhook_key_status_idx",
+            ),
+            models.Index(
+                fields=["status", "received_at"],
+                name="webhook_status_received_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} ({self.event_id})"
@@ -1,33 +1,153 @@
-import razorpay
-from django.conf import settings
+from django.db import transaction
 
+from apps.cart.counters import invalidate_nav_counts
+from apps.cart.models import Cart
+from apps.catalog.inventory import decrement_stock
+from apps.orders.models import Order
+from apps.orders.tasks import render_order_invoice
 
-client = razorpay.Client(
-    auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
-)
+from .gateway import get_gateway, GatewayError
+from .models import Payment
 
 
 def create_razorpay_order(order):
 
     amount = int(order.total_amount * 100)
 
-    data = {
-        "amount": amount,
-        "currency": "INR",
-        "receipt": str(order.uuid),
-        "notes": {
-            "order_uuid": str(order.uuid)
-        }
-    }
-
     try:
 
-        razorpay_order = client.order.create(data=data)
+        razorpay_order = get_gateway().create_order(
+            amount=amount,
+            receipt=str(order.uuid),
+            notes={
+                "order_uuid": str(order.uuid)
+            },
+        )
 
         return razorpay_order
 
-    except Exception as e:
+    except GatewayError as e:
 
         print("RAZORPAY ORDER CREATION FAILED:", e)
 
         return None
+
+
+# ==============================
+# PAYMENT ATTEMPT (gateway phase of checkout)
+# ==============================
+#
+# Checkout runs in three phases so no DB transaction or row lock is held
+# during the gateway's HTTPS round trip:
+#
+#   1. order + items committed in a short transaction (orders.services)
+#   2. Razorpay order created here, OUTSIDE any transaction
+#   3. Payment row attached in a second short transaction
+#
+# An order that never reaches phase 3 (gateway down, worker killed) is
+# left pending without payments and is cancelled by
+# orders.tasks.cancel_stranded_orders.
+
+def start_payment_attempt(order):
+    """
+    Phases 2 + 3. Returns the Razorpay order dict, or None if the gateway
+    failed or the order is no longer awaiting payment.
+
+    Call it after the order's transaction has committed.
+    """
+    razorpay_order = create_razorpay_order(order)
+
+    if not razorpay_order:
+        return None
+
+    if not attach_payment(order, razorpay_order):
+        return None
+
+    return razorpay_order
+
+
+@transaction.atomic
+def attach_payment(order, razorpay_order):
+    """
+    Record the new attempt; earlier open attempts of the order are failed.
+    Returns the Payment, or None if the order was cancelled meanwhile.
+    """
+    order = (
+        Order.objects
+        .select_for_update()
+        .filter(id=order.id, status="pending", payment_status="pending")
+        .first()
+    )
+
+    if not order:
+        print("PAYMENT NOT ATTACHED: order no longer pending", razorpay_order["id"])
+        return None
+
+    Payment.objects.filter(order=order, status="created").update(status="failed")
+
+    return Payment.objects.create(
+        order=order,
+        gateway="razorpay",
+        razorpay_order_id=razorpay_order["id"],
+        amount=order.total_amount,
+        status="created"
+    )
+
+
+# ==============================
+# PAYMENT CAPTURED
+# ==============================
+#
+# The checkout callback (verify_payment) and the payment.captured
+# webhook both report the same capture; whichever arrives first does the
+# work below, under the Payment row lock, and the other finds the
+# payment already successful.
+
+@transaction.atomic
+def capture_payment(payment, razorpay_payment_id, razorpay_signature=None):
+    """
+    Mark the attempt paid and its order processing, sell the order's
+    stock (consuming its holds) and empty the customer's cart. Returns
+    False if the payment had already been captured.
+    """
+    payment = (
+        Payment.objects
+        .select_related("order")
+        .select_for_update(of=("self",))
+        .get(id=payment.id)
+    )
+
+    if payment.status == "success":
+        return False
+
+    payment.razorpay_payment_id = razorpay_payment_id
+    if razorpay_signature:
+        payment.razorpay_signature = razorpay_signature
+    payment.status = "success"
+    payment.save()
+
+    order = payment.order
+
+    order.status = "processing"
+    order.payment_status = "paid"
+    order.razorpay_payment_id = razorpay_payment_id
+    order.save()
+
+    # Inventory update (one lock + one UPDATE for all lines)
+    stock = decrement_stock(
+        order.items.values_list("variant_id", "quantity"),
+        reason="sale",
+        reference=str(order.uuid),
+    )
+
+    if stock.shortfalls:
+        print(f"PAYMENT: Order {order.uuid} has {len(stock.shortfalls)} oversold line(s)")
+
+    cart = Cart.objects.filter(user_id=order.user_id).first()
+    if cart:
+        cart.items.all().delete()
+        transaction.on_commit(lambda: invalidate_nav_counts(order.user_id))
+
+    transaction.on_commit(lambda: render_order_invoice.delay(order.id))
+
+    return True
@@ -0,0 +1,177 @@
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from datetime import timedelta
+
+from .events import EventNotReady, handle_event
+from .models import WebhookEvent
+
+
+# -------------------------------------------------
+# 🔹 WEBHOOK INBOX PROCESSING
+# -------------------------------------------------
+# Events of one ordering key (Razorpay order) are handled one at a time
+# and in arrival order: a worker only ever takes the OLDEST open event of
+# the key, under a row lock. If that event fails, the events behind it
+# wait until it succeeds or is dead-lettered.
+#
+# An event that is not ready (EventNotReady: e.g. a refund delivered
+# before the capture of its payment) is "waiting" instead: it steps
+# aside so the events behind it can run, and is retried right after the
+# next event of its key is processed (or when its backoff is over).
+#
+# Failures retry with exponential backoff; after WEBHOOK_MAX_ATTEMPTS
+# the event is "dead" and can be replayed from the admin panel.
+
+WEBHOOK_MAX_ATTEMPTS = getattr(settings, "WEBHOOK_MAX_ATTEMPTS", 6)
+WEBHOOK_RETRY_BASE_SECONDS = getattr(settings, "WEBHOOK_RETRY_BASE_SECONDS", 30)
+
+OPEN_STATUSES = ("received", "failed", "waiting")
+
+
+def retry_delay(attempts):
+    return min(WEBHOOK_RETRY_BASE_SECONDS * 2 ** (attempts - 1), 3600)
+
+
+def enqueue_webhook_events(ordering_key, countdown=None):
+    """
+    Schedule processing of a key. A broker outage must not fail the
+    caller — the sweep picks the events up anyway.
+    """
+    try:
+        process_webhook_events.apply_async((ordering_key,), countdown=countdown)
+    except Exception as e:
+        print("[WEBHOOK] enqueue failed:", ordering_key, repr(e))
+
+
+def _process_head(ordering_key):
+    """
+    Process the oldest open event of the key (waiting events last).
+    Returns "processed" / "failed" / "waiting" / "dead", or None when there
+    is nothing to do right now (empty, locked by another worker, backing off).
+    """
+    with transaction.atomic():
+
+        open_events = WebhookEvent.objects.filter(ordering_key=ordering_key)
+
+        head_id = (
+            open_events
+            .filter(status__in=("received", "failed"))
+            .values_list("id", flat=True)
+            .first()
+        ) or (
+            open_events
+            .filter(status="waiting")
+            .exclude(next_attempt_at__gt=timezone.now())
+            .values_list("id", flat=True)
+            .first()
+        )
+
+        if head_id is None:
+            return None
+
+        # Another worker owns the key → it will process the rest
+        event = (
+            WebhookEvent.objects
+            .select_for_update(skip_locked=True)
+            .filter(id=head_id, status__in=OPEN_STATUSES)
+            .first()
+        )
+
+        if not event:
+            return None
+
+        now = timezone.now()
+
+        if event.next_attempt_at and event.next_attempt_at > now:
+            return None
+
+        event.attempts += 1
+
+        try:
+            with transaction.atomic():
+                handle_event(event.event_type, event.payload)
+
+        except Exception as e:
+            event.last_error = repr(e)
+
+            if event.attempts >= WEBHOOK_MAX_ATTEMPTS:
+                event.status = "dead"
+                event.next_attempt_at = None
+                print(f"[WEBHOOK] DEAD {event.event_type} {event.event_id}: {e!r}")
+            else:
+                delay = retry_delay(event.attempts)
+                event.status = "waiting" if isinstance(e, EventNotReady) else "failed"
+                event.next_attempt_at = now + timedelta(seconds=delay)
+
+                transaction.on_commit(
+                    lambda: enqueue_webhook_events(ordering_key, countdown=delay)
+                )
+                print(f"[WEBHOOK] retry in {delay}s {event.event_type} {event.event_id}: {e!r}")
+
+        else:
+            # What the other waiting events of the key need may exist now
+            open_events.filter(status="waiting").exclude(id=event.id).update(
+                next_attempt_at=None,
+            )
+
+            event.status = "processed"
+            event.processed_at = now
+            event.next_attempt_at = None
+            event.last_error = ""
+
+        event.save(update_fields=[
+            "status",
+            "attempts",
+            "last_error",
+            "next_attempt_at",
+            "processed_at",
+        ])
+
+        return event.status
+
+
+@shared_task
+def process_webhook_events(ordering_key):
+    processed = 0
+
+    # Dead and waiting events are skipped, so the key keeps moving
+    while True:
+        result = _process_head(ordering_key)
+
+        if result in (None, "failed"):
+            break
+
+        if result == "processed":
+            processed += 1
+
+    return processed
+
+
+@shared_task
+def sweep_webhook_events():
+    """
+    Safety net (beat): keys whose open events were never enqueued
+    (broker outage) or whose retry task was lost.
+    """
+    now = timezone.now()
+    stale = now - timedelta(minutes=1)
+
+    keys = list(
+        WebhookEvent.objects
+        .filter(status__in=OPEN_STATUSES, received_at__lt=stale)
+        .exclude(next_attempt_at__gt=now)
+        .order_by()
+        .values_list("ordering_key", flat=True)
+        .distinct()[:500]
+    )
+
+    for ordering_key in keys:
+        enqueue_webhook_events(ordering_key)
+
+    if keys:
+        print(f"[WEBHOOK] Swept {len(keys)} key(s)")
+
+    return len(keys)
@@ -1,3 +1,192 @@
-from django.test import TestCase
+import hashlib
+import hmac
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.catalog.inventory import reserve_stock
+from apps.catalog.models import (
+    ProductCategory,
+    SubCategory,
+    Product,
+    ProductVariant,
+    InventoryMovement,
+    StockReservation,
+)
+from apps.orders.models import Order, OrderItem
+
+from .events import payment_captured
+from .models import Payment, WebhookEvent
+from .tasks import process_webhook_events
+
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PaymentCaptureTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("shopper", "shopper@example.com", "pass")
+
+        category = ProductCategory.objects.create(
+            name="Tops", slug="tops", image="categories/tops.jpg",
+        )
+        subcategory = SubCategory.objects.create(
+            category=category,
+            name="Tees",
+            slug="tees",
+            image="categories/tees.jpg",
+            price_per_kg=Decimal("800.00"),
+        )
+        product = Product.objects.create(
+            subcategory=subcategory,
+            name="Washed Tee",
+            slug="washed-tee",
+            description="Surplus lot",
+            size_type="TOP",
+        )
+        cls.variant = ProductVariant.objects.create(
+            product=product,
+            color="Black",
+            size="M",
+            size_order=ProductVariant.SIZE_ORDER_MAP["M"],
+            weight_kg=Decimal("0.250"),
+            stock=1,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+        self.order = Order.objects.create(
+            user=self.user,
+            address_text="Test address",
+            subtotal=Decimal("200.00"),
+            total_amount=Decimal("224.00"),
+            total_weight_kg=Decimal("0.250"),
+            tax_rate=Decimal("12.00"),
+            tax_amount=Decimal("24.00"),
+        )
+        OrderItem.objects.create(
+            order=self.order,
+            product_name="Washed Tee",
+            color="Black",
+            size="M",
+            quantity=1,
+            weight_kg=Decimal("0.250"),
+            unit_price=Decimal("200.00"),
+            total_price=Decimal("200.00"),
+            variant_id=self.variant.id,
+        )
+        reserve_stock([(self.variant.id, 1)], str(self.order.uuid))
+
+        self.payment = Payment.objects.create(
+            order=self.order,
+            gateway="razorpay",
+            razorpay_order_id="order_test",
+            amount=self.order.total_amount,
+            status="created",
+        )
+
+    def verify(self):
+        signature = hmac.new(
+            settings.RAZORPAY_KEY_SECRET.encode(),
+            b"order_test|pay_test",
+            hashlib.sha256,
+        ).hexdigest()
+
+        self.client.force_login(self.user)
+
+        response = self.client.post(reverse("payments:verify_payment"), {
+            "razorpay_order_id": "order_test",
+            "razorpay_payment_id": "pay_test",
+            "razorpay_signature": signature,
+        })
+
+        self.assertTrue(response.json()["success"])
+
+    def webhook(self):
+        payment_captured({"payment": {"entity": {
+            "id": "pay_test", "order_id": "order_test",
+        }}})
+
+    def assert_sold_once(self):
+        self.variant.refresh_from_db()
+        self.assertEqual(self.variant.stock, 0)
+
+        self.assertFalse(StockReservation.objects.exists())
+        self.assertEqual(
+            list(InventoryMovement.objects.values_list("reason", "change", "reference")),
+            [("sale", -1, str(self.order.uuid))],
+        )
+
+        self.order.refresh_from_db()
+        self.assertEqual((self.order.status, self.order.payment_status), ("processing", "paid"))
+
+    def test_checkout_callback_sells_the_stock(self):
+        self.verify()
+        self.assert_sold_once()
+
+        # The webhook that follows finds the payment captured
+        self.webhook()
+        self.assert_sold_once()
+
+    def test_webhook_before_callback(self):
+        self.webhook()
+        self.assert_sold_once()
+
+        self.verify()
+        self.assert_sold_once()
+
+
+class WaitingEventTests(TestCase):
+
+    def create_event(self, event_id, **fields):
+        return WebhookEvent.objects.create(
+            event_id=event_id,
+            event_type="refund.processed",
+            ordering_key="order_test",
+            payload={},
+            **fields,
+        )
+
+    def test_processed_waiting_event_wakes_its_siblings(self):
+        later = timezone.now() + timedelta(minutes=10)
+
+        first = self.create_event("evt_1", status="waiting")
+        second = self.create_event("evt_2", status="waiting", next_attempt_at=later)
+
+        with mock.patch("apps.payments.tasks.handle_event") as handle:
+            self.assertEqual(process_webhook_events("order_test"), 2)
+
+        self.assertEqual(handle.call_count, 2)
+
+        for event in (first, second):
+            event.refresh_from_db()
+            self.assertEqual(event.status, "processed")
+
+    def test_backing_off_event_does_not_block_the_key(self):
+        later = timezone.now() + timedelta(minutes=10)
+
+        backing_off = self.create_event("evt_1", status="waiting", next_attempt_at=later)
+        due = self.create_event("evt_2", status="waiting")
+
+        with mock.patch("apps.payments.tasks.handle_event"):
+            process_webhook_events("order_test")
+
+        due.refresh_from_db()
+        self.assertEqual(due.status, "processed")
+
+        # Woken by its sibling's success
+        backing_off.refresh_from_db()
+        self.assertEqual(backing_off.status, "processed")
@@ -1,14 +1,10 @@
 from django.contrib.auth.decorators import login_required
-from django.conf import settings
 from django.views.decorators.http import require_POST
 from django.http import JsonResponse
-from django.db import transaction
-
-import razorpay
 
+from apps.payments.gateway import get_gateway
 from apps.payments.models import Payment
-from apps.orders.models import Order
-from apps.cart.models import Cart
+from apps.payments.services import capture_payment
 
 
 @login_required(login_url="accounts:login")
@@ -31,18 +27,11 @@ def verify_payment(request):
     # -------------------------------------------------
     # 2️⃣ Verify Razorpay signature
     # -------------------------------------------------
-    client = razorpay.Client(
-        auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
-    )
-
-    try:
-        client.utility.verify_payment_signature({
-            "razorpay_payment_id": razorpay_payment_id,
-            "razorpay_order_id": razorpay_order_id,
-            "razorpay_signature": razorpay_signature
-        })
-
-    except razorpay.errors.SignatureVerificationError:
+    if not get_gateway().verify_payment_signature(
+        razorpay_order_id,
+        razorpay_payment_id,
+        razorpay_signature,
+    ):
         return JsonResponse(
             {"success": False, "error": "Signature verification failed"},
             status=400
@@ -76,31 +65,15 @@ def verify_payment(request):
             "success": True,
             "redirect_url": f"/order/success/{order.uuid}/"
         })
-    with transaction.atomic():
-
-        payment.razorpay_payment_id = razorpay_payment_id
-        payment.razorpay_signature = razorpay_signature
-        payment.status = "success"
-        payment.save()
-        
-
-        order.status = "processing"
-        order.payment_status = "paid"
-        order.razorpay_payment_id = razorpay_payment_id
-        order.save()
-
-        # -------------------------------------------------
-        # 6️⃣ Clear cart after payment success
-        # -------------------------------------------------
-        cart = Cart.objects.filter(user=request.user).first()
-
-        if cart:
-            cart.items.all().delete()
-
-        # -------------------------------------------------
-        # 7️⃣ Remove promo from session
-        # -------------------------------------------------
-        request.session.pop("applied_promo", None)
+
+    # Paid, stock sold (holds consumed), cart emptied, invoice queued;
+    # a no-op if the payment.captured webhook got there first
+    capture_payment(payment, razorpay_payment_id, razorpay_signature)
+
+    # -------------------------------------------------
+    # 7️⃣ Remove promo from session
+    # -------------------------------------------------
+    request.session.pop("applied_promo", None)
 
     # -------------------------------------------------
     # 8️⃣ Return response
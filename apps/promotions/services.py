@@ -10,7 +10,11 @@ class PromoValidationResult:
         self.discount = discount
 
 
-def validate_promo_for_cart(user, cart, code):
+def validate_promo_for_cart(user, cart, code, subtotal=None):
+    """
+    `subtotal` is the already priced cart subtotal (orders.pricing);
+    falls back to cart.subtotal when not given.
+    """
     if not code:
         return PromoValidationResult(False, error="Enter promo code.")
 
@@ -25,8 +29,11 @@ def validate_promo_for_cart(user, cart, code):
     if promo.status != "active":
         return PromoValidationResult(False, error="Promo is not currently active.")
 
-    # 2️⃣ Cart total in paise (assumes cart.subtotal is Decimal rupees)
-    cart_total_paise = int(cart.subtotal * 100)
+    # 2️⃣ Cart total in paise (subtotal is Decimal rupees)
+    if subtotal is None:
+        subtotal = cart.subtotal
+
+    cart_total_paise = int(subtotal * 100)
 
     # 3️⃣ Minimum cart value
     if cart_total_paise < promo.minimum_cart_value:
@@ -0,0 +1,14 @@
+from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete
+
+from surplus_store_project.cache import invalidate_tags
+
+from .models import FAQ
+
+
+# ---------- FAQ PAGE CACHE ----------
+
+@receiver(post_save, sender=FAQ)
+@receiver(post_delete, sender=FAQ)
+def invalidate_faq_page(sender, instance, **kwargs):
+    invalidate_tags("faq")
@@ -1,8 +1,11 @@
 from django.shortcuts import render
 from collections import defaultdict
+from surplus_store_project.cache import cache_public_page
+
 from .models import FAQ
 
 
+@cache_public_page(tags=["faq"])
 def faq_view(request):
     faqs = FAQ.objects.filter(is_active=True)
 
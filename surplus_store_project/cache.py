@@ -0,0 +1,127 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from surplus_store_project import metrics
+
+
+PUBLIC_PAGE_CACHE_TTL = getattr(settings, "PUBLIC_PAGE_CACHE_TTL", 600)
+
+
+# ==============================
+# CACHE TAGS
+# ==============================
+#
+# A tag is a version number kept in the cache. Entries embed the current
+# version of each of their tags in their key, so bumping a tag makes all
+# of its entries unreachable at once (they simply expire later).
+#
+# Versions start from the clock (ms) rather than 1 so that a tag evicted
+# from the cache can never come back with a value whose entries are
+# still cached.
+
+def _initial_version():
+    return time.time_ns() // 1_000_000
+
+
+def _tag_key(tag):
+    return f"tag:{tag}"
+
+
+def get_tag_versions(tags):
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), timeout=None)
+            versions[key] = cache.get(key, _initial_version())
+
+    return [versions[key] for key in keys]
+
+
+def get_tag_version(tag):
+    return get_tag_versions([tag])[0]
+
+
+def invalidate_tags(*tags):
+    for tag in set(tags):
+        key = _tag_key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), timeout=None)
+
+
+# ==============================
+# PUBLIC PAGE CACHE
+# ==============================
+
+def _page_key(request, versions):
+    raw = "{}|{}".format(
+        request.get_full_path(),
+        ".".join(str(version) for version in versions),
+    )
+    return "page:" + hashlib.md5(raw.encode()).hexdigest()
+
+
+def cache_public_page(tags, timeout=PUBLIC_PAGE_CACHE_TTL, name=None):
+    """
+    Cache the full response of a page that renders the same for every
+    visitor (no user data, no forms/CSRF token).
+
+    Only GET/HEAD 200 responses that don't set cookies are stored. The
+    entry is dropped as soon as any of `tags` is invalidated.
+
+        @cache_public_page(tags=["faq"])
+        def faq_view(request): ...
+    """
+    tags = list(tags)
+
+    def decorator(view_func):
+        metric = f"page.{name or view_func.__name__}"
+        metrics.register_cache(metric)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view_func(request, *args, **kwargs)
+
+            key = _page_key(request, get_tag_versions(tags))
+
+            cached = cache.get(key)
+            if cached is not None:
+                metrics.record_cache_access(metric, hit=True)
+                return HttpResponse(
+                    cached["content"],
+                    status=cached["status"],
+                    headers=cached["headers"],
+                )
+
+            metrics.record_cache_access(metric, hit=False)
+            response = view_func(request, *args, **kwargs)
+
+            # TemplateResponse (e.g. sitemap) renders lazily
+            if hasattr(response, "render") and callable(response.render):
+                response.render()
+
+            if (
+                response.status_code == 200
+                and not response.streaming
+                and not response.cookies
+            ):
+                cache.set(key, {
+                    "content": response.content,
+                    "status": response.status_code,
+                    "headers": dict(response.items()),
+                }, timeout)
+
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,177 @@
+import hashlib
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+from surplus_store_project import metrics
+
+
+# How long a response is replayed for the same key
+IDEMPOTENCY_TTL = getattr(settings, "IDEMPOTENCY_TTL", 60 * 60)
+
+# A crashed request frees its key after this long
+IDEMPOTENCY_LOCK_TIMEOUT = getattr(settings, "IDEMPOTENCY_LOCK_TIMEOUT", 30)
+
+# How long a concurrent duplicate waits for the first request to finish
+IDEMPOTENCY_WAIT = getattr(settings, "IDEMPOTENCY_WAIT", 10)
+
+HEADER = "Idempotency-Key"
+
+
+# ==============================
+# IDEMPOTENCY KEYS
+# ==============================
+#
+# The client sends an Idempotency-Key header (one fresh key per user
+# action). The first request runs the view and its response is stored;
+# repeats of the key (double submit, network retry) get that stored
+# response back without running the view again.
+#
+# A duplicate arriving while the first request is still running waits
+# on the key's lock (polling for the stored response) instead of racing
+# it. Keys are scoped per user and path, and reusing a key with
+# different form fields is rejected (422). 5xx responses are not stored, so
+# those can be retried with the same key.
+#
+# Requests without the header behave exactly as before.
+
+
+def _scope(request, key):
+    user = request.user.pk if request.user.is_authenticated else request.session.session_key
+    raw = f"{user}|{request.path}|{key}"
+    return "idem:" + hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _fingerprint(request):
+    """
+    What the request asks for. Form posts are compared field by field:
+    the raw multipart body differs on every retry (new boundary) and the
+    CSRF token may rotate.
+    """
+    user = request.user.pk if request.user.is_authenticated else request.session.session_key
+
+    if request.content_type in ("multipart/form-data", "application/x-www-form-urlencoded"):
+        fields = sorted(
+            (name, values)
+            for name, values in request.POST.lists()
+            if name != "csrfmiddlewaretoken"
+        )
+        body = repr(fields).encode()
+    else:
+        body = request.body
+
+    raw = f"{user}|{request.path}|".encode() + body
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _replay(stored):
+    response = HttpResponse(
+        stored["content"],
+        status=stored["status"],
+        headers=stored["headers"],
+    )
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _mismatch():
+    return JsonResponse({
+        "success": False,
+        "error": "Idempotency-Key was already used for a different request."
+    }, status=422)
+
+
+def idempotent(view_func):
+    """
+    Apply under the auth decorators (needs request.user).
+
+        @login_required(...)
+        @require_POST
+        @idempotent
+        def place_order(request): ...
+    """
+    metric = f"idempotency.{view_func.__name__}"
+    metrics.register_cache(metric)
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+
+        if request.method != "POST" or not key:
+            return view_func(request, *args, **kwargs)
+
+        if len(key) > 255:
+            return JsonResponse({
+                "success": False,
+                "error": "Idempotency-Key is too long."
+            }, status=400)
+
+        result_key = _scope(request, key)
+        lock_key = result_key + ":lock"
+        fingerprint = _fingerprint(request)
+
+        # -------------------------------------------------
+        # 1️⃣ Already answered → replay
+        # -------------------------------------------------
+        stored = cache.get(result_key)
+
+        if stored is not None:
+            metrics.record_cache_access(metric, hit=True)
+            if stored["fingerprint"] != fingerprint:
+                return _mismatch()
+            return _replay(stored)
+
+        # -------------------------------------------------
+        # 2️⃣ In progress elsewhere → wait for its response
+        # -------------------------------------------------
+        token = uuid.uuid4().hex
+
+        if not cache.add(lock_key, token, IDEMPOTENCY_LOCK_TIMEOUT):
+            deadline = time.monotonic() + IDEMPOTENCY_WAIT
+
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+
+                stored = cache.get(result_key)
+                if stored is not None:
+                    metrics.record_cache_access(metric, hit=True)
+                    if stored["fingerprint"] != fingerprint:
+                        return _mismatch()
+                    return _replay(stored)
+
+                # First request died without storing (5xx / crash)
+                if cache.add(lock_key, token, IDEMPOTENCY_LOCK_TIMEOUT):
+                    break
+            else:
+                return JsonResponse({
+                    "success": False,
+                    "error": "This request is still being processed."
+                }, status=409)
+
+        # -------------------------------------------------
+        # 3️⃣ First request → run + store
+        # -------------------------------------------------
+        metrics.record_cache_access(metric, hit=False)
+
+        try:
+            response = view_func(request, *args, **kwargs)
+
+            if response.status_code < 500 and not response.streaming:
+                cache.set(result_key, {
+                    "fingerprint": fingerprint,
+                    "content": response.content,
+                    "status": response.status_code,
+                    "headers": dict(response.items()),
+                }, IDEMPOTENCY_TTL)
+
+            return response
+
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    return wrapper
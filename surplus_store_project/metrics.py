@@ -0,0 +1,192 @@
+from django.core.cache import cache
+
+
+# ==============================
+# COUNTERS (monitoring)
+# ==============================
+#
+# Counters live in the shared cache (Redis) so every web/worker process
+# adds to the same numbers. Names are registered at import time so the
+# monitoring endpoint knows what to read without scanning keys.
+
+_registered = set()
+
+
+def _key(name):
+    return f"metrics:{name}"
+
+
+def register(*names):
+    _registered.update(names)
+
+
+def incr(name, delta=1):
+    key = _key(name)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # First hit (or evicted): create it; if another process won the
+        # race, add() fails and the increment goes to its value instead.
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+def read(names):
+    values = cache.get_many([_key(name) for name in names])
+    return {name: values.get(_key(name), 0) for name in names}
+
+
+# ---------- CACHE HIT / MISS ----------
+
+def register_cache(name):
+    register(f"cache.{name}.hits", f"cache.{name}.misses")
+
+
+def record_cache_access(name, hit):
+    incr(f"cache.{name}.{'hits' if hit else 'misses'}")
+
+
+def cache_stats():
+    """
+    {"catalog.facets": {"hits": 10, "misses": 2, "hit_ratio": 0.833}, ...}
+    """
+    names = sorted({
+        name[len("cache."):].rsplit(".", 1)[0]
+        for name in _registered
+        if name.startswith("cache.")
+    })
+
+    values = read(
+        [f"cache.{name}.hits" for name in names]
+        + [f"cache.{name}.misses" for name in names]
+    )
+
+    stats = {}
+    for name in names:
+        hits = values[f"cache.{name}.hits"]
+        misses = values[f"cache.{name}.misses"]
+        total = hits + misses
+
+        stats[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 3) if total else None,
+        }
+
+    return stats
+
+
+# ---------- LATENCY ----------
+#
+# Per-call count / errors / total time plus a coarse histogram, enough
+# for average and approximate percentiles without storing samples.
+
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _bucket(elapsed_ms):
+    for bound in LATENCY_BUCKETS_MS:
+        if elapsed_ms <= bound:
+            return f"le_{bound}"
+    return "le_inf"
+
+
+def _timing_names(name):
+    return (
+        [f"timing.{name}.count", f"timing.{name}.errors", f"timing.{name}.total_ms"]
+        + [f"timing.{name}.le_{bound}" for bound in LATENCY_BUCKETS_MS]
+        + [f"timing.{name}.le_inf"]
+    )
+
+
+def register_timing(name):
+    register(*_timing_names(name))
+
+
+def record_timing(name, elapsed_ms, error=False):
+    incr(f"timing.{name}.count")
+    incr(f"timing.{name}.total_ms", int(round(elapsed_ms)))
+    incr(f"timing.{name}.{_bucket(elapsed_ms)}")
+
+    if error:
+        incr(f"timing.{name}.errors")
+
+
+def _percentile(buckets, count, fraction):
+    """
+    Upper bound of the bucket holding the given fraction of calls.
+    """
+    seen = 0
+    for bound in LATENCY_BUCKETS_MS:
+        seen += buckets[f"le_{bound}"]
+        if seen >= count * fraction:
+            return bound
+    return None   # beyond the last bucket
+
+
+def timing_stats():
+    """
+    {"gateway.create_order": {"count": 120, "errors": 1, "avg_ms": 212.4,
+     "p50_ms": 250, "p95_ms": 500, "buckets": {...}}, ...}
+    """
+    names = sorted({
+        name[len("timing."):].rsplit(".", 1)[0]
+        for name in _registered
+        if name.startswith("timing.")
+    })
+
+    values = read([key for name in names for key in _timing_names(name)])
+
+    stats = {}
+    for name in names:
+        count = values[f"timing.{name}.count"]
+        buckets = {
+            key[len(f"timing.{name}."):]: values[key]
+            for key in _timing_names(name)[3:]
+        }
+
+        stats[name] = {
+            "count": count,
+            "errors": values[f"timing.{name}.errors"],
+            "avg_ms": (
+                round(values[f"timing.{name}.total_ms"] / count, 1)
+                if count else None
+            ),
+            "p50_ms": _percentile(buckets, count, 0.5) if count else None,
+            "p95_ms": _percentile(buckets, count, 0.95) if count else None,
+            "buckets": buckets,
+        }
+
+    return stats
+
+
+# ---------- BACKGROUND JOBS ----------
+
+def register_job(name, *counters):
+    register(f"jobs.{name}.runs", *[f"jobs.{name}.{counter}" for counter in counters])
+
+
+def record_job(name, **counts):
+    """
+    One run of a periodic job and what it did:
+    record_job("expire_pending_orders", orders=12, payments=3)
+    """
+    incr(f"jobs.{name}.runs")
+    for counter, delta in counts.items():
+        if delta:
+            incr(f"jobs.{name}.{counter}", delta)
+
+
+def job_stats():
+    """
+    {"expire_pending_orders": {"runs": 40, "orders": 12, ...}, ...}
+    """
+    names = sorted(name for name in _registered if name.startswith("jobs."))
+    values = read(names)
+
+    stats = {}
+    for name in names:
+        job, counter = name[len("jobs."):].rsplit(".", 1)
+        stats.setdefault(job, {})[counter] = values[name]
+
+    return stats
@@ -0,0 +1,253 @@
+import base64
+import binascii
+import datetime
+import json
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import Q
+
+
+# Below this many (estimated) rows a list shows the exact COUNT(*)
+EXACT_COUNT_LIMIT = getattr(settings, "EXACT_COUNT_LIMIT", 10_000)
+
+
+# ==============================
+# KEYSET (SEEK) PAGINATION
+# ==============================
+#
+# Offset pagination (LIMIT/OFFSET + COUNT) gets slower the deeper the
+# page. Keyset pagination remembers the sort key of the last row that was
+# shown and asks for "rows after this key", which an index on the sort
+# columns answers in constant time for any page.
+#
+# The ordering MUST end with a unique column (usually "id") so that the
+# key of a row is never ambiguous.
+#
+# Going back (`before`) is the same seek on the reversed ordering, with
+# the rows flipped back afterwards.
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    """
+    DjangoJSONEncoder rounds datetimes to milliseconds; a cursor needs the
+    exact value or the seek skips rows a few microseconds apart.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, cls=_CursorEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Returns the list of key values, or None for a missing/tampered cursor
+    (which simply restarts from the first page).
+    """
+    if not cursor:
+        return None
+
+    padded = cursor + "=" * (-len(cursor) % 4)
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        return None
+
+    if not isinstance(values, list):
+        return None
+
+    return values
+
+
+def _ordering_field(model, field):
+    """
+    Model field behind an ordering entry ("-subcategory__name" → SubCategory.name).
+    """
+    *relations, name = field.lstrip("-").split("__")
+
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+
+    return model._meta.get_field(name)
+
+
+def _cursor_values(model, ordering, values):
+    """
+    The cursor values converted to the ordering fields' types, or None
+    when they don't fit (wrong arity or type, e.g. a tampered ?cursor=).
+    """
+    if values is None or len(values) != len(ordering):
+        return None
+
+    typed = []
+
+    for field, value in zip(ordering, values):
+        if value is None or isinstance(value, (list, dict)):
+            return None
+
+        # Postgres rejects NUL in text parameters
+        if isinstance(value, str) and "\x00" in value:
+            return None
+
+        try:
+            typed.append(_ordering_field(model, field).to_python(value))
+        except (FieldDoesNotExist, ValidationError, TypeError, ValueError):
+            return None
+
+    return typed
+
+
+def _seek_filter(ordering, values):
+    """
+    Lexicographic "after this key" filter.
+
+    ("name", "id") + ["Tee", 7] becomes:
+        name > "Tee" OR (name = "Tee" AND id > 7)
+    """
+    condition = Q()
+    equal_so_far = Q()
+
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+
+        condition |= equal_so_far & Q(**{f"{name}__{lookup}": value})
+        equal_so_far &= Q(**{name: value})
+
+    return condition
+
+
+def _reversed(ordering):
+    return [
+        field[1:] if field.startswith("-") else f"-{field}"
+        for field in ordering
+    ]
+
+
+def _row_key(obj, ordering):
+    values = []
+    for field in ordering:
+        value = attrgetter(field.lstrip("-").replace("__", "."))(obj)
+        values.append(value)
+    return json.loads(json.dumps(values, cls=_CursorEncoder))
+
+
+def keyset_paginate(queryset, ordering, cursor=None, page_size=24, before=None):
+    """
+    Fetch one page (page_size + 1 rows, to know if another page exists)
+    strictly after `cursor`, or strictly before `before`.
+    """
+    model = queryset.model
+
+    # A cursor that doesn't match the ordering restarts from the first page
+    values = _cursor_values(model, ordering, decode_cursor(cursor))
+    before_values = None if values else _cursor_values(
+        model, ordering, decode_cursor(before)
+    )
+
+    if before_values:
+        backwards = _reversed(ordering)
+
+        rows = list(
+            queryset
+            .order_by(*backwards)
+            .filter(_seek_filter(backwards, before_values))[: page_size + 1]
+        )
+
+        more = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+
+        return KeysetPage(
+            rows,
+            next_cursor=encode_cursor(_row_key(rows[-1], ordering)) if rows else None,
+            previous_cursor=encode_cursor(_row_key(rows[0], ordering)) if more else None,
+        )
+
+    queryset = queryset.order_by(*ordering)
+
+    if values:
+        queryset = queryset.filter(_seek_filter(ordering, values))
+
+    rows = list(queryset[: page_size + 1])
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(_row_key(rows[-1], ordering))
+
+    previous_cursor = None
+    if values and rows:
+        previous_cursor = encode_cursor(_row_key(rows[0], ordering))
+
+    return KeysetPage(rows, next_cursor, previous_cursor)
+
+
+# ==============================
+# ESTIMATED COUNTS
+# ==============================
+
+def estimated_count(queryset):
+    """
+    (count, exact). COUNT(*) is a full scan of whatever matches, so past
+    EXACT_COUNT_LIMIT rows this returns the planner's estimate instead:
+    pg_class.reltuples for the whole table, EXPLAIN's row estimate for a
+    filtered queryset (both as fresh as the last ANALYZE / autovacuum).
+    """
+    if connection.vendor != "postgresql":
+        return queryset.count(), True
+
+    with connection.cursor() as cursor:
+        if queryset.query.where:
+            # Raw EXPLAIN: QuerySet.explain() reshapes the JSON plan
+            # differently depending on the driver
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            estimate = int(plan[0]["Plan"]["Plan Rows"])
+        else:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            estimate = cursor.fetchone()[0]
+
+    # -1: never analyzed
+    if estimate < EXACT_COUNT_LIMIT:
+        return queryset.count(), True
+
+    return estimate, False
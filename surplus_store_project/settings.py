@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 
 import environ
@@ -51,6 +52,9 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
 
+    # Full-text search (SearchVector / GIN indexes / trigram)
+    'django.contrib.postgres',
+
     # Needed by django-allauth to know which "Site" this config belongs to
     'django.contrib.sites',
 
@@ -314,6 +318,20 @@ RAZORPAY_KEY_ID = env("RAZORPAY_KEY_ID")
 RAZORPAY_KEY_SECRET = env("RAZORPAY_KEY_SECRET")
 RAZORPAY_WEBHOOK_SECRET = env("RAZORPAY_WEBHOOK_SECRET")
 
+# Gateway HTTP client (apps.payments.gateway)
+RAZORPAY_CONNECT_TIMEOUT = env.float("RAZORPAY_CONNECT_TIMEOUT", default=3)
+RAZORPAY_READ_TIMEOUT = env.float("RAZORPAY_READ_TIMEOUT", default=10)
+RAZORPAY_MAX_RETRIES = env.int("RAZORPAY_MAX_RETRIES", default=2)
+RAZORPAY_RETRY_BACKOFF = env.float("RAZORPAY_RETRY_BACKOFF", default=0.3)
+RAZORPAY_POOL_SIZE = env.int("RAZORPAY_POOL_SIZE", default=10)
+
+# Local fake gateway (no network) for development / load testing
+RAZORPAY_FAKE = env.bool("RAZORPAY_FAKE", default=False)
+RAZORPAY_FAKE_LATENCY_MS = env.int("RAZORPAY_FAKE_LATENCY_MS", default=0)
+RAZORPAY_FAKE_FAILURE_RATE = env.float("RAZORPAY_FAKE_FAILURE_RATE", default=0)
+RAZORPAY_FAKE_WEBHOOKS = env.bool("RAZORPAY_FAKE_WEBHOOKS", default=True)
+RAZORPAY_FAKE_WEBHOOK_URL = env("RAZORPAY_FAKE_WEBHOOK_URL", default="")
+
 
 
 # CELERY - REDIS
@@ -322,3 +340,94 @@ CELERY_BROKER_URL = env("CELERY_BROKER_URL")
 
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
+
+# Periodic jobs (run `celery -A surplus_store_project beat`)
+CELERY_BEAT_SCHEDULE = {
+    "sweep-webhook-events": {
+        "task": "apps.payments.tasks.sweep_webhook_events",
+        "schedule": 60,
+    },
+    "release-expired-stock-reservations": {
+        "task": "apps.catalog.tasks.release_expired_stock_reservations",
+        "schedule": 60,
+    },
+    "cancel-stranded-orders": {
+        "task": "apps.orders.tasks.cancel_stranded_orders",
+        "schedule": 5 * 60,
+    },
+    "expire-pending-orders": {
+        "task": "apps.orders.tasks.expire_pending_orders",
+        "schedule": 60,
+    },
+    "refresh-order-rollups": {
+        "task": "apps.orders.tasks.refresh_order_rollups",
+        "schedule": 60,
+    },
+}
+
+# Pending orders (and their stock reservations) expire after this long
+PENDING_ORDER_MINUTES = env.int("PENDING_ORDER_MINUTES", default=30)
+
+# Pending orders with no payment attempt after this long are cancelled
+STRANDED_ORDER_MINUTES = env.int("STRANDED_ORDER_MINUTES", default=15)
+
+# Orders cancelled per batch by the expire-pending-orders beat job
+EXPIRE_ORDERS_BATCH_SIZE = env.int("EXPIRE_ORDERS_BATCH_SIZE", default=500)
+
+# Webhook inbox: attempts before an event is dead-lettered, first retry delay
+WEBHOOK_MAX_ATTEMPTS = env.int("WEBHOOK_MAX_ATTEMPTS", default=6)
+WEBHOOK_RETRY_BASE_SECONDS = env.int("WEBHOOK_RETRY_BASE_SECONDS", default=30)
+
+# Idempotency-Key: how long responses are replayed, lock expiry and how
+# long a concurrent duplicate waits for the first request (seconds)
+IDEMPOTENCY_TTL = env.int("IDEMPOTENCY_TTL", default=3600)
+IDEMPOTENCY_LOCK_TIMEOUT = env.int("IDEMPOTENCY_LOCK_TIMEOUT", default=30)
+IDEMPOTENCY_WAIT = env.int("IDEMPOTENCY_WAIT", default=10)
+
+# Admin analytics: longest selectable window (days), and how long order
+# changes are collected before their rollup days are rebuilt (seconds)
+ANALYTICS_MAX_DAYS = env.int("ANALYTICS_MAX_DAYS", default=365)
+ROLLUP_REFRESH_DELAY = env.int("ROLLUP_REFRESH_DELAY", default=5)
+
+# Dashboard / analytics summary counters are cached this long (seconds)
+ORDER_METRICS_CACHE_TTL = env.int("ORDER_METRICS_CACHE_TTL", default=30)
+
+# Admin invoice export: render processes and orders rendered ahead
+INVOICE_EXPORT_WORKERS = env.int("INVOICE_EXPORT_WORKERS", default=min(4, os.cpu_count() or 1))
+INVOICE_EXPORT_CHUNK = env.int("INVOICE_EXPORT_CHUNK", default=32)
+
+# Admin CSV / JSONL exports: rows fetched per server-side cursor round trip
+ADMIN_EXPORT_CHUNK_SIZE = env.int("ADMIN_EXPORT_CHUNK_SIZE", default=2000)
+
+# Admin lists show estimated totals (table statistics) past this many rows
+EXACT_COUNT_LIMIT = env.int("EXACT_COUNT_LIMIT", default=10000)
+
+# Most orders one admin bulk status change may move
+BULK_STATUS_LIMIT = env.int("BULK_STATUS_LIMIT", default=1000)
+
+
+
+# CACHE - REDIS (same Redis as Celery unless CACHE_URL is set)
+# LocMem when running tests or with USE_LOCMEM_CACHE=True
+
+USE_LOCMEM_CACHE = env.bool("USE_LOCMEM_CACHE", default="test" in sys.argv[1:2])
+
+if USE_LOCMEM_CACHE:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "surplus-store",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": env("CACHE_URL", default=CELERY_BROKER_URL),
+            "KEY_PREFIX": "surplus",
+            "TIMEOUT": 300,
+        }
+    }
+
+# Full-page cache for public pages (landing, about, FAQ, sitemap)
+PUBLIC_PAGE_CACHE_TTL = env.int("PUBLIC_PAGE_CACHE_TTL", default=600)
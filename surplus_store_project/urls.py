@@ -25,6 +25,7 @@ from django.conf.urls.static import static
 
 from django.contrib.sitemaps.views import sitemap
 from apps.catalog.sitemaps import (StaticViewSitemap, CategorySitemap, ProductSitemap)
+from surplus_store_project.cache import cache_public_page
 
 
 sitemaps = {
@@ -36,7 +37,7 @@ sitemaps = {
 
 urlpatterns = [
 
-    path("sitemap.xml", sitemap, {"sitemaps": sitemaps}, name="django.contrib.sitemaps.views.sitemap"),
+    path("sitemap.xml", cache_public_page(tags=["sitemap"], name="sitemap")(sitemap), {"sitemaps": sitemaps}, name="django.contrib.sitemaps.views.sitemap"),
 
     
     path('admin/', admin.site.urls),